@@ -1,16 +1,18 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, date, timedelta
-import numpy as np
-from google_sheets_manager import get_sheets_manager
+from datetime import datetime
+from google_sheets_manager import get_sheets_manager, load_sheet, rerun_fragment, select_tenant
+from core.calculations import dashboard_metrics, monthly_trend, allocation
+from core.rebalance import rebalance_plan
+from core.charts import line_chart, pie_chart, multi_line_chart
+from core.risk import RISK_FREE_RATE, WINDOWS, correlation, risk_engine
+from table_view import show_table
 from sip_management import show_sip_management
 from fd_rd_management import show_fd_rd
 from financial_plans import show_financial_plans
 from returns_calculator import show_returns_calculator
 from monthly_investments import show_monthly_investments
-import json
+from transactions import show_transactions
 
 # Page configuration
 st.set_page_config(
@@ -60,7 +62,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Initialize Google Sheets Manager
+# Initialize Google Sheets Manager for the selected client
+select_tenant()
 sheets_manager = get_sheets_manager()
 
 def main():
@@ -78,6 +81,7 @@ def main():
         [
             "📊 Dashboard",
             "📈 Mutual Funds",
+            "💼 Transactions",
             "🔄 SIP Management", 
             "🏦 FD & RD",
             "📋 Financial Plans",
@@ -85,11 +89,17 @@ def main():
             "📅 Monthly Investments"
         ]
     )
-    
+
+    fetched_at = sheets_manager.get_fetch_time()
+    if fetched_at:
+        st.sidebar.caption(f"🕒 Data as of {fetched_at.strftime('%Y-%m-%d %H:%M')}")
+
     if page == "📊 Dashboard":
         show_dashboard()
     elif page == "📈 Mutual Funds":
         show_mutual_funds()
+    elif page == "💼 Transactions":
+        show_transactions()
     elif page == "🔄 SIP Management":
         show_sip_management()
     elif page == "🏦 FD & RD":
@@ -106,16 +116,13 @@ def show_dashboard():
     st.header("📊 Investment Dashboard")
     
     # Get data from Google Sheets
-    mf_data = sheets_manager.read_data('MUTUAL_FUNDS')
-    sip_data = sheets_manager.read_data('SIPS')
-    fd_rd_data = sheets_manager.read_data('FD_RD')
-    monthly_data = sheets_manager.read_data('MONTHLY_INVESTMENTS')
+    mf_data = load_sheet(sheets_manager, 'MUTUAL_FUNDS')
+    sip_data = load_sheet(sheets_manager, 'SIPS')
+    fd_rd_data = load_sheet(sheets_manager, 'FD_RD')
+    monthly_data = load_sheet(sheets_manager, 'MONTHLY_INVESTMENTS')
     
     # Calculate key metrics
-    total_monthly_investment = monthly_data['amount'].sum() if not monthly_data.empty else 0
-    active_sips = len(sip_data[sip_data['status'] == 'Active']) if not sip_data.empty else 0
-    total_fd_rd = fd_rd_data['amount'].sum() if not fd_rd_data.empty else 0
-    total_mf_count = len(mf_data) if not mf_data.empty else 0
+    metrics = dashboard_metrics(mf_data, sip_data, fd_rd_data, monthly_data)
     
     # Display metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -123,36 +130,34 @@ def show_dashboard():
     with col1:
         st.metric(
             label="Monthly Investment",
-            value=f"₹{total_monthly_investment:,.2f}"
+            value=f"₹{metrics['total_monthly_investment']:,.2f}"
         )
     
     with col2:
         st.metric(
             label="Active SIPs",
-            value=active_sips
+            value=metrics['active_sips']
         )
     
     with col3:
         st.metric(
             label="FD & RD Amount",
-            value=f"₹{total_fd_rd:,.2f}"
+            value=f"₹{metrics['total_fd_rd']:,.2f}"
         )
     
     with col4:
         st.metric(
             label="Mutual Funds",
-            value=total_mf_count
+            value=metrics['total_mf_count']
         )
     
     # Monthly investment trend
     if not monthly_data.empty:
         st.subheader("📈 Monthly Investment Trend")
-        monthly_data['date'] = pd.to_datetime(monthly_data['date'])
-        monthly_summary = monthly_data.groupby(monthly_data['date'].dt.to_period('M'))['amount'].sum()
+        monthly_summary = monthly_trend(monthly_data)
         
-        fig = px.line(
-            x=monthly_summary.index.astype(str),
-            y=monthly_summary.values,
+        fig = line_chart(
+            monthly_summary,
             title="Monthly Investment Amount",
             labels={'x': 'Month', 'y': 'Amount (₹)'}
         )
@@ -161,29 +166,76 @@ def show_dashboard():
     # Investment allocation
     if not monthly_data.empty:
         st.subheader("📊 Investment Allocation")
-        allocation_data = monthly_data.groupby('type')['amount'].sum()
+        allocation_data = allocation(monthly_data, by='type')
         
         if not allocation_data.empty:
-            fig = px.pie(
-                values=allocation_data.values,
-                names=allocation_data.index,
-                title="Investment Allocation by Type"
-            )
+            fig = pie_chart(allocation_data, title="Investment Allocation by Type")
             st.plotly_chart(fig, use_container_width=True)
 
+    # Rebalancing against the financial plans' target mix
+    plans_data = load_sheet(sheets_manager, 'FINANCIAL_PLANS')
+    if not monthly_data.empty and not plans_data.empty:
+        show_rebalancing(monthly_data, plans_data)
+
+@st.fragment
+def show_rebalancing(monthly_data, plans_data):
+    """Allocation drift and the trades that bring it back to target"""
+    st.subheader("⚖️ Rebalancing")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        band = st.slider("Drift Band (%)", min_value=0, max_value=25, value=5) / 100
+    with col2:
+        new_cash = st.number_input("New Cash (₹)", min_value=0.0, value=0.0, step=1000.0)
+    with col3:
+        allow_sell = st.checkbox("Allow Sells", value=True)
+
+    plan = rebalance_plan(monthly_data, plans_data, cash=new_cash, band=band, allow_sell=allow_sell)
+    if plan['target_weight'].isna().all():
+        st.info("No active financial plans to derive a target allocation from.")
+        return
+    held = plan.loc[plan['target_weight'].isna(), 'asset_class'].tolist()
+    if held:
+        st.caption(
+            f"No active plan sets a target for {', '.join(held)}, so these holdings are kept as they are "
+            f"and left out of drift and trades. Add {', '.join('target_' + c.lower() for c in held)} "
+            "columns to Financial Plans to include them."
+        )
+
+    weights = plan.melt(
+        id_vars='asset_class', value_vars=['current_weight', 'target_weight'],
+        var_name='allocation', value_name='weight'
+    )
+    weights['allocation'] = weights['allocation'].map({'current_weight': 'Current', 'target_weight': 'Target'})
+    fig = px.bar(
+        weights, x='asset_class', y='weight', color='allocation', barmode='group',
+        title="Current vs Target Allocation",
+        labels={'asset_class': 'Asset Class', 'weight': 'Weight'}
+    )
+    fig.update_yaxes(tickformat='.0%')
+    st.plotly_chart(fig, use_container_width=True)
+
+    display = plan.copy()
+    for column in ['current_weight', 'target_weight', 'drift']:
+        display[column] = (display[column] * 100).round(2)
+    display[['current_value', 'trade']] = display[['current_value', 'trade']].round(2)
+    st.dataframe(
+        display.rename(columns={
+            'asset_class': 'Asset Class', 'current_value': 'Current (₹)', 'current_weight': 'Current %',
+            'target_weight': 'Target %', 'drift': 'Drift %', 'trade': 'Buy (+) / Sell (-) (₹)'
+        }),
+        use_container_width=True, hide_index=True
+    )
+
 def show_mutual_funds():
     """Mutual Fund Management"""
     st.header("📈 Mutual Fund Management")
     
     # Tabs for different operations
-    tab1, tab2, tab3 = st.tabs(["📋 View Funds", "➕ Add Fund", "✏️ Edit/Delete"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📋 View Funds", "➕ Add Fund", "✏️ Edit/Delete", "📉 Risk Analytics"])
     
     with tab1:
-        mf_data = sheets_manager.read_data('MUTUAL_FUNDS')
-        if not mf_data.empty:
-            st.dataframe(mf_data, use_container_width=True)
-        else:
-            st.info("No mutual funds added yet.")
+        show_table(sheets_manager, 'MUTUAL_FUNDS', "mf_view", "No mutual funds added yet.")
     
     with tab2:
         with st.form("add_mf_form"):
@@ -229,81 +281,155 @@ def show_mutual_funds():
                     st.error("Please fill in all required fields (*).")
     
     with tab3:
-        mf_data = sheets_manager.read_data('MUTUAL_FUNDS')
-        if not mf_data.empty:
-            selected_fund = st.selectbox(
-                "Select Fund to Edit/Delete",
-                options=mf_data.index,
-                format_func=lambda x: f"{mf_data.loc[x, 'name']} - {mf_data.loc[x, 'fund_house']}"
-            )
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                if st.button("✏️ Edit Fund", type="secondary"):
-                    st.session_state.editing_fund = selected_fund
-                    st.rerun()
-            
-            with col2:
-                if st.button("🗑️ Delete Fund", type="secondary"):
-                    if sheets_manager.delete_row('MUTUAL_FUNDS', selected_fund):
-                        st.success("✅ Fund deleted successfully!")
-                        st.rerun()
-                    else:
-                        st.error("❌ Failed to delete fund.")
+        edit_funds()
+    
+    with tab4:
+        show_risk_analytics(load_sheet(sheets_manager, 'MUTUAL_FUNDS'))
+
+@st.fragment
+def edit_funds():
+    """Edit and delete actions for one fund; reruns on its own"""
+    mf_data = load_sheet(sheets_manager, 'MUTUAL_FUNDS')
+    if not mf_data.empty:
+        selected_fund = st.selectbox(
+            "Select Fund to Edit/Delete",
+            options=mf_data.index,
+            format_func=lambda x: f"{mf_data.loc[x, 'name']} - {mf_data.loc[x, 'fund_house']}"
+        )
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            if st.button("✏️ Edit Fund", type="secondary"):
+                st.session_state.editing_fund = selected_fund
+                rerun_fragment()
+        
+        with col2:
+            if st.button("🗑️ Delete Fund", type="secondary"):
+                if sheets_manager.delete_row('MUTUAL_FUNDS', selected_fund):
+                    st.success("✅ Fund deleted successfully!")
+                    rerun_fragment()
+                else:
+                    st.error("❌ Failed to delete fund.")
+        
+        # Edit form
+        if hasattr(st.session_state, 'editing_fund') and st.session_state.editing_fund is not None:
+            st.subheader("Edit Fund Details")
+            fund_to_edit = mf_data.loc[st.session_state.editing_fund]
             
-            # Edit form
-            if hasattr(st.session_state, 'editing_fund') and st.session_state.editing_fund is not None:
-                st.subheader("Edit Fund Details")
-                fund_to_edit = mf_data.loc[st.session_state.editing_fund]
+            with st.form("edit_mf_form"):
+                col1, col2 = st.columns(2)
                 
-                with st.form("edit_mf_form"):
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        edit_name = st.text_input("Fund Name", value=fund_to_edit['name'])
-                        edit_category = st.selectbox("Category", 
-                            ["Large Cap", "Mid Cap", "Small Cap", "Multi Cap", "ELSS", "Debt", "Hybrid", "Index", "Other"],
-                            index=["Large Cap", "Mid Cap", "Small Cap", "Multi Cap", "ELSS", "Debt", "Hybrid", "Index", "Other"].index(fund_to_edit['category'])
-                        )
-                        edit_fund_house = st.text_input("Fund House", value=fund_to_edit['fund_house'])
-                    
-                    with col2:
-                        edit_nav = st.number_input("Current NAV", value=float(fund_to_edit['current_nav']), format="%.4f")
-                        edit_fund_code = st.text_input("Fund Code", value=fund_to_edit.get('fund_code', ''))
-                        edit_risk = st.selectbox("Risk Level", 
-                            ["Low", "Medium", "High"],
-                            index=["Low", "Medium", "High"].index(fund_to_edit['risk_level'])
-                        )
-                    
-                    edit_description = st.text_area("Description", value=fund_to_edit.get('description', ''))
-                    
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if st.form_submit_button("💾 Save Changes", type="primary"):
-                            updated_data = {
-                                'name': edit_name,
-                                'category': edit_category,
-                                'fund_house': edit_fund_house,
-                                'current_nav': edit_nav,
-                                'fund_code': edit_fund_code,
-                                'risk_level': edit_risk,
-                                'description': edit_description
-                            }
-                            
-                            if sheets_manager.update_row('MUTUAL_FUNDS', st.session_state.editing_fund, updated_data):
-                                st.success("✅ Fund updated successfully!")
-                                st.session_state.editing_fund = None
-                                st.rerun()
-                            else:
-                                st.error("❌ Failed to update fund.")
-                    
-                    with col2:
-                        if st.form_submit_button("❌ Cancel"):
+                with col1:
+                    edit_name = st.text_input("Fund Name", value=fund_to_edit['name'])
+                    edit_category = st.selectbox("Category", 
+                        ["Large Cap", "Mid Cap", "Small Cap", "Multi Cap", "ELSS", "Debt", "Hybrid", "Index", "Other"],
+                        index=["Large Cap", "Mid Cap", "Small Cap", "Multi Cap", "ELSS", "Debt", "Hybrid", "Index", "Other"].index(fund_to_edit['category'])
+                    )
+                    edit_fund_house = st.text_input("Fund House", value=fund_to_edit['fund_house'])
+                
+                with col2:
+                    edit_nav = st.number_input("Current NAV", value=float(fund_to_edit['current_nav']), format="%.4f")
+                    edit_fund_code = st.text_input("Fund Code", value=fund_to_edit.get('fund_code', ''))
+                    edit_risk = st.selectbox("Risk Level", 
+                        ["Low", "Medium", "High"],
+                        index=["Low", "Medium", "High"].index(fund_to_edit['risk_level'])
+                    )
+                
+                edit_description = st.text_area("Description", value=fund_to_edit.get('description', ''))
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.form_submit_button("💾 Save Changes", type="primary"):
+                        updated_data = {
+                            'name': edit_name,
+                            'category': edit_category,
+                            'fund_house': edit_fund_house,
+                            'current_nav': edit_nav,
+                            'fund_code': edit_fund_code,
+                            'risk_level': edit_risk,
+                            'description': edit_description
+                        }
+                        
+                        if sheets_manager.update_row('MUTUAL_FUNDS', st.session_state.editing_fund, updated_data):
+                            st.success("✅ Fund updated successfully!")
                             st.session_state.editing_fund = None
-                            st.rerun()
-        else:
-            st.info("No mutual funds to edit or delete.")
+                            rerun_fragment()
+                        else:
+                            st.error("❌ Failed to update fund.")
+                
+                with col2:
+                    if st.form_submit_button("❌ Cancel"):
+                        st.session_state.editing_fund = None
+                        rerun_fragment()
+    else:
+        st.info("No mutual funds to edit or delete.")
+
+@st.fragment
+def show_risk_analytics(mf_data):
+    """Rolling risk metrics computed from the NAV history sheet"""
+    navs = risk_engine.nav_matrix(load_sheet(sheets_manager, 'NAV_HISTORY'))
+    if navs.empty:
+        st.info("No NAV history yet. Add fund_id, date and nav rows to the NAV history sheet to see risk analytics.")
+        return
+    
+    names = {}
+    if not mf_data.empty:
+        names = dict(zip(mf_data['id'].astype(str), mf_data['name']))
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        window_label = st.selectbox("Rolling Window", list(WINDOWS), index=2)
+    with col2:
+        risk_free_rate = st.number_input("Risk-free Rate (%)", min_value=0.0, max_value=20.0, value=RISK_FREE_RATE)
+    window = WINDOWS[window_label]
+    
+    summary = risk_engine.summary(navs, window, risk_free_rate)
+    summary.insert(1, 'name', summary['fund_id'].map(names).fillna(''))
+    display = summary.copy()
+    for column in ['rolling_return', 'volatility', 'max_drawdown']:
+        display[column] = (display[column] * 100).round(2)
+    display[['sharpe', 'sortino']] = display[['sharpe', 'sortino']].round(2)
+    st.dataframe(
+        display.rename(columns={
+            'fund_id': 'Fund ID', 'name': 'Fund', 'rolling_return': f'{window_label} Return % (ann.)',
+            'volatility': 'Volatility %', 'sharpe': 'Sharpe', 'sortino': 'Sortino',
+            'max_drawdown': 'Max Drawdown %', 'observations': 'NAV Days'
+        }),
+        use_container_width=True, hide_index=True
+    )
+    
+    selected = st.multiselect(
+        "Funds to Chart",
+        options=list(navs.columns),
+        default=list(navs.columns[:5]),
+        format_func=lambda fund_id: names.get(fund_id, fund_id)
+    )
+    if not selected:
+        return
+    
+    metric = st.selectbox(
+        "Metric",
+        ['rolling_return', 'volatility', 'sharpe', 'sortino', 'drawdown'],
+        format_func=lambda m: m.replace('_', ' ').title()
+    )
+    metrics = risk_engine.metrics(navs[selected], window, risk_free_rate)
+    series = metrics[metric].rename_axis('date').reset_index()
+    fig = multi_line_chart(
+        series, 'date',
+        [(fund_id, names.get(fund_id, fund_id), None) for fund_id in selected],
+        title=f"{metric.replace('_', ' ').title()} ({window_label} window)",
+        xaxis_title="Date", yaxis_title=metric.replace('_', ' ').title()
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    
+    if len(selected) > 1:
+        st.subheader("Return Correlation")
+        corr = correlation(navs[selected], window)
+        labels = [names.get(fund_id, fund_id) for fund_id in selected]
+        fig = px.imshow(corr.to_numpy(), x=labels, y=labels, zmin=-1, zmax=1,
+                        color_continuous_scale='RdBu', text_auto='.2f')
+        st.plotly_chart(fig, use_container_width=True)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,319 @@
+"""Batch jobs for Optivest, runnable from cron without Streamlit.
+
+Usage:
+    python batch.py recompute --portfolios tenants.json --output reports --workers 4
+    python batch.py aggregate --portfolios tenants.json --output totals.json --workers 16
+    python batch.py post-sips --portfolios tenants.json
+    python batch.py rebalance --portfolios tenants.json --output rebalance.csv --band 0.05
+    python batch.py compact --portfolios tenants.json
+    python batch.py checkpoint --portfolios tenants.json
+    python batch.py report --portfolios tenants.json --as-of 2024-03-31 --output reports-2024-03-31
+
+The portfolios file maps a portfolio name to its sheet overrides, e.g.
+    {"client_a": {"SIPS": "<sheet id>", "FD_RD": {"sheet_id": "<id>", "worksheet": "FD"}}}
+Sheet types that are not overridden use the defaults from config.py.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from config import JOURNAL_DIR, OPTIONAL_SHEETS, TENANTS_FILE
+from core.calculations import REPORT_SHEETS, portfolio_report
+from core.journal import Journal, portfolio_dir
+from core.rebalance import current_allocation, rebalance_portfolios, target_allocation
+from core.sheets import GoogleSheetsManager, live_rows, resolve_sheet_config
+from core.sip_schedule import post_missing_installments
+from core.snapshot import SnapshotStore
+from core.tenants import TenantRegistry, load_tenants
+
+logger = logging.getLogger("optivest.batch")
+
+
+def report_frames(manager, errors):
+    """The sheets portfolio_report needs; optional sheets that cannot be read count as empty"""
+    frames = {}
+    for sheet_type in REPORT_SHEETS:
+        failed = len(errors)
+        frames[sheet_type] = manager.read_data(sheet_type)
+        if sheet_type in OPTIONAL_SHEETS and len(errors) > failed:
+            logger.warning("%s unavailable, reported as empty: %s", sheet_type, "; ".join(errors[failed:]))
+            del errors[failed:]
+    return frames
+
+
+def recompute_portfolio(name, overrides, output_dir):
+    """Read one portfolio's sheets and write its report; runs in a worker process"""
+    errors = []
+    manager = GoogleSheetsManager(
+        sheet_config=resolve_sheet_config(overrides),
+        snapshot_store=SnapshotStore(None),
+        on_error=errors.append,
+        background_refresh=False,
+        journal=Journal(None)
+    )
+    if not manager.gc:
+        raise RuntimeError("Google Sheets credentials are not configured")
+
+    frames = report_frames(manager, errors)
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+    report = portfolio_report(frames)
+    report['portfolio'] = name
+    path = os.path.join(output_dir, f"{name}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def recompute(portfolios, output_dir, workers=None):
+    """Recompute every portfolio in parallel worker processes; returns the failures"""
+    os.makedirs(output_dir, exist_ok=True)
+    failures = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(recompute_portfolio, name, overrides, output_dir): name
+            for name, overrides in portfolios.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                logger.info("%s: wrote %s", name, future.result())
+            except Exception as e:
+                failures[name] = str(e)
+                logger.error("%s: %s", name, e)
+    return failures
+
+
+def tenant_metrics(tenant_id, manager):
+    """Dashboard metrics for one tenant; runs on the aggregation thread pool"""
+    frames = {sheet_type: manager.read_data(sheet_type) for sheet_type in REPORT_SHEETS}
+    return portfolio_report(frames)['metrics']
+
+
+def aggregate(tenants, output_path, workers=8):
+    """Sum dashboard metrics across tenants over one shared session; returns the failures"""
+    # Read-only, so no journal: nothing to record and no checkpoints to take
+    registry = TenantRegistry(tenants, snapshot_dir=None, background_refresh=False, journal_dir=None)
+    if not registry.session.gc:
+        raise RuntimeError("Google Sheets credentials are not configured")
+
+    results, failures = registry.aggregate(tenant_metrics, workers=workers)
+    totals = {}
+    for metrics in results.values():
+        for name, value in metrics.items():
+            totals[name] = totals.get(name, 0) + value
+
+    with open(output_path, 'w') as f:
+        json.dump({'totals': totals, 'tenants': results, 'failures': failures}, f, indent=2)
+    logger.info("aggregated %d tenants into %s", len(results), output_path)
+    return failures
+
+
+def post_sips(tenants, as_of=None, workers=8):
+    """Post every tenant's missing SIP installments, one bulk write each; returns the failures"""
+    registry = TenantRegistry(tenants, snapshot_dir=None, background_refresh=False)
+    if not registry.session.gc:
+        raise RuntimeError("Google Sheets credentials are not configured")
+
+    def job(tenant_id, manager):
+        posted = post_missing_installments(manager, as_of)
+        if posted is None:
+            raise RuntimeError("bulk write to MONTHLY_INVESTMENTS failed")
+        return len(posted)
+
+    results, failures = registry.aggregate(job, workers=workers)
+    for tenant_id, count in sorted(results.items()):
+        logger.info("%s: posted %d installments", tenant_id, count)
+    return failures
+
+
+def allocation_rows(tenant_id, manager):
+    """Current and target allocation for one tenant; runs on the aggregation thread pool"""
+    return (
+        current_allocation(manager.read_data('MONTHLY_INVESTMENTS')),
+        target_allocation(manager.read_data('FINANCIAL_PLANS'))
+    )
+
+
+def rebalance(tenants, output_path, workers=8, **options):
+    """Rebalancing trades for every tenant, solved in one vectorized pass; returns the failures"""
+    registry = TenantRegistry(tenants, snapshot_dir=None, background_refresh=False, journal_dir=None)
+    if not registry.session.gc:
+        raise RuntimeError("Google Sheets credentials are not configured")
+
+    results, failures = registry.aggregate(allocation_rows, workers=workers)
+    tenant_ids = sorted(results)
+    currents = pd.DataFrame([results[t][0] for t in tenant_ids], index=tenant_ids)
+    targets = pd.DataFrame([results[t][1] for t in tenant_ids], index=tenant_ids)
+    trades = rebalance_portfolios(currents, targets, **options)
+
+    if output_path.endswith('.json'):
+        trades.to_json(output_path, orient='records', indent=2)
+    else:
+        trades.to_csv(output_path, index=False)
+    logger.info("rebalanced %d tenants into %s", len(tenant_ids), output_path)
+    return failures
+
+
+def compact(tenants, workers=8):
+    """Remove soft-deleted rows from every tenant's sheets; returns the failures"""
+    registry = TenantRegistry(tenants, snapshot_dir=None, background_refresh=False)
+    if not registry.session.gc:
+        raise RuntimeError("Google Sheets credentials are not configured")
+
+    def job(tenant_id, manager):
+        removed = {}
+        for sheet_type in manager.sheet_config:
+            count = manager.compact(sheet_type)
+            if count is None:
+                raise RuntimeError(f"compacting {sheet_type} failed")
+            if count:
+                removed[sheet_type] = count
+        return removed
+
+    results, failures = registry.aggregate(job, workers=workers)
+    for tenant_id, removed in sorted(results.items()):
+        logger.info("%s: removed %s", tenant_id, removed or "nothing")
+    return failures
+
+
+def checkpoint_sheets(tenant_id, manager):
+    """Checkpoint one tenant's sheets; optional sheets that cannot be read are skipped"""
+    count = 0
+    for sheet_type in manager.sheet_config:
+        if manager.checkpoint(sheet_type):
+            count += 1
+        elif sheet_type in OPTIONAL_SHEETS:
+            logger.warning("%s: %s unavailable, not checkpointed", tenant_id, sheet_type)
+        else:
+            raise RuntimeError(f"reading {sheet_type} failed")
+    return count
+
+
+def checkpoint(tenants, journal_dir=JOURNAL_DIR, workers=8):
+    """Checkpoint every tenant's sheets into its journal, capturing edits made in Sheets; returns the failures"""
+    registry = TenantRegistry(tenants, snapshot_dir=None, background_refresh=False, journal_dir=journal_dir)
+    if not registry.session.gc:
+        raise RuntimeError("Google Sheets credentials are not configured")
+
+    results, failures = registry.aggregate(checkpoint_sheets, workers=workers)
+    for tenant_id, count in sorted(results.items()):
+        logger.info("%s: checkpointed %d sheets", tenant_id, count)
+    return failures
+
+
+def report_as_of(name, journal_dir, as_of, output_dir):
+    """Report one portfolio as it stood at as_of, replayed from its journal; runs in a worker process"""
+    journal = Journal(portfolio_dir(journal_dir, name))
+    frames = {}
+    for sheet_type in REPORT_SHEETS:
+        data = journal.as_of(sheet_type, as_of)
+        if data is not None:
+            frames[sheet_type] = live_rows(data)
+    if not frames:
+        raise RuntimeError(f"no journal history on or before {as_of}")
+
+    report = portfolio_report(frames, today=as_of.normalize())
+    report['portfolio'] = name
+    report['as_of'] = as_of.isoformat()
+    path = os.path.join(output_dir, f"{name}.json")
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def report(portfolios, as_of, output_dir, journal_dir=JOURNAL_DIR, workers=None):
+    """Point-in-time reports for every portfolio without touching Sheets; returns the failures"""
+    as_of = pd.Timestamp(as_of)
+    if as_of == as_of.normalize():
+        # A bare date means the state at the end of that day
+        as_of = as_of + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+    os.makedirs(output_dir, exist_ok=True)
+    failures = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(report_as_of, name, journal_dir, as_of, output_dir): name
+            for name in portfolios
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                logger.info("%s: wrote %s", name, future.result())
+            except Exception as e:
+                failures[name] = str(e)
+                logger.error("%s: %s", name, e)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optivest batch jobs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    recompute_parser = subparsers.add_parser("recompute", help="Recompute portfolio reports")
+    recompute_parser.add_argument("--portfolios", default=TENANTS_FILE, help="JSON file of portfolio sheet overrides")
+    recompute_parser.add_argument("--output", default="reports", help="Directory for the JSON reports")
+    recompute_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+
+    aggregate_parser = subparsers.add_parser("aggregate", help="Sum metrics across all tenants")
+    aggregate_parser.add_argument("--portfolios", default=TENANTS_FILE, help="JSON file of portfolio sheet overrides")
+    aggregate_parser.add_argument("--output", default="aggregate.json", help="Path for the JSON totals")
+    aggregate_parser.add_argument("--workers", type=int, default=8, help="Worker threads")
+
+    post_parser = subparsers.add_parser("post-sips", help="Post due SIP installments")
+    post_parser.add_argument("--portfolios", default=TENANTS_FILE, help="JSON file of portfolio sheet overrides")
+    post_parser.add_argument("--as-of", default=None, help="Post installments due up to this date (default: today)")
+    post_parser.add_argument("--workers", type=int, default=8, help="Worker threads")
+
+    rebalance_parser = subparsers.add_parser("rebalance", help="Rebalancing trades for all tenants")
+    rebalance_parser.add_argument("--portfolios", default=TENANTS_FILE, help="JSON file of portfolio sheet overrides")
+    rebalance_parser.add_argument("--output", default="rebalance.csv", help="Path for the trades (.csv or .json)")
+    rebalance_parser.add_argument("--band", type=float, default=0.05, help="Drift band as a fraction of the portfolio")
+    rebalance_parser.add_argument("--cash", type=float, default=0.0, help="New cash to invest per tenant")
+    rebalance_parser.add_argument("--no-sell", action="store_true", help="Only invest new cash, never sell")
+    rebalance_parser.add_argument("--workers", type=int, default=8, help="Worker threads")
+
+    compact_parser = subparsers.add_parser("compact", help="Remove soft-deleted rows")
+    compact_parser.add_argument("--portfolios", default=TENANTS_FILE, help="JSON file of portfolio sheet overrides")
+    compact_parser.add_argument("--workers", type=int, default=8, help="Worker threads")
+
+    checkpoint_parser = subparsers.add_parser("checkpoint", help="Checkpoint all sheets into the journal")
+    checkpoint_parser.add_argument("--portfolios", default=TENANTS_FILE, help="JSON file of portfolio sheet overrides")
+    checkpoint_parser.add_argument("--journal", default=JOURNAL_DIR, help="Journal directory")
+    checkpoint_parser.add_argument("--workers", type=int, default=8, help="Worker threads")
+
+    report_parser = subparsers.add_parser("report", help="Point-in-time portfolio reports from the journal")
+    report_parser.add_argument("--portfolios", default=TENANTS_FILE, help="JSON file of portfolio sheet overrides")
+    report_parser.add_argument("--as-of", required=True, help="Date or timestamp to report as of")
+    report_parser.add_argument("--output", default="reports", help="Directory for the JSON reports")
+    report_parser.add_argument("--journal", default=JOURNAL_DIR, help="Journal directory")
+    report_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if args.command == "recompute":
+        failures = recompute(load_tenants(args.portfolios), args.output, args.workers)
+    elif args.command == "aggregate":
+        failures = aggregate(load_tenants(args.portfolios), args.output, args.workers)
+    elif args.command == "post-sips":
+        failures = post_sips(load_tenants(args.portfolios), args.as_of, args.workers)
+    elif args.command == "rebalance":
+        failures = rebalance(
+            load_tenants(args.portfolios), args.output, args.workers,
+            band=args.band, cash=args.cash, allow_sell=not args.no_sell
+        )
+    elif args.command == "compact":
+        failures = compact(load_tenants(args.portfolios), args.workers)
+    elif args.command == "checkpoint":
+        failures = checkpoint(load_tenants(args.portfolios), args.journal, args.workers)
+    elif args.command == "report":
+        failures = report(load_tenants(args.portfolios), args.as_of, args.output, args.journal, args.workers)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,12 +29,50 @@ SHEET_CONFIG = {
     'MONTHLY_INVESTMENTS': {
         'sheet_id': 'your_monthly_sheet_id',  # Replace with your actual sheet ID
         'worksheet': 'MonthlyInvestments'
+    },
+    'TRANSACTIONS': {
+        'sheet_id': 'your_transactions_sheet_id',  # Replace with your actual sheet ID
+        'worksheet': 'Transactions'
+    },
+    'NAV_HISTORY': {
+        'sheet_id': 'your_nav_history_sheet_id',  # Replace with your actual sheet ID
+        'worksheet': 'NavHistory'
     }
 }
 
+# Sheets a portfolio may not have set up; batch jobs treat them as empty
+# when they cannot be read instead of failing the portfolio
+OPTIONAL_SHEETS = ['TRANSACTIONS', 'NAV_HISTORY']
+
 # Service account credentials file path
 CREDENTIALS_FILE = 'credentials.json'  # You'll need to download this from Google Cloud Console
 
+# Local snapshot of the last-known sheet data, served on startup while the
+# sheets are refreshed in the background. Set to None to disable.
+SNAPSHOT_FILE = '.optivest_snapshot.pkl'
+# Sheets fetched on a cache miss are saved to the snapshot this many seconds
+# later, in one write on a timer thread rather than on every page view
+SNAPSHOT_SAVE_DELAY = 5
+
+# How often to poll each spreadsheet's Drive change marker; only sheets whose
+# spreadsheet changed are re-fetched. Set to 0 to refresh once at startup only.
+CHANGE_POLL_SECONDS = 30
+
+# Line charts with more points than this are downsampled before plotting
+CHART_MAX_POINTS = 2000
+
+# With SOFT_DELETE, deleting a row only sets its TOMBSTONE_COLUMN cell to TRUE
+# so other rows keep their positions; `python batch.py compact` removes them.
+SOFT_DELETE = False
+TOMBSTONE_COLUMN = 'deleted'
+
+# Append-only log of every write, with checkpoints, for point-in-time reads
+# (`python batch.py report --as-of 2025-03-31`). Set to None to disable.
+JOURNAL_DIR = '.optivest_journal'
+# A sheet is checkpointed once this much log has been written since its last
+# checkpoint, which bounds how much of the log a point-in-time read replays
+JOURNAL_CHECKPOINT_BYTES = 1024 * 1024
+
 def get_credentials():
     """Get Google Sheets credentials"""
     if os.path.exists(CREDENTIALS_FILE):
@@ -42,3 +80,12 @@ def get_credentials():
         return creds
     else:
         return None
+
+# Multi-tenant mode: when this file exists it maps each client to the sheet IDs
+# that differ from SHEET_CONFIG, e.g. {"client_a": {"SIPS": "<sheet id>"}}
+TENANTS_FILE = 'tenants.json'
+TENANT_SNAPSHOT_DIR = '.optivest_snapshots'
+
+# Memory limits for cached sheet data in multi-tenant mode
+TENANT_CACHE_MAX_MB = 1024
+TENANT_CACHE_MAX_MB_PER_TENANT = 64
@@ -0,0 +1,24 @@
+"""Optivest core: sheet data access and financial calculations.
+
+Nothing in this package imports Streamlit, so it can be used from batch
+jobs and workers as well as from the app.
+"""
+from core.sheets import GoogleSheetsManager, SessionView, SheetsSession, live_rows, resolve_sheet_config
+from core.snapshot import SnapshotStore
+from core.cache import TenantCache
+from core.tenants import TenantRegistry, load_tenants
+from core.query import TableIndex, query_table
+from core.calculations import (
+    dashboard_metrics,
+    monthly_trend,
+    allocation,
+    fd_rd_maturity_value,
+    fd_rd_maturity_table,
+    plan_progress,
+    plan_progress_table,
+    lump_sum_returns,
+    sip_projection,
+    portfolio_report,
+)
+from core.valuation import value_portfolio, valuation_totals
+from core.rebalance import rebalance_plan, rebalance_portfolios
@@ -0,0 +1,144 @@
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+
+
+def frame_size(value):
+    """Approximate memory held by a cached (DataFrame, fetched_at) entry"""
+    data = value[0]
+    return int(data.memory_usage(deep=True, index=True).sum())
+
+
+class TenantCache:
+    """LRU cache of sheet DataFrames partitioned per tenant.
+
+    Entries are evicted least-recently-used first, within a tenant once it
+    exceeds ``max_bytes_per_tenant`` and across all tenants once the total
+    exceeds ``max_bytes``. Either limit may be None for no limit.
+    """
+
+    def __init__(self, max_bytes=None, max_bytes_per_tenant=None):
+        self.max_bytes = max_bytes
+        self.max_bytes_per_tenant = max_bytes_per_tenant
+        self.total_bytes = 0
+        self._entries = OrderedDict()  # (tenant_id, sheet_type) -> (value, size)
+        self._tenant_bytes = {}
+        self._partitions = {}
+        self._lock = threading.RLock()
+
+    def partition(self, tenant_id):
+        """Dict-like view of one tenant's entries"""
+        with self._lock:
+            if tenant_id not in self._partitions:
+                self._partitions[tenant_id] = CachePartition(self, tenant_id)
+            return self._partitions[tenant_id]
+
+    def tenant_bytes(self, tenant_id):
+        with self._lock:
+            return self._tenant_bytes.get(tenant_id, 0)
+
+    def get(self, tenant_id, sheet_type):
+        with self._lock:
+            entry = self._entries.get((tenant_id, sheet_type))
+            if entry is None:
+                return None
+            self._entries.move_to_end((tenant_id, sheet_type))
+            return entry[0]
+
+    def put(self, tenant_id, sheet_type, value):
+        key = (tenant_id, sheet_type)
+        size = frame_size(value)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, size)
+            self._tenant_bytes[tenant_id] = self._tenant_bytes.get(tenant_id, 0) + size
+            self.total_bytes += size
+            evicted = self._evict(key)
+        self._notify(evicted)
+
+    def pop(self, tenant_id, sheet_type):
+        with self._lock:
+            entry = self._remove((tenant_id, sheet_type))
+        return entry[0] if entry else None
+
+    def items(self, tenant_id):
+        """Consistent list of a tenant's entries; does not count as a use"""
+        with self._lock:
+            return [(key[1], entry[0]) for key, entry in self._entries.items() if key[0] == tenant_id]
+
+    def keys(self, tenant_id):
+        with self._lock:
+            return [sheet_type for tenant, sheet_type in self._entries if tenant == tenant_id]
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._tenant_bytes[key[0]] -= entry[1]
+            self.total_bytes -= entry[1]
+        return entry
+
+    def _evict(self, keep):
+        """Drop LRU entries until both limits hold; never drops ``keep``"""
+        evicted = []
+        tenant_id = keep[0]
+        if self.max_bytes_per_tenant is not None:
+            for key in [k for k in self._entries if k[0] == tenant_id and k != keep]:
+                if self._tenant_bytes[tenant_id] <= self.max_bytes_per_tenant:
+                    break
+                self._remove(key)
+                evicted.append(key)
+        if self.max_bytes is not None:
+            for key in [k for k in self._entries if k != keep]:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self._remove(key)
+                evicted.append(key)
+        return evicted
+
+    def _notify(self, evicted):
+        for tenant_id, sheet_type in evicted:
+            partition = self._partitions.get(tenant_id)
+            if partition is not None and partition.on_evict is not None:
+                partition.on_evict(sheet_type)
+
+
+class CachePartition(MutableMapping):
+    """One tenant's slice of a TenantCache, usable wherever a dict cache is"""
+
+    def __init__(self, cache, tenant_id):
+        self.cache = cache
+        self.tenant_id = tenant_id
+        # Optional callback(sheet_type) run after an entry is evicted
+        self.on_evict = None
+
+    def __getitem__(self, sheet_type):
+        value = self.cache.get(self.tenant_id, sheet_type)
+        if value is None:
+            raise KeyError(sheet_type)
+        return value
+
+    def __setitem__(self, sheet_type, value):
+        self.cache.put(self.tenant_id, sheet_type, value)
+
+    def __delitem__(self, sheet_type):
+        if self.cache.pop(self.tenant_id, sheet_type) is None:
+            raise KeyError(sheet_type)
+
+    def __iter__(self):
+        return iter(self.cache.keys(self.tenant_id))
+
+    def __len__(self):
+        return len(self.cache.keys(self.tenant_id))
+
+    # items() and pop() are answered by the cache in one locked step, since
+    # another tenant can evict an entry between the mixin's separate calls
+    def items(self):
+        return self.cache.items(self.tenant_id)
+
+    def pop(self, sheet_type, *default):
+        value = self.cache.pop(self.tenant_id, sheet_type)
+        if value is None:
+            if default:
+                return default[0]
+            raise KeyError(sheet_type)
+        return value
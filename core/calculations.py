@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+from datetime import date
+from core.valuation import value_portfolio, valuation_totals
+
+
+def _numeric(data, column):
+    """Column as floats, treating blanks and bad values as zero"""
+    if data.empty or column not in data.columns:
+        return pd.Series(0.0, index=data.index)
+    return pd.to_numeric(data[column], errors='coerce').fillna(0.0)
+
+
+def dashboard_metrics(mf_data, sip_data, fd_rd_data, monthly_data):
+    """Headline numbers shown on the dashboard"""
+    return {
+        'total_monthly_investment': float(_numeric(monthly_data, 'amount').sum()),
+        'active_sips': int((sip_data['status'] == 'Active').sum()) if 'status' in sip_data.columns else 0,
+        'total_fd_rd': float(_numeric(fd_rd_data, 'amount').sum()),
+        'total_mf_count': len(mf_data)
+    }
+
+
+def monthly_trend(monthly_data):
+    """Invested amount per calendar month, indexed by 'YYYY-MM'"""
+    if monthly_data.empty:
+        return pd.Series(dtype=float)
+    months = pd.to_datetime(monthly_data['date']).dt.to_period('M')
+    summary = _numeric(monthly_data, 'amount').groupby(months).sum()
+    summary.index = summary.index.astype(str)
+    return summary
+
+
+def allocation(monthly_data, by='type'):
+    """Invested amount grouped by a column such as 'type' or 'category'"""
+    if monthly_data.empty or by not in monthly_data.columns:
+        return pd.Series(dtype=float)
+    return _numeric(monthly_data, 'amount').groupby(monthly_data[by]).sum()
+
+
+def maturity_values(types, principals, rates, start_dates, maturity_dates):
+    """Estimated maturity values for FDs (annual compounding) and RDs (monthly)"""
+    types = np.asarray(types)
+    principals = np.asarray(principals, dtype=float)
+    rates = np.asarray(rates, dtype=float)
+    days = (pd.to_datetime(pd.Series(maturity_dates)) - pd.to_datetime(pd.Series(start_dates))).dt.days
+    years = days.to_numpy(dtype=float) / 365.25
+    months = years * 12
+
+    fd_value = principals * (1 + rates / 100) ** years
+    rd_value = principals * months * (1 + rates / 100 / 12) ** months
+    return np.where(types == 'FD', fd_value, rd_value)
+
+
+def fd_rd_maturity_value(investment_type, principal, rate, start_date, maturity_date):
+    """Estimated maturity value of a single FD or RD"""
+    return float(maturity_values([investment_type], [principal], [rate], [start_date], [maturity_date])[0])
+
+
+def fd_rd_maturity_table(fd_rd_data):
+    """Maturity value for every FD/RD row"""
+    if fd_rd_data.empty:
+        return pd.Series(dtype=float)
+    values = maturity_values(
+        fd_rd_data['type'],
+        _numeric(fd_rd_data, 'amount'),
+        _numeric(fd_rd_data, 'interest_rate'),
+        fd_rd_data['start_date'],
+        fd_rd_data['maturity_date']
+    )
+    return pd.Series(values, index=fd_rd_data.index)
+
+
+def months_to_target(target_amount, current_amount, monthly_investment, expected_return):
+    """Months until current savings plus monthly investments reach the target.
+
+    Solves current * g**n + monthly * (g**n - 1) / r = target for n, where
+    r is the monthly return and g = 1 + r. Returns NaN where the target can
+    never be reached and 0 where it already has been.
+    """
+    target_amount = np.asarray(target_amount, dtype=float)
+    current_amount = np.asarray(current_amount, dtype=float)
+    monthly_investment = np.asarray(monthly_investment, dtype=float)
+    r = np.asarray(expected_return, dtype=float) / 100 / 12
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (target_amount * r + monthly_investment) / (current_amount * r + monthly_investment)
+        months = np.log(growth) / np.log1p(r)
+    months = np.where(current_amount >= target_amount, 0.0, months)
+    return np.where(np.isfinite(months) & (r > 0), months, np.nan)
+
+
+def plan_progress(target_amount, current_amount, monthly_investment, expected_return, today=None):
+    """Progress towards a single financial plan and its projected completion"""
+    row = plan_progress_table(pd.DataFrame([{
+        'target_amount': target_amount,
+        'current_amount': current_amount,
+        'monthly_investment': monthly_investment,
+        'expected_return': expected_return
+    }]), today).iloc[0]
+    return {
+        'progress_percentage': float(row['progress_percentage']),
+        'completion_date': None if pd.isna(row['completion_date']) else row['completion_date'].date()
+    }
+
+
+def plan_progress_table(plans_data, today=None):
+    """Progress percentage and projected completion for every plan.
+
+    A completion date is only projected for plans that are still being
+    invested in at a positive expected return.
+    """
+    if plans_data.empty:
+        return pd.DataFrame(columns=['progress_percentage', 'months_to_complete', 'completion_date'])
+    target = _numeric(plans_data, 'target_amount')
+    current = _numeric(plans_data, 'current_amount')
+    monthly = _numeric(plans_data, 'monthly_investment')
+    months = months_to_target(target, current, monthly, _numeric(plans_data, 'expected_return'))
+    months = np.where(monthly > 0, months, np.nan)
+    start = pd.Timestamp(today or date.today())
+    completion = start + pd.to_timedelta(months * 30, unit='D')
+    return pd.DataFrame({
+        'progress_percentage': np.where(target > 0, current / target.where(target > 0) * 100, 0.0),
+        'months_to_complete': months,
+        'completion_date': completion.normalize()
+    }, index=plans_data.index)
+
+
+def lump_sum_returns(initial_investment, current_value, investment_period, additional_investments=0.0):
+    """Absolute return and CAGR of a lump-sum investment"""
+    total_investment = initial_investment + additional_investments
+    absolute_return = current_value - total_investment
+    absolute_return_pct = (absolute_return / total_investment) * 100
+    if investment_period > 0:
+        cagr = ((current_value / total_investment) ** (1 / investment_period) - 1) * 100
+    else:
+        cagr = 0
+    return {
+        'total_investment': total_investment,
+        'absolute_return': absolute_return,
+        'absolute_return_pct': absolute_return_pct,
+        'cagr': cagr
+    }
+
+
+def sip_projection(sip_amount, duration_years, expected_return, step_up=0.0):
+    """Year-by-year projection of a step-up SIP.
+
+    Each year's instalments are grown to the end of the SIP at the monthly
+    expected return. Returns a DataFrame with the cumulative investment and
+    the projected value after each year.
+    """
+    years = np.arange(1, int(duration_years) + 1)
+    monthly_return = expected_return / 100 / 12
+    yearly_investment = sip_amount * (1 + step_up / 100) ** (years - 1) * 12
+    remaining_months = (duration_years - years + 1) * 12
+    if monthly_return > 0:
+        yearly_value = yearly_investment * ((1 + monthly_return) ** remaining_months - 1) / monthly_return
+    else:
+        yearly_value = yearly_investment
+    return pd.DataFrame({
+        'year': years,
+        'cumulative_investment': np.cumsum(yearly_investment),
+        'projected_value': np.cumsum(yearly_value)
+    })
+
+
+# The sheets portfolio_report reads
+REPORT_SHEETS = ['MUTUAL_FUNDS', 'SIPS', 'FD_RD', 'FINANCIAL_PLANS', 'MONTHLY_INVESTMENTS', 'TRANSACTIONS']
+
+
+def portfolio_report(frames, today=None):
+    """JSON-serializable summary of one portfolio's sheets"""
+    empty = pd.DataFrame()
+    mf_data = frames.get('MUTUAL_FUNDS', empty)
+    sip_data = frames.get('SIPS', empty)
+    fd_rd_data = frames.get('FD_RD', empty)
+    plans_data = frames.get('FINANCIAL_PLANS', empty)
+    monthly_data = frames.get('MONTHLY_INVESTMENTS', empty)
+    transactions = frames.get('TRANSACTIONS', empty)
+
+    progress = plan_progress_table(plans_data, today)
+    plans = []
+    for row_index, row in progress.iterrows():
+        plans.append({
+            'name': plans_data.loc[row_index].get('name', ''),
+            'progress_percentage': round(float(row['progress_percentage']), 2),
+            'completion_date': None if pd.isna(row['completion_date'])
+            else row['completion_date'].strftime("%Y-%m-%d")
+        })
+
+    return {
+        'generated_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'metrics': dashboard_metrics(mf_data, sip_data, fd_rd_data, monthly_data),
+        'fd_rd_maturity_value': float(np.nansum(fd_rd_maturity_table(fd_rd_data))),
+        'monthly_trend': {month: float(amount) for month, amount in monthly_trend(monthly_data).items()},
+        'allocation': {str(k): float(v) for k, v in allocation(monthly_data).items()},
+        'valuation': valuation_totals(value_portfolio(transactions, mf_data, today)),
+        'plans': plans
+    }
@@ -0,0 +1,153 @@
+"""Plotly figures built once per distinct input and downsampled to a point budget.
+
+Figures are cached under a hash of the data they are drawn from, so a
+rerun with unchanged data reuses the built figure instead of going through
+plotly express again. Line series longer than the point budget are reduced
+with Largest-Triangle-Three-Buckets (LTTB), which keeps the peaks, troughs
+and overall shape while bounding the payload sent to the browser.
+
+Cached figures are shared between reruns and sessions: callers must not
+mutate them.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from config import CHART_MAX_POINTS
+
+FIGURE_CACHE_SIZE = 128
+
+
+def lttb_indices(x, y, max_points):
+    """Indices of the points LTTB keeps; all of them when within budget.
+
+    x must be numeric and increasing. The first and last points are always
+    kept; every bucket in between contributes the point forming the largest
+    triangle with the previously kept point and the next bucket's average.
+    """
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    # Running sums give every bucket's average in O(1)
+    cum_x = np.concatenate([[0.0], np.cumsum(x)])
+    cum_y = np.concatenate([[0.0], np.cumsum(y)])
+
+    kept = np.empty(max_points, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_start = end if next_end > end else n - 1
+        count = max(next_end - next_start, 1)
+        avg_x = (cum_x[next_start + count] - cum_x[next_start]) / count
+        avg_y = (cum_y[next_start + count] - cum_y[next_start]) / count
+
+        # Twice the triangle area, up to sign, for every candidate at once
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        kept[bucket + 1] = previous
+    return kept
+
+
+def downsample(x, y, max_points=CHART_MAX_POINTS):
+    """x and y reduced to at most max_points with LTTB"""
+    x = pd.Series(x).reset_index(drop=True)
+    y = pd.Series(y).reset_index(drop=True)
+    if len(y) <= max_points:
+        return x, y
+    if pd.api.types.is_datetime64_any_dtype(x):
+        positions = x.astype('int64').to_numpy()
+    elif pd.api.types.is_numeric_dtype(x):
+        positions = x.to_numpy()
+    else:
+        # Categorical labels such as 'YYYY-MM' are evenly spaced
+        positions = np.arange(len(x))
+    kept = lttb_indices(positions, y.fillna(0.0).to_numpy(), max_points)
+    return x.iloc[kept], y.iloc[kept]
+
+
+def data_key(*parts):
+    """Stable hash of DataFrames, Series and plain values"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).to_numpy().tobytes())
+            columns = part.columns if isinstance(part, pd.DataFrame) else [part.name]
+            digest.update(repr(list(columns)).encode())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """Bounded LRU of built figures keyed by data_key"""
+
+    def __init__(self, max_entries=FIGURE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            figure = self._figures.get(key)
+            if figure is not None:
+                self._figures.move_to_end(key)
+                return figure
+
+        figure = build()
+        with self._lock:
+            self._figures[key] = figure
+            while len(self._figures) > self.max_entries:
+                self._figures.popitem(last=False)
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+
+
+figure_cache = FigureCache()
+
+
+def line_chart(series, title, labels, max_points=CHART_MAX_POINTS):
+    """Line of a Series against its index"""
+    def build():
+        x, y = downsample(series.index.to_series(), series, max_points)
+        return px.line(x=x.to_numpy(), y=y.to_numpy(), title=title, labels=labels)
+
+    return figure_cache.get_or_build(data_key('line', series, title, labels, max_points), build)
+
+
+def pie_chart(series, title):
+    """Pie of a Series' values named by its index"""
+    def build():
+        return px.pie(values=series.values, names=series.index, title=title)
+
+    return figure_cache.get_or_build(data_key('pie', series, title), build)
+
+
+def multi_line_chart(data, x, traces, title, xaxis_title, yaxis_title, max_points=CHART_MAX_POINTS):
+    """One line per (column, name, color) in traces, sharing the x column"""
+    def build():
+        fig = go.Figure()
+        for column, name, color in traces:
+            xs, ys = downsample(data[x], data[column], max_points)
+            fig.add_trace(go.Scatter(x=xs, y=ys, name=name, line=dict(color=color)))
+        fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title, hovermode='x unified')
+        return fig
+
+    key = data_key('lines', data[[x] + [column for column, _, _ in traces]], traces, title,
+                   xaxis_title, yaxis_title, max_points)
+    return figure_cache.get_or_build(key, build)
@@ -0,0 +1,289 @@
+"""Append-only journal of sheet mutations for point-in-time reads.
+
+Every write made through GoogleSheetsManager is appended as one JSON line
+to ``events.jsonl``. Checkpoints hold a sheet's full contents at a known
+byte offset of that log, so a sheet as of any time is rebuilt from the
+nearest earlier checkpoint plus only the events logged after it.
+
+Checkpoints are taken:
+  - by the manager when the journal is attached, from freshly fetched rows;
+  - once ``checkpoint_bytes`` of log has been written since a sheet's last
+    checkpoint, whichever sheets that log was for, by replaying the log
+    (compaction, no API calls);
+  - on demand with ``checkpoint``, e.g. from a nightly job, which also
+    captures edits made directly in Google Sheets.
+
+The app, batch jobs and any number of processes may share a directory:
+appends and checkpoints happen under a file lock, which also assigns
+timestamps, so the log is always in timestamp order. Readers skip a last
+line that is still being written.
+
+Frames are raw sheet rows: soft-deleted rows stay in place, flagged in
+TOMBSTONE_COLUMN, so row positions in events stay meaningful.
+"""
+import json
+import os
+import pickle
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from config import JOURNAL_DIR, JOURNAL_CHECKPOINT_BYTES, TOMBSTONE_COLUMN
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+EVENTS_FILE = 'events.jsonl'
+CHECKPOINT_INDEX = 'checkpoints.jsonl'
+CHECKPOINT_DIR = 'checkpoints'
+LOCK_FILE = '.lock'
+# Journal of the single-portfolio app, beside the per-tenant directories
+DEFAULT_PORTFOLIO = '_default'
+
+
+def _json_default(value):
+    """Encode the numpy and pandas scalars found in sheet rows"""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def portfolio_dir(journal_dir=JOURNAL_DIR, name=None):
+    """Journal directory of one portfolio; None when journaling is off"""
+    if not journal_dir:
+        return None
+    return os.path.join(journal_dir, name or DEFAULT_PORTFOLIO)
+
+
+def _lock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f, fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _complete_lines(f):
+    """Lines of a log opened in binary mode, without a trailing partial line"""
+    for line in f:
+        if not line.endswith(b'\n'):
+            return
+        yield line
+
+
+def _last_line(f, chunk=4096):
+    """Last complete line of a log opened in binary mode, however long; None if there is none"""
+    position = f.seek(0, os.SEEK_END)
+    buffer = b''
+    while position > 0:
+        step = min(chunk, position)
+        position -= step
+        f.seek(position)
+        buffer = f.read(step) + buffer
+        lines = buffer.split(b'\n')
+        # lines[-1] follows the last newline; lines[-2] is only whole once
+        # the newline before it, or the start of the file, has been read
+        if len(lines) > 2 or (position == 0 and len(lines) == 2):
+            return lines[-2]
+        chunk *= 2
+    return None
+
+
+def _last_ts(path):
+    """Timestamp of the last complete line of a log, or None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        line = _last_line(f)
+    return datetime.fromisoformat(json.loads(line)['ts']) if line else None
+
+
+def apply_event(data, event):
+    """Sheet rows after one journaled mutation"""
+    op = event['op']
+    if op == 'write':
+        return pd.DataFrame(event['rows'], columns=event['columns'])
+    if op == 'append':
+        rows = [
+            dict(zip(data.columns, row)) if isinstance(row, list) else row
+            for row in event['rows']
+        ]
+        return pd.concat([data, pd.DataFrame(rows)], ignore_index=True)
+    if op == 'update':
+        data = data.copy()
+        for column, value in event['values'].items():
+            if column not in data.columns:
+                data[column] = ''
+            data[column] = data[column].astype(object)
+            if event['row'] in data.index:
+                data.loc[event['row'], column] = value
+        return data
+    if op == 'delete':
+        return data.drop(index=event['rows'], errors='ignore').reset_index(drop=True)
+    if op == 'soft_delete':
+        data = data.copy()
+        if TOMBSTONE_COLUMN not in data.columns:
+            data[TOMBSTONE_COLUMN] = ''
+        data[TOMBSTONE_COLUMN] = data[TOMBSTONE_COLUMN].astype(object)
+        data.loc[data.index.intersection(event['rows']), TOMBSTONE_COLUMN] = 'TRUE'
+        return data
+    raise ValueError(f"Unknown journal event: {op}")
+
+
+class Journal:
+    """Event log plus checkpoints for one portfolio; disabled when directory is None"""
+
+    def __init__(self, directory=portfolio_dir(), checkpoint_bytes=JOURNAL_CHECKPOINT_BYTES):
+        self.directory = directory
+        self.checkpoint_bytes = checkpoint_bytes
+        self._lock = threading.Lock()
+        self._index = {}
+        self._index_pos = 0
+
+    @property
+    def enabled(self):
+        return bool(self.directory)
+
+    def _path(self, *parts):
+        return os.path.join(self.directory, *parts)
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive access to the log across threads and processes"""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(LOCK_FILE), 'a+b') as f:
+                _lock_file(f)
+                try:
+                    yield
+                finally:
+                    _unlock_file(f)
+
+    def _checkpoints(self):
+        """{sheet_type: [checkpoint entries in log order]}, including other writers' new entries"""
+        path = self._path(CHECKPOINT_INDEX)
+        if os.path.exists(path) and os.path.getsize(path) > self._index_pos:
+            with open(path, 'rb') as f:
+                f.seek(self._index_pos)
+                for line in _complete_lines(f):
+                    self._index_pos += len(line)
+                    entry = json.loads(line)
+                    self._index.setdefault(entry['sheet'], []).append(entry)
+        return self._index
+
+    def _now(self):
+        # Called under the file lock: never earlier than anything already
+        # logged by any writer, so the log stays sorted by timestamp
+        now = datetime.now()
+        for path in (self._path(EVENTS_FILE), self._path(CHECKPOINT_INDEX)):
+            last = _last_ts(path)
+            if last and now < last:
+                now = last
+        return now
+
+    def has_checkpoint(self, sheet_type):
+        if not self.enabled:
+            return True
+        with self._lock:
+            return bool(self._checkpoints().get(sheet_type))
+
+    def record(self, sheet_type, op, **payload):
+        """Append one mutation to the log, compacting every sheet once enough log follows its checkpoint"""
+        if not self.enabled:
+            return
+        with self._locked():
+            event = {'ts': self._now().isoformat(), 'sheet': sheet_type, 'op': op, **payload}
+            with open(self._path(EVENTS_FILE), 'a') as f:
+                f.write(json.dumps(event, default=_json_default) + '\n')
+            logged = os.path.getsize(self._path(EVENTS_FILE))
+            # Rarely written sheets are compacted too, so no read replays
+            # more than checkpoint_bytes of log whichever sheet it is for
+            behind = [
+                sheet for sheet, checkpoints in self._checkpoints().items()
+                if logged - checkpoints[-1]['offset'] >= self.checkpoint_bytes
+            ]
+            for sheet in behind:
+                # Replay and checkpoint under one lock so no event slips between them
+                data = self._replay(sheet, pd.Timestamp.max)
+                if data is not None:
+                    self._write_checkpoint(sheet, data)
+
+    def checkpoint(self, sheet_type, data):
+        """Record the sheet's full rows as of now"""
+        if not self.enabled:
+            return
+        with self._locked():
+            self._write_checkpoint(sheet_type, data)
+
+    def as_of(self, sheet_type, when=None):
+        """Raw rows of a sheet at a point in time; None if the journal has no history that early"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            return self._replay(sheet_type, pd.Timestamp(when) if when is not None else pd.Timestamp.max)
+
+    def _write_checkpoint(self, sheet_type, data):
+        os.makedirs(self._path(CHECKPOINT_DIR), exist_ok=True)
+        events_path = self._path(EVENTS_FILE)
+        offset = os.path.getsize(events_path) if os.path.exists(events_path) else 0
+        ts = self._now()
+        file_name = f"{sheet_type}-{ts.strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}.pkl"
+
+        fd, tmp_path = tempfile.mkstemp(dir=self._path(CHECKPOINT_DIR), prefix='.checkpoint-')
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(CHECKPOINT_DIR, file_name))
+
+        # The pickle is in place before the index names it, so readers in
+        # other processes never see an entry without its file
+        entry = {'sheet': sheet_type, 'ts': ts.isoformat(), 'offset': offset, 'file': file_name}
+        with open(self._path(CHECKPOINT_INDEX), 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+        self._checkpoints()
+
+    def _replay(self, sheet_type, when):
+        """Nearest checkpoint at or before ``when`` plus the events logged after it"""
+        candidates = [
+            entry for entry in self._checkpoints().get(sheet_type, [])
+            if pd.Timestamp(entry['ts']) <= when
+        ]
+        if not candidates:
+            return None
+
+        base = candidates[-1]
+        with open(self._path(CHECKPOINT_DIR, base['file']), 'rb') as f:
+            data = pickle.load(f)
+
+        events_path = self._path(EVENTS_FILE)
+        if not os.path.exists(events_path):
+            return data
+        with open(events_path, 'rb') as f:
+            f.seek(base['offset'])
+            for line in _complete_lines(f):
+                event = json.loads(line)
+                # Timestamps are assigned under the file lock, so every
+                # later event is later still
+                if pd.Timestamp(event['ts']) > when:
+                    break
+                if event['sheet'] == sheet_type:
+                    data = apply_event(data, event)
+        return data
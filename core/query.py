@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+# Hot columns per sheet: categorical columns get a value -> rows index and
+# the date column is pre-sorted so date ranges are two binary searches.
+INDEXED_COLUMNS = {
+    'MUTUAL_FUNDS': {
+        'categorical': ['category', 'risk_level', 'fund_house'],
+        'date': 'date_added'
+    },
+    'SIPS': {
+        'categorical': ['status', 'frequency'],
+        'date': 'start_date'
+    },
+    'FD_RD': {
+        'categorical': ['status', 'type', 'bank'],
+        'date': 'maturity_date'
+    },
+    'FINANCIAL_PLANS': {
+        'categorical': ['status', 'type', 'priority'],
+        'date': 'target_date'
+    },
+    'MONTHLY_INVESTMENTS': {
+        'categorical': ['type', 'category'],
+        'date': 'date'
+    },
+    'TRANSACTIONS': {
+        'categorical': ['fund_id', 'type'],
+        'date': 'date'
+    },
+    'NAV_HISTORY': {
+        'categorical': ['fund_id'],
+        'date': 'date'
+    }
+}
+
+
+class TableIndex:
+    """Precomputed lookup structures over one cached DataFrame"""
+
+    def __init__(self, data, categorical=(), date_column=None):
+        self.data = data
+        self.size = len(data)
+        self._sort_orders = {}
+
+        # column -> {value: positional rows holding that value}
+        self.categorical = {}
+        for column in categorical:
+            if column not in data.columns:
+                continue
+            codes, uniques = pd.factorize(data[column].astype(str))
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self.categorical[column] = {
+                value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(uniques)
+            }
+
+        self.date_column = date_column if date_column in data.columns else None
+        if self.date_column:
+            dates = pd.to_datetime(data[self.date_column], errors='coerce').to_numpy()
+            # NaT sorts last, so unparseable dates never fall inside a range
+            self._date_order = np.argsort(dates, kind='stable')
+            self._sorted_dates = dates[self._date_order]
+            self._dated_rows = int(np.count_nonzero(~np.isnat(dates)))
+
+        # Lower-cased concatenation of the text columns for substring search
+        text_columns = [c for c in data.columns if not pd.api.types.is_numeric_dtype(data[c])]
+        if self.size and text_columns:
+            text = data[text_columns[0]].astype(str).str.lower()
+            for column in text_columns[1:]:
+                text = text + '\x1f' + data[column].astype(str).str.lower()
+            self._text = text.reset_index(drop=True)
+        else:
+            self._text = pd.Series([''] * self.size, dtype=object)
+
+    @classmethod
+    def for_sheet(cls, sheet_type, data):
+        """Build the index using the hot columns configured for a sheet"""
+        columns = INDEXED_COLUMNS.get(sheet_type, {})
+        return cls(data, columns.get('categorical', ()), columns.get('date'))
+
+    def values(self, column):
+        """Distinct values of an indexed column, sorted for display"""
+        return sorted(self.categorical.get(column, {}))
+
+    def match_values(self, column, values):
+        """Boolean row mask for rows whose column is one of the values"""
+        mask = np.zeros(self.size, dtype=bool)
+        if column in self.categorical:
+            for value in values:
+                mask[self.categorical[column].get(str(value), [])] = True
+        elif column in self.data.columns:
+            mask = self.data[column].astype(str).isin([str(v) for v in values]).to_numpy()
+        return mask
+
+    def match_date_range(self, start=None, end=None):
+        """Boolean row mask for rows whose date column lies in [start, end]"""
+        mask = np.zeros(self.size, dtype=bool)
+        if not self.date_column:
+            return ~mask
+        dated = self._sorted_dates[:self._dated_rows]
+        lo = 0 if start is None else np.searchsorted(dated, np.datetime64(pd.Timestamp(start)), side='left')
+        hi = len(dated) if end is None else np.searchsorted(dated, np.datetime64(pd.Timestamp(end)), side='right')
+        mask[self._date_order[lo:hi]] = True
+        return mask
+
+    def match_text(self, search):
+        """Boolean row mask for a case-insensitive substring search"""
+        return self._text.str.contains(search.lower(), regex=False).to_numpy()
+
+    def sort_order(self, column):
+        """Stable positional order of the rows by a column, computed once"""
+        if column not in self._sort_orders:
+            values = self.data[column]
+            numeric = pd.to_numeric(values, errors='coerce')
+            non_blank = values.astype(str).str.strip() != ''
+            if numeric[non_blank].notna().all():
+                key = numeric.to_numpy(dtype=float)
+            else:
+                key = values.astype(str).str.lower().to_numpy()
+            self._sort_orders[column] = np.argsort(key, kind='stable')
+        return self._sort_orders[column]
+
+
+def query_table(index, filters=None, date_range=None, search=None,
+                sort_by=None, ascending=True, page=1, page_size=50):
+    """Filter, sort and slice an indexed table.
+
+    Returns the requested page as a DataFrame (keeping the original row
+    labels, so they can still be passed to update/delete) together with the
+    number of rows that matched before paging.
+    """
+    mask = np.ones(index.size, dtype=bool)
+
+    for column, values in (filters or {}).items():
+        if values:
+            mask &= index.match_values(column, values)
+
+    if date_range:
+        start, end = date_range
+        mask &= index.match_date_range(start, end)
+
+    if search:
+        mask &= index.match_text(search)
+
+    if sort_by and sort_by in index.data.columns:
+        order = index.sort_order(sort_by)
+        positions = order[mask[order]]
+        if not ascending:
+            positions = positions[::-1]
+    else:
+        positions = np.flatnonzero(mask)
+
+    total = len(positions)
+    start = max(page - 1, 0) * page_size
+    return index.data.iloc[positions[start:start + page_size]], total
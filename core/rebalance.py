@@ -0,0 +1,183 @@
+"""Asset-allocation drift and rebalancing trades.
+
+The current allocation is the invested amount per MONTHLY_INVESTMENTS
+category. The target allocation blends the mixes of the active financial
+plans, weighted by priority and target amount. A plan's mix comes from
+optional 'target_equity', 'target_debt', 'target_hybrid' and
+'target_commodity' percentage columns; plans without them get the
+equity/debt split whose long-run return matches their expected_return
+and no target for the other classes.
+
+A class that no plan gives a target is held: it keeps its current value,
+is left out of drift and trades, and the targeted classes share the rest
+of the portfolio.
+
+The solver works on (portfolios x asset classes) matrices so any number of
+portfolios is rebalanced in one call.
+"""
+import numpy as np
+import pandas as pd
+
+ASSET_CLASSES = ['Equity', 'Debt', 'Hybrid', 'Commodity']
+
+# Long-run return assumptions (%) used to derive a mix from expected_return
+CLASS_RETURNS = {'Equity': 12.0, 'Debt': 7.0}
+PRIORITY_WEIGHTS = {'High': 3.0, 'Medium': 2.0, 'Low': 1.0}
+
+
+def current_allocation(monthly_data):
+    """Invested amount per asset class"""
+    if monthly_data.empty or 'category' not in monthly_data:
+        return pd.Series(0.0, index=ASSET_CLASSES)
+    amounts = pd.to_numeric(monthly_data['amount'], errors='coerce').fillna(0.0)
+    return amounts.groupby(monthly_data['category']).sum().reindex(ASSET_CLASSES, fill_value=0.0)
+
+
+def plan_target_weights(plans_data):
+    """Target mix per plan as a (plans x asset classes) DataFrame of fractions; NaN for no target"""
+    equity_return, debt_return = CLASS_RETURNS['Equity'], CLASS_RETURNS['Debt']
+    if 'expected_return' in plans_data:
+        expected = pd.to_numeric(plans_data['expected_return'], errors='coerce')
+    else:
+        expected = pd.Series(np.nan, index=plans_data.index)
+    equity = ((expected - debt_return) / (equity_return - debt_return)).clip(0, 1).fillna(0.5)
+    weights = pd.DataFrame(np.nan, index=plans_data.index, columns=ASSET_CLASSES)
+    weights['Equity'] = equity
+    weights['Debt'] = 1 - equity
+
+    explicit_columns = {f"target_{c.lower()}": c for c in ASSET_CLASSES}
+    present = [column for column in explicit_columns if column in plans_data]
+    if present:
+        explicit = plans_data[present].apply(pd.to_numeric, errors='coerce').rename(columns=explicit_columns)
+        explicit = explicit.reindex(columns=ASSET_CLASSES).fillna(0.0)
+        totals = explicit.sum(axis=1)
+        has_mix = totals > 0
+        weights.loc[has_mix] = explicit.loc[has_mix].div(totals[has_mix], axis=0)
+    return weights
+
+
+def target_allocation(plans_data):
+    """Portfolio target mix: active plans blended by priority x target amount"""
+    if plans_data.empty:
+        return pd.Series(np.nan, index=ASSET_CLASSES)
+    plans = plans_data[plans_data['status'] == 'Active'] if 'status' in plans_data else plans_data
+    if plans.empty:
+        return pd.Series(np.nan, index=ASSET_CLASSES)
+
+    priority = plans['priority'].map(PRIORITY_WEIGHTS).fillna(1.0) if 'priority' in plans \
+        else pd.Series(1.0, index=plans.index)
+    amount = pd.to_numeric(plans['target_amount'], errors='coerce').fillna(0.0) if 'target_amount' in plans \
+        else pd.Series(1.0, index=plans.index)
+    plan_weight = priority * amount
+    if plan_weight.sum() <= 0:
+        plan_weight = priority
+    # A class stays NaN (held) only when no plan targets it
+    return plan_target_weights(plans).mul(plan_weight, axis=0).sum(min_count=1) / plan_weight.sum()
+
+
+def _water_fill(current, target, cash):
+    """Buy-only trades that spend ``cash`` lifting the most underweight classes first.
+
+    Finds per portfolio the level L with sum(max(0, w*L - c)) == cash, so
+    every bought class ends exactly at weight w of the level and nothing is
+    sold. Vectorized over portfolios by sorting each row by c/w.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(target > 0, current / target, np.inf)
+    order = np.argsort(ratio, axis=1)
+    sorted_ratio = np.take_along_axis(ratio, order, axis=1)
+    cum_weight = np.cumsum(np.take_along_axis(target, order, axis=1), axis=1)
+    cum_current = np.cumsum(np.take_along_axis(current, order, axis=1), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        levels = (cash[:, None] + cum_current) / cum_weight
+        filled = np.maximum((sorted_ratio <= levels).sum(axis=1), 1)
+        level = np.take_along_axis(levels, (filled - 1)[:, None], axis=1)
+        return np.nan_to_num(np.maximum(target * level - current, 0.0))
+
+
+def effective_targets(current, target, cash=0.0):
+    """Target weights over the whole portfolio after new cash.
+
+    Classes with a NaN target are held at their current value; the
+    targeted classes split the rest (and all new cash) in their target
+    proportions.
+    """
+    current = np.asarray(current, dtype=float)
+    target = np.asarray(target, dtype=float)
+    cash = np.broadcast_to(np.asarray(cash, dtype=float), (current.shape[0],))
+    held = np.isnan(target)
+    total = current.sum(axis=1) + cash
+    managed = total - np.where(held, current, 0.0).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(total > 0, managed / total, 0.0)[:, None]
+        held_weight = np.where(total[:, None] > 0, current / total[:, None], 0.0)
+    return np.where(held, held_weight, np.nan_to_num(target) * scale)
+
+
+def solve_trades(current, target, cash=0.0, band=0.05, allow_sell=True, min_trade=0.0):
+    """Buy (+) / sell (-) amounts per portfolio and asset class.
+
+    current: (P, K) current values; target: (P, K) target weights, rows
+    summing to 1 over the classes that have one (NaN marks a held class,
+    which is never traded). Portfolios whose every class is within ``band`` of its
+    target weight are left alone apart from investing new ``cash``; the
+    rest are moved exactly onto target, which is the smallest set of trades
+    that reaches it. With allow_sell=False only new cash is allocated.
+    Trades smaller than ``min_trade`` are dropped.
+    """
+    current = np.asarray(current, dtype=float)
+    cash = np.broadcast_to(np.asarray(cash, dtype=float), (current.shape[0],))
+    untargeted = np.nan_to_num(np.asarray(target, dtype=float)).sum(axis=1) <= 0
+    target = effective_targets(current, target, cash)
+
+    total = current.sum(axis=1) + cash
+    with np.errstate(divide='ignore', invalid='ignore'):
+        current_weight = np.where(total[:, None] > 0, current / total[:, None], 0.0)
+    drifted = np.abs(current_weight - target).max(axis=1) > band
+
+    full = target * total[:, None] - current
+    buy_only = _water_fill(current, target, cash)
+    trades = np.where((drifted & allow_sell)[:, None], full, buy_only)
+    trades[untargeted] = 0.0
+    trades[np.abs(trades) < min_trade] = 0.0
+    return trades
+
+
+def rebalance_portfolios(currents, targets, **options):
+    """Rebalance many portfolios at once.
+
+    currents, targets: DataFrames indexed by portfolio with ASSET_CLASSES
+    columns. Returns a long DataFrame with one row per portfolio and class.
+    """
+    currents = currents.reindex(columns=ASSET_CLASSES).fillna(0.0)
+    targets = targets.reindex(index=currents.index, columns=ASSET_CLASSES)
+    trades = solve_trades(currents.to_numpy(), targets.to_numpy(dtype=float), **options)
+    # Reported as shares of the whole portfolio; held classes have none
+    held = targets.isna().to_numpy()
+    target_weights = np.where(
+        held, np.nan, effective_targets(currents.to_numpy(), targets.to_numpy(dtype=float), options.get('cash', 0.0))
+    )
+
+    values = currents.to_numpy()
+    total = values.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights = np.where(total > 0, values / total, 0.0)
+
+    portfolios, classes = values.shape
+    result = pd.DataFrame({
+        'portfolio': np.repeat(currents.index.to_numpy(), classes),
+        'asset_class': np.tile(ASSET_CLASSES, portfolios),
+        'current_value': values.ravel(),
+        'current_weight': weights.ravel(),
+        'target_weight': target_weights.ravel(),
+        'trade': trades.ravel()
+    })
+    result['drift'] = result['current_weight'] - result['target_weight']
+    return result
+
+
+def rebalance_plan(monthly_data, plans_data, **options):
+    """Drift and trades for a single portfolio, one row per asset class"""
+    currents = pd.DataFrame([current_allocation(monthly_data)], index=[0])
+    targets = pd.DataFrame([target_allocation(plans_data)], index=[0])
+    return rebalance_portfolios(currents, targets, **options).drop(columns='portfolio')
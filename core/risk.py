@@ -0,0 +1,182 @@
+"""Rolling risk analytics over per-fund NAV histories.
+
+The NAV_HISTORY sheet holds one (fund_id, date, nav) row per fund per
+day. It is pivoted into a dates x funds matrix so every metric is one
+pandas rolling call over all funds at once. Results are cached per
+(fund, window) and reused for as long as that fund's own NAV series is
+unchanged.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from core.charts import data_key
+
+TRADING_DAYS = 252
+# Annual risk-free rate (%) for Sharpe and Sortino ratios
+RISK_FREE_RATE = 6.5
+# Rolling windows offered in the UI, in trading days
+WINDOWS = {'3M': 63, '6M': 126, '1Y': 252, '3Y': 756}
+# Annualized deviations below this are rounding noise of a steady NAV, not risk
+DEVIATION_EPSILON = 1e-10
+
+ROLLING_METRICS = ['rolling_return', 'volatility', 'sharpe', 'sortino', 'drawdown']
+SUMMARY_COLUMNS = ['fund_id', 'rolling_return', 'volatility', 'sharpe', 'sortino', 'max_drawdown', 'observations']
+
+
+def nav_matrix(nav_history):
+    """Dates x funds NAV matrix, gaps inside each fund's history forward-filled"""
+    if nav_history.empty:
+        return pd.DataFrame()
+    navs = pd.DataFrame({
+        'fund_id': nav_history['fund_id'].astype(str),
+        'date': pd.to_datetime(nav_history['date'], errors='coerce'),
+        'nav': pd.to_numeric(nav_history['nav'], errors='coerce')
+    }).dropna()
+    navs = navs[navs['nav'] > 0].drop_duplicates(['date', 'fund_id'], keep='last')
+    matrix = navs.pivot(index='date', columns='fund_id', values='nav').sort_index()
+    # Fill holidays between a fund's first and last NAV, never past either end
+    return matrix.ffill(limit_area='inside')
+
+
+def rolling_metrics(navs, window=TRADING_DAYS, risk_free_rate=RISK_FREE_RATE):
+    """Rolling metrics for every fund column of a NAV matrix.
+
+    Returns {metric: dates x funds DataFrame} with:
+      rolling_return - return over the trailing window, annualized
+      volatility     - annualized standard deviation of daily returns
+      sharpe/sortino - annualized excess return over total/downside deviation
+      drawdown       - fall from the running peak (the underwater curve)
+    """
+    returns = navs.pct_change(fill_method=None)
+    daily_rf = risk_free_rate / 100 / TRADING_DAYS
+    excess = returns - daily_rf
+
+    rolling = excess.rolling(window, min_periods=window)
+    mean_excess = rolling.mean() * TRADING_DAYS
+    volatility = returns.rolling(window, min_periods=window).std() * np.sqrt(TRADING_DAYS)
+    downside = np.sqrt(
+        excess.clip(upper=0).pow(2).rolling(window, min_periods=window).mean() * TRADING_DAYS
+    )
+    growth = navs / navs.shift(window)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'rolling_return': growth ** (TRADING_DAYS / window) - 1,
+            'volatility': volatility,
+            'sharpe': mean_excess / volatility.where(volatility > DEVIATION_EPSILON),
+            'sortino': mean_excess / downside.where(downside > DEVIATION_EPSILON),
+            'drawdown': navs / navs.cummax() - 1
+        }
+
+
+def correlation(navs, window=TRADING_DAYS):
+    """Correlation of daily returns between funds over the last window"""
+    returns = navs.pct_change(fill_method=None).iloc[-window:]
+    return returns.corr(min_periods=max(window // 2, 2))
+
+
+def _fund_fingerprints(navs):
+    """Hash of each fund's own (date, nav) observations, one uint64 per column"""
+    values = navs.to_numpy(dtype=float)
+    cells = pd.util.hash_array(values.ravel()).reshape(values.shape)
+    dates = pd.util.hash_array(navs.index.to_numpy())
+    cells = cells ^ (dates[:, None] * np.uint64(0x9E3779B97F4A7C15))
+    cells[np.isnan(values)] = 0
+    return cells.sum(axis=0)
+
+
+class RiskEngine:
+    """Per-(fund, window) cache of rolling metrics.
+
+    Each entry remembers a fingerprint of the fund's NAV series, so only
+    funds whose history changed (or that were never computed for that
+    window) are recomputed, all of them in one vectorized pass.
+    """
+
+    def __init__(self, max_entries=4096, max_matrices=8):
+        self.max_entries = max_entries
+        self.max_matrices = max_matrices
+        self._results = OrderedDict()
+        self._matrices = OrderedDict()
+        self._lock = threading.Lock()
+
+    def nav_matrix(self, nav_history):
+        """nav_matrix of a NAV_HISTORY frame, reused while the sheet is unchanged"""
+        key = data_key(nav_history)
+        with self._lock:
+            matrix = self._matrices.get(key)
+            if matrix is not None:
+                self._matrices.move_to_end(key)
+                return matrix
+        matrix = nav_matrix(nav_history)
+        with self._lock:
+            self._matrices[key] = matrix
+            while len(self._matrices) > self.max_matrices:
+                self._matrices.popitem(last=False)
+        return matrix
+
+    def metrics(self, navs, window=TRADING_DAYS, risk_free_rate=RISK_FREE_RATE):
+        """{metric: dates x funds DataFrame} for every fund column of navs.
+
+        Each fund is computed over its own dates only, so its result (and
+        its fingerprint) does not change when other funds gain dates.
+        """
+        fingerprints = dict(zip(navs.columns, _fund_fingerprints(navs)))
+        cached, missing = {}, []
+        with self._lock:
+            for fund_id, fingerprint in fingerprints.items():
+                entry = self._results.get((fund_id, window, risk_free_rate))
+                if entry is not None and entry[0] == fingerprint:
+                    self._results.move_to_end((fund_id, window, risk_free_rate))
+                    cached[fund_id] = entry[1:]
+                else:
+                    missing.append(fund_id)
+
+        if missing:
+            # Funds with the same dates (usually all of them) share one vectorized pass
+            observed = navs[missing].notna().to_numpy()
+            _, calendars = np.unique(np.packbits(observed, axis=0).T, axis=0, return_inverse=True)
+            computed = {}
+            for calendar in np.unique(calendars):
+                columns = np.flatnonzero(calendars.ravel() == calendar)
+                funds = [missing[j] for j in columns]
+                group = navs.loc[observed[:, columns[0]], funds]
+                results = np.stack([values.to_numpy() for values in rolling_metrics(group, window, risk_free_rate).values()], axis=2)
+                for j, fund_id in enumerate(funds):
+                    computed[fund_id] = (group.index, results[:, j, :])
+            with self._lock:
+                for fund_id, (dates, values) in computed.items():
+                    cached[fund_id] = (dates, values)
+                    self._results[(fund_id, window, risk_free_rate)] = (fingerprints[fund_id], dates, values)
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+
+        out = np.full((len(navs), navs.shape[1], len(ROLLING_METRICS)), np.nan)
+        for j, fund_id in enumerate(navs.columns):
+            dates, values = cached[fund_id]
+            out[navs.index.get_indexer(dates), j, :] = values
+        return {
+            metric: pd.DataFrame(out[:, :, k], index=navs.index, columns=navs.columns)
+            for k, metric in enumerate(ROLLING_METRICS)
+        }
+
+    def summary(self, navs, window=TRADING_DAYS, risk_free_rate=RISK_FREE_RATE):
+        """Latest rolling metrics and full-history max drawdown, one row per fund"""
+        if navs.empty:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+        metrics = self.metrics(navs, window, risk_free_rate)
+        # Each fund's last NAV date, since histories may end on different days
+        last_row = navs.notna().to_numpy()[::-1].argmax(axis=0)
+        positions = len(navs) - 1 - last_row
+        columns = np.arange(navs.shape[1])
+
+        summary = pd.DataFrame({'fund_id': navs.columns})
+        for metric in ['rolling_return', 'volatility', 'sharpe', 'sortino']:
+            summary[metric] = metrics[metric].to_numpy()[positions, columns]
+        summary['max_drawdown'] = metrics['drawdown'].min().to_numpy()
+        summary['observations'] = navs.notna().sum().to_numpy()
+        return summary
+
+
+risk_engine = RiskEngine()
@@ -0,0 +1,751 @@
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import gspread
+from gspread.urls import DRIVE_FILES_API_V3_URL
+from gspread.utils import rowcol_to_a1
+import pandas as pd
+from datetime import datetime
+from config import (
+    get_credentials,
+    SHEET_CONFIG,
+    CHANGE_POLL_SECONDS,
+    SNAPSHOT_SAVE_DELAY,
+    SOFT_DELETE,
+    TOMBSTONE_COLUMN
+)
+from core.journal import Journal
+from core.snapshot import SnapshotStore
+from core.query import TableIndex, query_table
+
+logger = logging.getLogger(__name__)
+
+_COPY_ON_WRITE = int(pd.__version__.split('.')[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+def resolve_sheet_config(overrides=None):
+    """Build a sheet config from per-portfolio overrides.
+
+    Each override is either a bare spreadsheet ID, which keeps the default
+    worksheet name, or a dict with 'sheet_id' and/or 'worksheet'.
+    """
+    sheet_config = {sheet_type: dict(config) for sheet_type, config in SHEET_CONFIG.items()}
+    for sheet_type, override in (overrides or {}).items():
+        if sheet_type not in sheet_config:
+            raise KeyError(f"Unknown sheet type: {sheet_type}")
+        if isinstance(override, str):
+            override = {'sheet_id': override}
+        sheet_config[sheet_type].update(override)
+    return sheet_config
+
+
+def _serialized(method):
+    """Hold the sheet's lock for the whole of a write method"""
+    @functools.wraps(method)
+    def wrapper(self, sheet_type, *args, **kwargs):
+        with self._sheet_lock(sheet_type):
+            return method(self, sheet_type, *args, **kwargs)
+    return wrapper
+
+
+class SheetsSession:
+    """One authorized gspread client plus a pool of open worksheet handles.
+
+    Share a single session between managers so that many portfolios cost
+    one OAuth handshake, and each worksheet is opened (two API calls) once
+    rather than on every read or write.
+    """
+
+    def __init__(self, credentials=None, client=None, max_handles=256):
+        self.credentials = credentials if credentials is not None else get_credentials()
+        self.gc = client
+        self.auth_error = None
+        self.max_handles = max_handles
+        self._handles = OrderedDict()
+        self._markers = {}
+        self._lock = threading.Lock()
+        if hasattr(self.credentials, 'with_non_blocking_refresh'):
+            # A token nearing expiry is refreshed once on a background thread
+            # instead of by every session thread that notices it at once
+            self.credentials.with_non_blocking_refresh()
+        if self.gc is None and self.credentials:
+            try:
+                self.gc = gspread.authorize(self.credentials)
+            except Exception as e:
+                self.auth_error = e
+
+    def worksheet(self, sheet_id, worksheet_name):
+        """Open a worksheet, reusing the pooled handle when there is one"""
+        key = (sheet_id, worksheet_name)
+        with self._lock:
+            worksheet = self._handles.get(key)
+            if worksheet is not None:
+                self._handles.move_to_end(key)
+                return worksheet
+
+        worksheet = self.gc.open_by_key(sheet_id).worksheet(worksheet_name)
+        with self._lock:
+            self._handles[key] = worksheet
+            while len(self._handles) > self.max_handles:
+                self._handles.popitem(last=False)
+        return worksheet
+
+    def discard(self, sheet_id, worksheet_name):
+        """Forget a pooled handle, e.g. after a call through it failed"""
+        with self._lock:
+            self._handles.pop((sheet_id, worksheet_name), None)
+
+    def change_markers(self, sheet_ids, max_age=1.0):
+        """Drive version of each spreadsheet; changes whenever the file is edited.
+
+        One small metadata call per spreadsheet instead of re-reading its
+        rows. Markers fetched within ``max_age`` seconds are reused, so
+        managers sharing a spreadsheet cost one call per poll. Spreadsheets
+        whose marker could not be read are left out of the result.
+        """
+        now = time.monotonic()
+        markers, stale = {}, []
+        with self._lock:
+            for sheet_id in set(sheet_ids):
+                cached = self._markers.get(sheet_id)
+                if cached and now - cached[1] < max_age:
+                    markers[sheet_id] = cached[0]
+                else:
+                    stale.append(sheet_id)
+        if not stale or not self.gc:
+            return markers
+
+        with ThreadPoolExecutor(max_workers=min(8, len(stale))) as executor:
+            fetched = dict(zip(stale, executor.map(self._fetch_marker, stale)))
+        with self._lock:
+            for sheet_id, marker in fetched.items():
+                if marker is not None:
+                    self._markers[sheet_id] = (marker, now)
+                    markers[sheet_id] = marker
+        return markers
+
+    def _fetch_marker(self, sheet_id):
+        try:
+            response = self.gc.http_client.request(
+                "get",
+                f"{DRIVE_FILES_API_V3_URL}/{sheet_id}",
+                params={"fields": "version,modifiedTime", "supportsAllDrives": True}
+            )
+            metadata = response.json()
+        except Exception as e:
+            logger.warning("Failed to read the change marker of %s: %s", sheet_id, e)
+            return None
+        return metadata.get('version') or metadata.get('modifiedTime')
+
+
+class GoogleSheetsManager:
+    """Google Sheets access with a local cache; has no UI dependency.
+
+    Errors from foreground calls are passed to ``on_error`` (logged by
+    default) so a UI can surface them; background refreshes stay quiet.
+
+    Reads are always served from the cache. With ``background_refresh`` a
+    daemon thread polls each spreadsheet's change marker every
+    ``poll_interval`` seconds and re-fetches only the sheets whose
+    spreadsheet changed, so edits made directly in Google Sheets show up
+    without any render waiting on the API. Sheets fetched on a cache miss
+    are saved to the snapshot ``snapshot_delay`` seconds later on a timer
+    thread, in one write for all misses in that time.
+
+    Rows are addressed by their DataFrame index, which is their position
+    below the header row. With ``soft_delete`` deletes only set the
+    TOMBSTONE_COLUMN flag, so the positions of the other rows never shift;
+    flagged rows are hidden from reads and removed later by ``compact``.
+
+    Every successful write is also recorded in ``journal`` (see
+    core.journal), which ``read_as_of`` replays to show a sheet as it was
+    at an earlier time.
+
+    One manager is shared by every browser session. Shared state is only
+    touched under ``_lock``; writes to a sheet, and fetches of a sheet
+    missing from the cache, are serialized per sheet, so concurrent
+    sessions never interleave API calls on one sheet or fetch it twice.
+    Cached frames are never modified in place, and each reader gets its
+    own copy (see SessionView).
+    """
+
+    def __init__(self, sheet_config=None, snapshot_store=None, on_error=None, background_refresh=True,
+                 session=None, cache=None, poll_interval=CHANGE_POLL_SECONDS, soft_delete=SOFT_DELETE,
+                 journal=None, snapshot_delay=SNAPSHOT_SAVE_DELAY):
+        self.sheet_config = sheet_config if sheet_config is not None else SHEET_CONFIG
+        self.on_error = on_error if on_error is not None else logger.error
+        self.session = session if session is not None else SheetsSession()
+        self.credentials = self.session.credentials
+        self.gc = self.session.gc
+        self.snapshot_store = snapshot_store if snapshot_store is not None else SnapshotStore()
+        self.journal = journal if journal is not None else Journal()
+        self._lock = threading.RLock()
+        # sheet_type -> (DataFrame, fetched_at), seeded from the last snapshot.
+        # A shared TenantCache partition may be passed in place of the dict.
+        self._cache = cache if cache is not None else {}
+        frames, markers = self.snapshot_store.load()
+        self._cache.update(frames)
+        # sheet_type -> change marker of its spreadsheet when it was fetched
+        self._markers = markers
+        # Bumped on every mutation so in-flight background fetches that
+        # started before the write never overwrite fresher state
+        self._generations = {}
+        # Bumped whenever a sheet's cached data is replaced or dropped
+        self._versions = {}
+        self._indexes = {}
+        self._sheet_locks = {}
+        self._snapshot_lock = threading.Lock()
+        self.snapshot_delay = snapshot_delay
+        self._snapshot_timer = None
+        if hasattr(self._cache, 'on_evict'):
+            self._cache.on_evict = self._drop_index
+        self.poll_interval = poll_interval
+        self.soft_delete = soft_delete
+        self._refresh_thread = None
+        self._stop_polling = threading.Event()
+        if self.session.auth_error:
+            self.on_error(f"Failed to authenticate with Google Sheets: {str(self.session.auth_error)}")
+        if self.gc and background_refresh:
+            self.start_background_refresh()
+    
+    def get_worksheet(self, sheet_type):
+        """Get a specific worksheet"""
+        if not self.gc:
+            return None
+        
+        try:
+            config = self.sheet_config[sheet_type]
+            return self.session.worksheet(config['sheet_id'], config['worksheet'])
+        except Exception as e:
+            self.on_error(f"Failed to access worksheet {sheet_type}: {str(e)}")
+            return None
+    
+    def read_data(self, sheet_type):
+        """Read data from a worksheet, served from the local cache when available"""
+        return _private_copy(live_rows(self._load(sheet_type)))
+    
+    def get_index(self, sheet_type):
+        """Query index over the cached sheet, rebuilt only when the data changes"""
+        data = self._load(sheet_type)
+        with self._lock:
+            source, index = self._indexes.get(sheet_type, (None, None))
+        if index is None or source is not data:
+            index = TableIndex.for_sheet(sheet_type, live_rows(data))
+            with self._lock:
+                self._indexes[sheet_type] = (data, index)
+        return index
+    
+    def query_data(self, sheet_type, **query):
+        """Filter, sort and page a sheet; see core.query.query_table"""
+        return query_table(self.get_index(sheet_type), **query)
+    
+    def _load(self, sheet_type):
+        """Cached DataFrame for a sheet, fetched on a miss; callers must not mutate it"""
+        with self._lock:
+            cached = self._cache.get(sheet_type)
+        if cached is not None:
+            return cached[0]
+        
+        # Sessions that miss together wait for one fetch instead of each
+        # calling the API; a miss during a write waits for the write
+        with self._sheet_lock(sheet_type):
+            with self._lock:
+                cached = self._cache.get(sheet_type)
+                generation = self._generations.get(sheet_type, 0)
+            if cached is not None:
+                return cached[0]
+            
+            worksheet = self.get_worksheet(sheet_type)
+            if not worksheet:
+                return pd.DataFrame()
+            
+            # Read before the rows so the next poll does not see this fetch
+            # as a change, while an edit landing mid-fetch still shows as one
+            sheet_id = self.sheet_config[sheet_type]['sheet_id']
+            marker = self.session.change_markers([sheet_id], max_age=0).get(sheet_id)
+            try:
+                records = worksheet.get_all_records()
+            except Exception as e:
+                config = self.sheet_config[sheet_type]
+                self.session.discard(config['sheet_id'], config['worksheet'])
+                self.on_error(f"Failed to read data from {sheet_type}: {str(e)}")
+                return pd.DataFrame()
+            
+            data = pd.DataFrame(records)
+            stored = self._store(sheet_type, data, generation, marker)
+        if stored:
+            self._schedule_snapshot()
+        return data
+    
+    def _sheet_lock(self, sheet_type):
+        with self._lock:
+            lock = self._sheet_locks.get(sheet_type)
+            if lock is None:
+                lock = self._sheet_locks[sheet_type] = threading.RLock()
+            return lock
+    
+    @_serialized
+    def checkpoint(self, sheet_type):
+        """Re-read a sheet into a journal checkpoint, capturing edits made directly in Sheets"""
+        self.invalidate(sheet_type)
+        return self._checkpoint(sheet_type)
+    
+    def read_as_of(self, sheet_type, when):
+        """Sheet rows as they were at ``when``, rebuilt from the journal; None without history"""
+        data = self.journal.as_of(sheet_type, when)
+        return None if data is None else _private_copy(live_rows(data))
+    
+    def data_version(self, sheet_type):
+        """Counter that changes whenever the cached data of a sheet changes"""
+        with self._lock:
+            return self._versions.get(sheet_type, 0)
+    
+    def get_fetch_time(self, sheet_type=None):
+        """Time the cached data was fetched; the oldest one when no sheet is given"""
+        with self._lock:
+            if sheet_type is not None:
+                cached = self._cache.get(sheet_type)
+                return cached[1] if cached else None
+            times = [fetched_at for _, (_, fetched_at) in self._cache.items()]
+        return min(times) if times else None
+    
+    def invalidate(self, sheet_type):
+        """Drop the cached copy of a sheet so the next read fetches it again"""
+        with self._lock:
+            self._cache.pop(sheet_type, None)
+            self._indexes.pop(sheet_type, None)
+            self._markers.pop(sheet_type, None)
+            self._generations[sheet_type] = self._generations.get(sheet_type, 0) + 1
+            self._versions[sheet_type] = self._versions.get(sheet_type, 0) + 1
+    
+    def save_snapshot(self):
+        """Persist the cached DataFrames for the next warm start"""
+        # Saves land in the order their contents were taken, so a slow
+        # save of older frames never replaces a newer snapshot
+        with self._snapshot_lock:
+            with self._lock:
+                frames = dict(self._cache.items())
+                markers = {sheet_type: self._markers[sheet_type] for sheet_type in frames if sheet_type in self._markers}
+            return self.snapshot_store.save(frames, markers)
+    
+    def _schedule_snapshot(self):
+        """Save the snapshot ``snapshot_delay`` seconds from now, once for any number of misses"""
+        if not self.snapshot_store.path:
+            return
+        with self._lock:
+            if self._snapshot_timer is not None:
+                return
+            self._snapshot_timer = threading.Timer(self.snapshot_delay, self._save_scheduled_snapshot)
+            self._snapshot_timer.daemon = True
+            self._snapshot_timer.start()
+    
+    def _save_scheduled_snapshot(self):
+        with self._lock:
+            self._snapshot_timer = None
+        self.save_snapshot()
+    
+    def refresh_all(self):
+        """Re-fetch every configured sheet and persist a fresh snapshot"""
+        self.refresh_sheets(list(self.sheet_config))
+    
+    def refresh_sheets(self, sheet_types, markers=None):
+        """Re-fetch the given sheets in the background; returns True if any was stored"""
+        if not self.gc:
+            return False
+        
+        if markers is None:
+            markers = self.session.change_markers(
+                self.sheet_config[sheet_type]['sheet_id'] for sheet_type in sheet_types
+            )
+        refreshed = False
+        for sheet_type in sheet_types:
+            config = self.sheet_config[sheet_type]
+            with self._lock:
+                generation = self._generations.get(sheet_type, 0)
+            try:
+                worksheet = self.session.worksheet(config['sheet_id'], config['worksheet'])
+                data = pd.DataFrame(worksheet.get_all_records())
+            except Exception:
+                # Keep serving the snapshot copy; the next read retries
+                self.session.discard(config['sheet_id'], config['worksheet'])
+                continue
+            if self._store(sheet_type, data, generation, markers.get(config['sheet_id'])):
+                refreshed = True
+        
+        if refreshed:
+            self.save_snapshot()
+        return refreshed
+    
+    def changed_sheets(self, markers):
+        """Cached sheets whose spreadsheet marker differs from the one they were fetched at"""
+        changed = []
+        with self._lock:
+            for sheet_type, config in self.sheet_config.items():
+                marker = markers.get(config['sheet_id'])
+                if marker is None or sheet_type not in self._cache:
+                    # Unknown marker: nothing to compare. Not cached: the
+                    # next read fetches it anyway.
+                    continue
+                if self._markers.get(sheet_type) != marker:
+                    changed.append(sheet_type)
+        return changed
+    
+    def refresh_changed(self, markers=None):
+        """Re-fetch only the sheets whose spreadsheet changed since they were cached.
+
+        ``markers`` maps sheet_id to change marker; they are read from Drive
+        when not given. Returns the list of sheet types that were refreshed.
+        """
+        if not self.gc:
+            return []
+        if markers is None:
+            markers = self.session.change_markers(
+                config['sheet_id'] for config in self.sheet_config.values()
+            )
+        changed = self.changed_sheets(markers)
+        if changed:
+            self.refresh_sheets(changed, markers)
+        return changed
+    
+    def start_background_refresh(self):
+        """Start the journal and bring the snapshot up to date, then keep polling for changes on a daemon thread"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+        self._stop_polling.clear()
+        self._refresh_thread = threading.Thread(
+            target=self._poll_changes,
+            name="sheets-background-refresh",
+            daemon=True
+        )
+        self._refresh_thread.start()
+    
+    def stop_background_refresh(self):
+        """Stop polling after the current round"""
+        self._stop_polling.set()
+    
+    def _poll_changes(self):
+        try:
+            self.attach_journal()
+        except Exception as e:
+            logger.warning("Journal checkpoint failed: %s", e)
+        while True:
+            try:
+                self.refresh_changed()
+            except Exception as e:
+                logger.warning("Background refresh failed: %s", e)
+            if not self.poll_interval or self._stop_polling.wait(self.poll_interval):
+                return
+    
+    def _drop_index(self, sheet_type):
+        # Called by a shared cache on eviction, possibly from another
+        # manager's thread, so it must not take self._lock
+        self._indexes.pop(sheet_type, None)
+    
+    def _store(self, sheet_type, data, generation, marker=None):
+        """Cache freshly fetched data unless a write happened since the fetch began.
+
+        ``marker`` is the spreadsheet's change marker read before the fetch,
+        so an edit that lands mid-fetch still shows up as a change later.
+        """
+        with self._lock:
+            if self._generations.get(sheet_type, 0) != generation:
+                return False
+            self._cache[sheet_type] = (data, datetime.now())
+            self._versions[sheet_type] = self._versions.get(sheet_type, 0) + 1
+            if marker is not None:
+                self._markers[sheet_type] = marker
+            else:
+                self._markers.pop(sheet_type, None)
+            return True
+    
+    @_serialized
+    def write_data(self, sheet_type, data):
+        """Write data to a worksheet"""
+        worksheet = self.get_worksheet(sheet_type)
+        if not worksheet:
+            return False
+        
+        self._journal_base(sheet_type)
+        try:
+            if isinstance(data, pd.DataFrame):
+                # Clear existing data and write new data
+                worksheet.clear()
+                if not data.empty:
+                    # Add headers
+                    worksheet.append_row(data.columns.tolist())
+                    # Add data rows
+                    for _, row in data.iterrows():
+                        worksheet.append_row(row.tolist())
+                self._record(sheet_type, 'write', columns=data.columns.tolist(), rows=data.values.tolist())
+            self.invalidate(sheet_type)
+            return True
+        except Exception as e:
+            self.on_error(f"Failed to write data to {sheet_type}: {str(e)}")
+            return False
+    
+    @_serialized
+    def append_data(self, sheet_type, data):
+        """Append data to a worksheet"""
+        worksheet = self.get_worksheet(sheet_type)
+        if not worksheet:
+            return False
+        
+        self._journal_base(sheet_type)
+        try:
+            if isinstance(data, dict):
+                # Convert dict to list in the correct order
+                headers = worksheet.row_values(1)
+                row_data = [data.get(header, '') for header in headers]
+                worksheet.append_row(row_data)
+                self._record(sheet_type, 'append', rows=[dict(zip(headers, row_data))])
+            elif isinstance(data, list):
+                worksheet.append_row(data)
+                self._record(sheet_type, 'append', rows=[data])
+            self.invalidate(sheet_type)
+            return True
+        except Exception as e:
+            self.on_error(f"Failed to append data to {sheet_type}: {str(e)}")
+            return False
+    
+    @_serialized
+    def append_rows(self, sheet_type, rows):
+        """Append many rows in a single API call"""
+        worksheet = self.get_worksheet(sheet_type)
+        if not worksheet:
+            return False
+        
+        self._journal_base(sheet_type)
+        try:
+            headers = worksheet.row_values(1)
+            values = [
+                [row.get(header, '') for header in headers] if isinstance(row, dict) else list(row)
+                for row in rows
+            ]
+            if values:
+                worksheet.append_rows(values)
+                self._record(sheet_type, 'append', rows=[dict(zip(headers, row)) for row in values])
+            self.invalidate(sheet_type)
+            return True
+        except Exception as e:
+            self.on_error(f"Failed to append rows to {sheet_type}: {str(e)}")
+            return False
+    
+    @_serialized
+    def update_row(self, sheet_type, row_index, data, add_columns=False):
+        """Update a specific row; with add_columns, keys with no header get a new column"""
+        worksheet = self.get_worksheet(sheet_type)
+        if not worksheet:
+            return False
+        
+        self._journal_base(sheet_type)
+        try:
+            if isinstance(data, dict):
+                headers = worksheet.row_values(1)
+                if add_columns:
+                    for col in data:
+                        if col not in headers:
+                            _add_column(worksheet, headers, col)
+                for col, value in data.items():
+                    if col in headers:
+                        col_index = headers.index(col) + 1
+                        worksheet.update_cell(_sheet_row(row_index), col_index, value)
+                self._record(
+                    sheet_type, 'update', row=int(row_index),
+                    values={col: value for col, value in data.items() if col in headers}
+                )
+            self.invalidate(sheet_type)
+            return True
+        except Exception as e:
+            self.on_error(f"Failed to update row in {sheet_type}: {str(e)}")
+            return False
+    
+    def delete_row(self, sheet_type, row_index):
+        """Delete a specific row"""
+        return self.delete_rows(sheet_type, [row_index])
+    
+    @_serialized
+    def delete_rows(self, sheet_type, row_indices, soft=None):
+        """Delete many rows in a single API call.
+
+        Hard deletes remove the rows bottom-up, merging adjacent rows into
+        one range, so no removal shifts a row that is still to be removed.
+        Soft deletes (the manager default unless ``soft`` is given) flag
+        the rows in TOMBSTONE_COLUMN instead and leave every row in place.
+        """
+        rows = sorted({_sheet_row(row_index) for row_index in row_indices}, reverse=True)
+        if not rows:
+            return True
+        worksheet = self.get_worksheet(sheet_type)
+        if not worksheet:
+            return False
+        
+        self._journal_base(sheet_type)
+        try:
+            positions = sorted(row - 2 for row in rows)
+            if self.soft_delete if soft is None else soft:
+                self._write_tombstones(worksheet, rows)
+                self._record(sheet_type, 'soft_delete', rows=positions)
+            else:
+                _delete_sheet_rows(worksheet, rows)
+                self._record(sheet_type, 'delete', rows=positions)
+            self.invalidate(sheet_type)
+            return True
+        except Exception as e:
+            self.on_error(f"Failed to delete rows in {sheet_type}: {str(e)}")
+            return False
+    
+    @_serialized
+    def compact(self, sheet_type):
+        """Physically remove soft-deleted rows; returns how many, or None on failure"""
+        self.invalidate(sheet_type)
+        data = self._load(sheet_type)
+        deleted = data.index[_tombstoned(data)]
+        if deleted.empty:
+            return 0
+        if not self.delete_rows(sheet_type, deleted, soft=False):
+            return None
+        return len(deleted)
+    
+    def attach_journal(self):
+        """Checkpoint every sheet the journal has no history of yet, so its history starts now.
+
+        Runs on the background refresh thread; without one, a sheet is
+        checkpointed before its first journaled write instead.
+        """
+        missing = [sheet_type for sheet_type in self.sheet_config if not self.journal.has_checkpoint(sheet_type)]
+        if not missing:
+            return
+        with self._lock:
+            versions = {sheet_type: self._versions.get(sheet_type, 0) for sheet_type in missing}
+        # Fetched fresh, never from the snapshot, and quietly: a sheet that
+        # cannot be read yet is checkpointed before its first write instead
+        self.refresh_sheets(missing)
+        for sheet_type in missing:
+            with self._lock:
+                cached = self._cache.get(sheet_type) if self._versions.get(sheet_type, 0) != versions[sheet_type] else None
+            if cached is not None:
+                self.journal.checkpoint(sheet_type, cached[0])
+    
+    def _journal_base(self, sheet_type):
+        """Checkpoint a sheet before its first journaled write so replays have a starting point"""
+        try:
+            if not self.journal.has_checkpoint(sheet_type):
+                self.checkpoint(sheet_type)
+        except Exception as e:
+            logger.error("Failed to checkpoint %s into the journal: %s", sheet_type, e)
+    
+    def _record(self, sheet_type, op, **payload):
+        # Called once the sheet write has succeeded: a journal failure must
+        # not report the write as failed, or a retry would write it twice
+        try:
+            self.journal.record(sheet_type, op, **payload)
+        except Exception as e:
+            logger.error("Failed to journal %s on %s: %s", op, sheet_type, e)
+    
+    def _checkpoint(self, sheet_type):
+        data = self._load(sheet_type)
+        with self._lock:
+            fetched = sheet_type in self._cache
+        if fetched:
+            self.journal.checkpoint(sheet_type, data)
+        return fetched
+    
+    def _write_tombstones(self, worksheet, rows):
+        headers = worksheet.row_values(1)
+        if TOMBSTONE_COLUMN in headers:
+            column = headers.index(TOMBSTONE_COLUMN) + 1
+        else:
+            column = _add_column(worksheet, headers, TOMBSTONE_COLUMN)
+        worksheet.batch_update([
+            {'range': rowcol_to_a1(row, column), 'values': [['TRUE']]} for row in rows
+        ])
+
+
+class SessionView:
+    """One browser session's reads of a shared manager.
+
+    Each sheet is read once and the same private copy is handed out until
+    the manager's cached data changes, so a session never sees another
+    session's edits to its frames, and a page that shows a sheet in
+    several places reads it once per render.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._frames = {}
+
+    def read(self, sheet_type):
+        version = self.manager.data_version(sheet_type)
+        cached = self._frames.get(sheet_type)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        data = self.manager.read_data(sheet_type)
+        # Tag with the version seen before reading: if the data changed during
+        # the read, the next call reads again instead of keeping a stale copy
+        self._frames[sheet_type] = (version, data)
+        return data
+
+
+def _private_copy(data):
+    """Copy of a cached frame that the caller may modify freely"""
+    # Under copy-on-write (always on from pandas 3) a shallow copy is
+    # enough: the first write to it copies only the columns it touches
+    return data.copy(deep=not _COPY_ON_WRITE)
+
+
+def _add_column(worksheet, headers, name):
+    """Add a header after the last one, growing the grid if needed; returns its 1-based column"""
+    column = len(headers) + 1
+    if worksheet.col_count < column:
+        worksheet.add_cols(column - worksheet.col_count)
+    worksheet.update_cell(1, column, name)
+    headers.append(name)
+    return column
+
+
+def _sheet_row(row_index):
+    """1-based sheet row of a data row; row 1 holds the headers"""
+    return int(row_index) + 2
+
+
+def _delete_sheet_rows(worksheet, rows):
+    """Delete the given 1-based rows, listed bottom-up, in one batch request"""
+    ranges = []
+    for row in rows:
+        if ranges and ranges[-1][0] == row + 1:
+            ranges[-1][0] = row
+        else:
+            ranges.append([row, row + 1])
+    worksheet.spreadsheet.batch_update({
+        'requests': [
+            {
+                'deleteDimension': {
+                    'range': {
+                        'sheetId': worksheet.id,
+                        'dimension': 'ROWS',
+                        'startIndex': start - 1,
+                        'endIndex': end - 1
+                    }
+                }
+            }
+            for start, end in ranges
+        ]
+    })
+
+
+def _tombstoned(data):
+    """Boolean mask of soft-deleted rows"""
+    if TOMBSTONE_COLUMN not in data.columns:
+        return pd.Series(False, index=data.index)
+    flags = data[TOMBSTONE_COLUMN].astype(str).str.strip().str.upper()
+    return flags.isin(['TRUE', '1', 'YES'])
+
+
+def live_rows(data):
+    """Rows that are not soft-deleted, keeping their original index"""
+    if TOMBSTONE_COLUMN not in data.columns:
+        return data
+    return data[~_tombstoned(data)]
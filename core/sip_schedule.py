@@ -0,0 +1,193 @@
+"""SIP installment schedules and reconciliation against recorded investments.
+
+Pauses are kept in the SIPS 'paused_periods' column as semicolon-separated
+'start:end' date pairs, with an empty end while the pause is ongoing, e.g.
+'2024-03-01:2024-06-01;2024-09-01:'. No installment falls due from the
+start of a pause up to (but excluding) its end.
+"""
+from datetime import date, datetime
+import numpy as np
+import pandas as pd
+
+# Calendar months between installments; weekly SIPs step by days instead
+MONTH_STEPS = {'Monthly': 1, 'Quarterly': 3}
+WEEK_DAYS = 7
+
+SCHEDULE_COLUMNS = ['sip_id', 'name', 'fund_id', 'amount', 'due_date']
+
+
+def pause_periods(paused_periods, on=None):
+    """paused_periods value with a new open pause starting on the given day"""
+    periods = [p for p in str(paused_periods or '').split(';') if p]
+    if periods and periods[-1].endswith(':'):
+        return ';'.join(periods)  # already paused
+    periods.append(f"{(on or date.today()).strftime('%Y-%m-%d')}:")
+    return ';'.join(periods)
+
+
+def resume_periods(paused_periods, on=None):
+    """paused_periods value with the open pause closed on the given day"""
+    periods = [p for p in str(paused_periods or '').split(';') if p]
+    if periods and periods[-1].endswith(':'):
+        periods[-1] += (on or date.today()).strftime('%Y-%m-%d')
+    return ';'.join(periods)
+
+
+def _pause_table(sips):
+    """One row per (SIP position, pause start, pause end)"""
+    if 'paused_periods' not in sips:
+        return pd.DataFrame({'position': [], 'start': [], 'end': []})
+    periods = sips['paused_periods'].fillna('').astype(str).str.split(';').explode()
+    periods = periods[periods.str.contains(':', regex=False)]
+    if periods.empty:
+        return pd.DataFrame({'position': [], 'start': [], 'end': []})
+    bounds = periods.str.split(':', n=1, expand=True)
+    return pd.DataFrame({
+        'position': periods.index.to_numpy(),
+        'start': pd.to_datetime(bounds[0], errors='coerce').to_numpy(),
+        # An open pause runs past any due date
+        'end': pd.to_datetime(bounds[1], errors='coerce').fillna(pd.Timestamp.max).to_numpy()
+    }).dropna(subset=['start'])
+
+
+def expand_schedule(sip_data, as_of=None):
+    """Every installment due up to ``as_of`` for Active and Paused SIPs.
+
+    All SIPs are expanded at once: each SIP is repeated once per possible
+    installment and the due dates are computed with array arithmetic, then
+    dates past the end date or inside a pause are masked out.
+    """
+    as_of = pd.Timestamp(as_of or date.today()).normalize()
+    if sip_data.empty:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
+
+    sips = sip_data[sip_data['status'].isin(['Active', 'Paused'])].reset_index(drop=True)
+    start = pd.to_datetime(sips['start_date'], errors='coerce')
+    end_date = sips['end_date'] if 'end_date' in sips else pd.Series('', index=sips.index)
+    end = pd.to_datetime(end_date, errors='coerce').fillna(as_of).clip(upper=as_of)
+    valid = start.notna() & (start <= end)
+    sips, start, end = sips[valid].reset_index(drop=True), start[valid].reset_index(drop=True), end[valid].reset_index(drop=True)
+    if sips.empty:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS)
+
+    is_weekly = (sips['frequency'] == 'Weekly').to_numpy()
+    step = sips['frequency'].map(MONTH_STEPS).fillna(1).astype(int).to_numpy()
+    start_days = start.to_numpy().astype('datetime64[D]')
+    end_days = end.to_numpy().astype('datetime64[D]')
+    start_months = start_days.astype('datetime64[M]')
+    month_span = (end_days.astype('datetime64[M]') - start_months).astype(int)
+    day_span = (end_days - start_days).astype(int)
+    counts = np.where(is_weekly, day_span // WEEK_DAYS, month_span // step) + 1
+
+    # k-th installment of each SIP, for all SIPs in one flat array
+    position = np.repeat(np.arange(len(sips)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    month = start_months[position] + (k * step[position]).astype('timedelta64[M]')
+    days_in_month = ((month + 1).astype('datetime64[D]') - month.astype('datetime64[D]')).astype(int)
+    day_of_month = (start_days - start_months.astype('datetime64[D]')).astype(int)[position]
+    monthly_due = month.astype('datetime64[D]') + np.minimum(day_of_month, days_in_month - 1)
+    weekly_due = start_days[position] + (k * WEEK_DAYS).astype('timedelta64[D]')
+    due = np.where(is_weekly[position], weekly_due, monthly_due)
+
+    keep = due <= end_days[position]
+    pauses = _pause_table(sips)
+    if not pauses.empty:
+        hits = pd.DataFrame({'row': np.arange(len(due)), 'position': position, 'due': due}).merge(pauses, on='position')
+        paused_rows = hits.loc[(hits['due'] >= hits['start']) & (hits['due'] < hits['end']), 'row']
+        keep[paused_rows.to_numpy()] = False
+    # A Paused SIP with no open pause on record is treated as paused from today
+    unrecorded = (sips['status'] == 'Paused').to_numpy()
+    if len(pauses):
+        open_pauses = pauses.loc[pauses['end'] == pd.Timestamp.max, 'position']
+        unrecorded = unrecorded & ~np.isin(np.arange(len(sips)), open_pauses)
+    keep &= ~(unrecorded[position] & (due >= np.datetime64(date.today(), 'D')))
+
+    position, due = position[keep], due[keep]
+    return pd.DataFrame({
+        'sip_id': sips['id'].astype(str).to_numpy()[position],
+        'name': sips['name'].astype(str).to_numpy()[position],
+        'fund_id': sips['fund_id'].astype(str).to_numpy()[position] if 'fund_id' in sips else '',
+        'amount': pd.to_numeric(sips['amount'], errors='coerce').to_numpy()[position],
+        'due_date': pd.to_datetime(due)
+    })
+
+
+def missing_installments(schedule, monthly_data):
+    """Scheduled installments with no matching MONTHLY_INVESTMENTS row.
+
+    A recorded row matches on its id when it was posted by installment_rows,
+    on (sip_id, date) when it carries a sip_id, and on (description, date)
+    for SIP rows keyed in by hand before sip_id existed.
+    """
+    if schedule.empty or monthly_data.empty or 'date' not in monthly_data:
+        return schedule
+
+    recorded_dates = pd.to_datetime(monthly_data['date'], errors='coerce')
+    scheduled = schedule['due_date']
+    matched = np.zeros(len(schedule), dtype=bool)
+
+    if 'id' in monthly_data:
+        matched |= installment_ids(schedule).isin(monthly_data['id'].astype(str)).to_numpy()
+
+    if 'sip_id' in monthly_data:
+        recorded = pd.MultiIndex.from_arrays([monthly_data['sip_id'].astype(str), recorded_dates])
+        matched |= pd.MultiIndex.from_arrays([schedule['sip_id'], scheduled]).isin(recorded)
+
+    if 'description' in monthly_data:
+        is_sip = monthly_data['type'] == 'SIP' if 'type' in monthly_data \
+            else pd.Series(True, index=monthly_data.index)
+        recorded = pd.MultiIndex.from_arrays([
+            monthly_data['description'].astype(str)[is_sip], recorded_dates[is_sip]
+        ])
+        matched |= pd.MultiIndex.from_arrays([schedule['name'], scheduled]).isin(recorded)
+
+    return schedule[~matched].reset_index(drop=True)
+
+
+def installment_ids(schedule):
+    """Row id each scheduled installment is posted under"""
+    return 'SIP-' + schedule['sip_id'].astype(str) + '-' + schedule['due_date'].dt.strftime('%Y%m%d')
+
+
+def installment_rows(missing, mf_data=None):
+    """MONTHLY_INVESTMENTS rows for the given missing installments"""
+    categories = {}
+    if mf_data is not None and not mf_data.empty and 'category' in mf_data:
+        categories = dict(zip(mf_data['id'].astype(str), mf_data['category']))
+    created = datetime.now().strftime("%Y-%m-%d")
+
+    rows = []
+    missing = missing.assign(row_id=installment_ids(missing))
+    for row_id, sip_id, name, fund_id, amount, due_date in missing[['row_id'] + SCHEDULE_COLUMNS].itertuples(index=False):
+        fund_category = categories.get(fund_id)
+        rows.append({
+            # missing_installments matches on this id, so a re-run never posts
+            # the same installment twice even on sheets without a sip_id column
+            'id': row_id,
+            'type': 'SIP',
+            'amount': float(amount),
+            'date': due_date.strftime("%Y-%m-%d"),
+            'description': name,
+            'category': fund_category if fund_category in ('Debt', 'Hybrid') else 'Equity',
+            'notes': 'Auto-posted SIP installment',
+            'date_created': created,
+            'sip_id': sip_id
+        })
+    return rows
+
+
+def post_missing_installments(sheets_manager, as_of=None):
+    """Post every due but unrecorded SIP installment in one bulk append.
+
+    Returns the DataFrame of installments that were posted (empty when there
+    was nothing to post) or None if the write failed.
+    """
+    schedule = expand_schedule(sheets_manager.read_data('SIPS'), as_of)
+    missing = missing_installments(schedule, sheets_manager.read_data('MONTHLY_INVESTMENTS'))
+    if missing.empty:
+        return missing
+    rows = installment_rows(missing, sheets_manager.read_data('MUTUAL_FUNDS'))
+    if not sheets_manager.append_rows('MONTHLY_INVESTMENTS', rows):
+        return None
+    return missing
@@ -0,0 +1,54 @@
+import os
+import pickle
+import tempfile
+from config import SNAPSHOT_FILE
+
+# Bump whenever the layout of the pickled payload changes so that old
+# snapshots are ignored instead of being misread. Version 1 snapshots have
+# no change markers and are still read.
+SNAPSHOT_VERSION = 2
+
+
+class SnapshotStore:
+    """Versioned on-disk snapshot of the last-known sheet DataFrames"""
+
+    def __init__(self, path=SNAPSHOT_FILE):
+        self.path = path
+
+    def load(self):
+        """Load the snapshot as ({sheet_type: (DataFrame, fetched_at)}, {sheet_type: change_marker})"""
+        if not self.path or not os.path.exists(self.path):
+            return {}, {}
+
+        try:
+            with open(self.path, 'rb') as f:
+                payload = pickle.load(f)
+        except Exception:
+            # A truncated or unreadable snapshot is only a cache miss
+            return {}, {}
+
+        if not isinstance(payload, dict) or payload.get('version') not in (1, SNAPSHOT_VERSION):
+            return {}, {}
+        return payload.get('frames', {}), payload.get('markers', {})
+
+    def save(self, frames, markers=None):
+        """Atomically replace the snapshot with the given frames and change markers"""
+        if not self.path:
+            return False
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(
+                    {'version': SNAPSHOT_VERSION, 'frames': frames, 'markers': markers or {}},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from config import (
+    CHANGE_POLL_SECONDS,
+    JOURNAL_DIR,
+    TENANTS_FILE,
+    TENANT_SNAPSHOT_DIR,
+    TENANT_CACHE_MAX_MB,
+    TENANT_CACHE_MAX_MB_PER_TENANT
+)
+from core.cache import TenantCache
+from core.journal import Journal, portfolio_dir
+from core.sheets import GoogleSheetsManager, SheetsSession, resolve_sheet_config
+from core.snapshot import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+# Tenant ids name snapshot files and journal directories, so they must not
+# contain path separators or start with '.' or '_' (reserved)
+TENANT_ID_PATTERN = re.compile(r'[A-Za-z0-9][A-Za-z0-9_.-]*')
+
+
+def validate_tenant_ids(tenants):
+    """Raise ValueError for any tenant id that is not safe as a file name"""
+    invalid = [tenant_id for tenant_id in tenants if not TENANT_ID_PATTERN.fullmatch(str(tenant_id))]
+    if invalid:
+        raise ValueError(f"Invalid tenant ids (use letters, digits, '_', '.', '-'): {invalid}")
+
+
+def load_tenants(path=TENANTS_FILE):
+    """Read the tenant -> sheet overrides mapping"""
+    with open(path) as f:
+        tenants = json.load(f)
+    if not isinstance(tenants, dict):
+        raise ValueError(f"{path} must contain a JSON object of tenants")
+    validate_tenant_ids(tenants)
+    return tenants
+
+
+class TenantRegistry:
+    """Tenant-scoped sheet managers sharing one session and one bounded cache.
+
+    With ``background_refresh`` one daemon thread polls the change markers
+    of every open tenant's spreadsheets in a single batch, instead of one
+    polling thread per manager.
+    """
+
+    def __init__(self, tenants, session=None, cache=None, on_error=None,
+                 snapshot_dir=TENANT_SNAPSHOT_DIR, background_refresh=True,
+                 poll_interval=CHANGE_POLL_SECONDS, journal_dir=JOURNAL_DIR):
+        validate_tenant_ids(tenants)
+        self.tenants = tenants
+        self.session = session if session is not None else SheetsSession()
+        self.cache = cache if cache is not None else TenantCache(
+            max_bytes=TENANT_CACHE_MAX_MB * 1024 * 1024,
+            max_bytes_per_tenant=TENANT_CACHE_MAX_MB_PER_TENANT * 1024 * 1024
+        )
+        self.on_error = on_error
+        self.snapshot_dir = snapshot_dir
+        self.journal_dir = journal_dir
+        self.background_refresh = background_refresh
+        self.poll_interval = poll_interval
+        self._managers = {}
+        self._tenant_locks = {}
+        self._lock = threading.Lock()
+        self._poll_thread = None
+
+    @classmethod
+    def from_file(cls, path=TENANTS_FILE, **kwargs):
+        return cls(load_tenants(path), **kwargs)
+
+    def tenant_ids(self):
+        return list(self.tenants)
+
+    def get_manager(self, tenant_id):
+        """Manager for one tenant, created on first use"""
+        with self._lock:
+            manager = self._managers.get(tenant_id)
+        if manager is not None:
+            return manager
+
+        if tenant_id not in self.tenants:
+            raise KeyError(f"Unknown tenant: {tenant_id}")
+
+        # One manager per tenant: sessions racing to open the same tenant
+        # wait for the first one instead of each loading its snapshot
+        with self._lock:
+            tenant_lock = self._tenant_locks.setdefault(tenant_id, threading.Lock())
+        with tenant_lock:
+            with self._lock:
+                manager = self._managers.get(tenant_id)
+            if manager is not None:
+                return manager
+
+            snapshot_path = None
+            if self.snapshot_dir:
+                os.makedirs(self.snapshot_dir, exist_ok=True)
+                snapshot_path = os.path.join(self.snapshot_dir, f"{tenant_id}.pkl")
+
+            manager = GoogleSheetsManager(
+                sheet_config=resolve_sheet_config(self.tenants[tenant_id]),
+                snapshot_store=SnapshotStore(snapshot_path),
+                on_error=self.on_error,
+                background_refresh=self.background_refresh,
+                session=self.session,
+                cache=self.cache.partition(tenant_id),
+                journal=self.journal(tenant_id),
+                # The manager only catches up with its snapshot; the registry polls
+                poll_interval=0
+            )
+            with self._lock:
+                self._managers[tenant_id] = manager
+        if self.background_refresh and self.poll_interval:
+            self.start_change_polling()
+        return manager
+
+    def journal(self, tenant_id):
+        """Write journal of one tenant, kept in its own directory"""
+        return Journal(portfolio_dir(self.journal_dir, tenant_id))
+
+    def refresh_changed(self):
+        """Re-fetch changed sheets for every open tenant; returns {tenant_id: [sheet types]}"""
+        with self._lock:
+            managers = dict(self._managers)
+        markers = self.session.change_markers(
+            config['sheet_id'] for manager in managers.values() for config in manager.sheet_config.values()
+        )
+        refreshed = {}
+        for tenant_id, manager in managers.items():
+            changed = manager.refresh_changed(markers)
+            if changed:
+                refreshed[tenant_id] = changed
+        return refreshed
+
+    def start_change_polling(self):
+        """Poll all open tenants for sheet changes on one daemon thread"""
+        with self._lock:
+            if self._poll_thread and self._poll_thread.is_alive():
+                return
+            self._poll_thread = threading.Thread(target=self._poll_changes, name="tenant-change-poll", daemon=True)
+            self._poll_thread.start()
+
+    def _poll_changes(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                self.refresh_changed()
+            except Exception as e:
+                logger.warning("Tenant change poll failed: %s", e)
+
+    def aggregate(self, job, tenant_ids=None, workers=8):
+        """Run job(tenant_id, manager) for many tenants on a thread pool.
+
+        Threads rather than processes, so every call shares this registry's
+        session and cache. Returns ({tenant_id: result}, {tenant_id: error}).
+        """
+        results, failures = {}, {}
+        tenant_ids = tenant_ids if tenant_ids is not None else self.tenant_ids()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(lambda t: job(t, self.get_manager(t)), tenant_id): tenant_id
+                for tenant_id in tenant_ids
+            }
+            for future in as_completed(futures):
+                tenant_id = futures[future]
+                try:
+                    results[tenant_id] = future.result()
+                except Exception as e:
+                    failures[tenant_id] = str(e)
+                    logger.error("%s: %s", tenant_id, e)
+        return results, failures
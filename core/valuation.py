@@ -0,0 +1,213 @@
+"""FIFO lot accounting and valuation of mutual fund transactions.
+
+Every fund's buys and sells are laid out on one number line of cumulative
+units, with funds placed end to end. Buy lots and sells then become
+intervals on that line, and FIFO matching is just cutting the line at every
+interval boundary: each piece belongs to exactly one lot and one sell,
+found with a binary search. Everything runs as whole-array operations, so
+the cost is a few sorts over the transaction table rather than a Python
+loop per fund or per lot.
+
+Sells are first checked against the units held on their date: any part of
+a sell beyond them is oversold and left unmatched, so a sell is never
+matched to a lot bought after it.
+"""
+import numpy as np
+import pandas as pd
+
+# Units below this are treated as rounding noise left over from matching
+UNITS_EPSILON = 1e-9
+LONG_TERM_DAYS = 365
+
+HOLDINGS_COLUMNS = [
+    'fund_id', 'name', 'units_held', 'cost_basis', 'current_nav', 'market_value',
+    'unrealized_gain', 'realized_gain', 'avg_holding_days', 'oversold_units'
+]
+
+
+def prepare_transactions(transactions):
+    """Clean the ledger: typed columns, NAV back-filled from amount, FIFO order"""
+    tx = pd.DataFrame({
+        'fund_id': transactions['fund_id'].astype(str),
+        'date': pd.to_datetime(transactions['date'], errors='coerce'),
+        'type': transactions['type'].astype(str).str.strip().str.lower(),
+        'units': pd.to_numeric(transactions['units'], errors='coerce'),
+        'nav': pd.to_numeric(transactions['nav'], errors='coerce') if 'nav' in transactions else np.nan
+    })
+    if 'amount' in transactions:
+        amount = pd.to_numeric(transactions['amount'], errors='coerce')
+        tx['nav'] = tx['nav'].where(tx['nav'] > 0, amount / tx['units'])
+
+    valid = tx['type'].isin(['buy', 'sell']) & (tx['units'] > 0) & tx['date'].notna()
+    tx = tx[valid]
+    # Stable sort keeps the ledger order for same-day transactions
+    return tx.sort_values(['fund_id', 'date'], kind='mergesort')
+
+
+def value_portfolio(transactions, funds=None, as_of=None):
+    """Match sells to buy lots FIFO and value what is left at current NAV.
+
+    Returns a dict of DataFrames:
+      'holdings' - one row per fund (see HOLDINGS_COLUMNS)
+      'lots'     - open buy lots with remaining units and unrealized gain
+      'realized' - each (buy lot, sell) match with its gain and holding period
+      'oversold' - sells of more units than were held on their date
+    """
+    as_of = pd.Timestamp(as_of) if as_of is not None else pd.Timestamp.today().normalize()
+    if transactions is None or transactions.empty:
+        return {
+            'holdings': pd.DataFrame(columns=HOLDINGS_COLUMNS),
+            'lots': pd.DataFrame(),
+            'realized': pd.DataFrame(),
+            'oversold': pd.DataFrame()
+        }
+
+    tx = prepare_transactions(transactions)
+    codes, fund_ids = pd.factorize(tx['fund_id'], sort=True)
+    n_funds = len(fund_ids)
+    is_buy = (tx['type'] == 'buy').to_numpy()
+
+    shortfall = _shortfall(tx['units'].to_numpy(), is_buy, codes)
+
+    buys = tx[is_buy]
+    sells = tx[~is_buy]
+    buy_code, sell_code = codes[is_buy], codes[~is_buy]
+    buy_units = buys['units'].to_numpy()
+    # Only the units held at the time of each sell are matched to lots
+    sell_units = sells['units'].to_numpy() - shortfall[~is_buy]
+    sells = sells.assign(units=sell_units)
+
+    # Cumulative units within each fund, in FIFO order
+    buy_end = buys.groupby(buy_code)['units'].cumsum().to_numpy()
+    sell_end = sells.groupby(sell_code)['units'].cumsum().to_numpy()
+    total_bought = np.bincount(buy_code, weights=buy_units, minlength=n_funds)
+    total_sold = np.bincount(sell_code, weights=sell_units, minlength=n_funds)
+    # With the shortfall taken out, every sold unit has a lot to match
+    matched = np.minimum(total_bought, total_sold)
+
+    # Lay the funds end to end on one line
+    span = np.maximum(total_bought, total_sold)
+    offset = np.concatenate([[0.0], np.cumsum(span)[:-1]])
+    global_buy_end = offset[buy_code] + buy_end
+    global_sell_end = offset[sell_code] + sell_end
+
+    # Cut the matched part of the line at every lot and sell boundary
+    cuts = np.unique(np.concatenate([offset, offset + matched, global_buy_end, global_sell_end]))
+    lo, hi = cuts[:-1], cuts[1:]
+    mid = (lo + hi) / 2
+    segment_fund = np.searchsorted(offset, mid, side='right') - 1
+    keep = (mid < offset[segment_fund] + matched[segment_fund]) & (hi - lo > UNITS_EPSILON)
+    lo, hi, mid, segment_fund = lo[keep], hi[keep], mid[keep], segment_fund[keep]
+    lot = np.searchsorted(global_buy_end, mid)
+    sale = np.searchsorted(global_sell_end, mid)
+
+    quantity = hi - lo
+    buy_nav = buys['nav'].to_numpy()[lot]
+    sell_nav = sells['nav'].to_numpy()[sale]
+    buy_date = buys['date'].to_numpy()[lot]
+    sell_date = sells['date'].to_numpy()[sale]
+    realized = pd.DataFrame({
+        'fund_id': fund_ids[segment_fund],
+        'buy_date': buy_date,
+        'sell_date': sell_date,
+        'units': quantity,
+        'buy_nav': buy_nav,
+        'sell_nav': sell_nav,
+        'cost': quantity * buy_nav,
+        'proceeds': quantity * sell_nav,
+        'gain': quantity * (sell_nav - buy_nav),
+        'holding_days': (sell_date - buy_date).astype('timedelta64[D]').astype(int)
+    })
+    realized['long_term'] = realized['holding_days'] > LONG_TERM_DAYS
+
+    # Whatever of a lot lies beyond the fund's total sold units is still held
+    remaining = np.clip(buy_end - total_sold[buy_code], 0, buy_units)
+    current_nav = _current_navs(funds, fund_ids)
+    lots = pd.DataFrame({
+        'fund_id': fund_ids[buy_code],
+        'buy_date': buys['date'].to_numpy(),
+        'units': remaining,
+        'buy_nav': buys['nav'].to_numpy(),
+        'current_nav': current_nav[buy_code]
+    })
+    lots = lots[lots['units'] > UNITS_EPSILON].reset_index(drop=True)
+    lots['cost_basis'] = lots['units'] * lots['buy_nav']
+    lots['market_value'] = lots['units'] * lots['current_nav']
+    lots['unrealized_gain'] = lots['market_value'] - lots['cost_basis']
+    lots['holding_days'] = (as_of - lots['buy_date']).dt.days
+    lots['long_term'] = lots['holding_days'] > LONG_TERM_DAYS
+
+    oversold_units = np.bincount(codes, weights=shortfall, minlength=n_funds)
+    oversold = pd.DataFrame({
+        'fund_id': tx['fund_id'].to_numpy(),
+        'date': tx['date'].to_numpy(),
+        'units': tx['units'].to_numpy(),
+        'oversold_units': shortfall
+    })[shortfall > UNITS_EPSILON].reset_index(drop=True)
+
+    holdings = _holdings(lots, realized, fund_ids, current_nav, oversold_units, funds)
+    return {'holdings': holdings, 'lots': lots, 'realized': realized, 'oversold': oversold}
+
+
+def valuation_totals(valuation):
+    """Portfolio-level sums of a value_portfolio result"""
+    holdings = valuation['holdings']
+    return {
+        'portfolio_value': float(holdings['market_value'].sum()),
+        'cost_basis': float(holdings['cost_basis'].sum()),
+        'unrealized_gain': float(holdings['unrealized_gain'].sum()),
+        'realized_gain': float(holdings['realized_gain'].sum())
+    }
+
+
+def _shortfall(units, is_buy, codes):
+    """Units each transaction sells beyond what its fund holds at that point.
+
+    Holdings are the running sum of buys minus sells, floored at zero: an
+    oversold sell empties the fund instead of taking it negative. That
+    floored sum equals the raw running sum minus its running minimum (when
+    below zero), so each sell's shortfall is how far it lowers that minimum.
+    """
+    signed = pd.Series(np.where(is_buy, units, -units))
+    running = signed.groupby(codes).cumsum()
+    floor = np.minimum(running.groupby(codes).cummin().to_numpy(), 0.0)
+    previous = pd.Series(floor).groupby(codes).shift(fill_value=0.0).to_numpy()
+    return previous - floor
+
+
+def _current_navs(funds, fund_ids):
+    """current_nav per fund id, NaN where the fund is unknown"""
+    if funds is None or funds.empty or 'current_nav' not in funds:
+        return np.full(len(fund_ids), np.nan)
+    navs = pd.Series(
+        pd.to_numeric(funds['current_nav'], errors='coerce').to_numpy(),
+        index=funds['id'].astype(str)
+    )
+    navs = navs[~navs.index.duplicated(keep='last')]
+    return navs.reindex(fund_ids).to_numpy(dtype=float)
+
+
+def _holdings(lots, realized, fund_ids, current_nav, oversold, funds):
+    grouped = lots.groupby('fund_id')
+    holdings = pd.DataFrame({
+        'units_held': grouped['units'].sum(),
+        'cost_basis': grouped['cost_basis'].sum(),
+        'market_value': grouped['market_value'].sum(),
+        'unrealized_gain': grouped['unrealized_gain'].sum(),
+        'weighted_days': (lots['units'] * lots['holding_days']).groupby(lots['fund_id']).sum()
+    }).reindex(fund_ids, fill_value=0.0)
+
+    holdings['realized_gain'] = realized.groupby('fund_id')['gain'].sum().reindex(fund_ids, fill_value=0.0)
+    holdings['current_nav'] = current_nav
+    holdings['oversold_units'] = oversold
+    with np.errstate(invalid='ignore', divide='ignore'):
+        holdings['avg_holding_days'] = holdings['weighted_days'] / holdings['units_held']
+
+    names = pd.Series(dtype=object)
+    if funds is not None and not funds.empty and 'name' in funds:
+        names = pd.Series(funds['name'].to_numpy(), index=funds['id'].astype(str))
+        names = names[~names.index.duplicated(keep='last')]
+    holdings['name'] = names.reindex(fund_ids).to_numpy()
+
+    holdings.index.name = 'fund_id'
+    return holdings.reset_index()[HOLDINGS_COLUMNS]
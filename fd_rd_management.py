@@ -1,7 +1,8 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date, timedelta
-from google_sheets_manager import get_sheets_manager
+from google_sheets_manager import get_sheets_manager, load_sheet, rerun_fragment
+from core.calculations import fd_rd_maturity_value
+from table_view import show_table
 
 def show_fd_rd():
     """FD & RD Management"""
@@ -12,11 +13,7 @@ def show_fd_rd():
     tab1, tab2, tab3 = st.tabs(["📋 View FD/RD", "➕ Add FD/RD", "✏️ Manage FD/RD"])
     
     with tab1:
-        fd_rd_data = sheets_manager.read_data('FD_RD')
-        if not fd_rd_data.empty:
-            st.dataframe(fd_rd_data, use_container_width=True)
-        else:
-            st.info("No FD/RD added yet.")
+        show_table(sheets_manager, 'FD_RD', "fd_rd_view", "No FD/RD added yet.")
     
     with tab2:
         with st.form("add_fd_rd_form"):
@@ -63,57 +60,65 @@ def show_fd_rd():
                     st.error("Please fill in all required fields (*).")
     
     with tab3:
-        fd_rd_data = sheets_manager.read_data('FD_RD')
-        if not fd_rd_data.empty:
-            selected_fd_rd = st.selectbox(
-                "Select FD/RD to Manage",
-                options=fd_rd_data.index,
-                format_func=lambda x: f"{fd_rd_data.loc[x, 'name']} - ₹{fd_rd_data.loc[x, 'amount']}"
-            )
-            
-            fd_rd_info = fd_rd_data.loc[selected_fd_rd]
-            
-            # Calculate maturity value
-            start_date = pd.to_datetime(fd_rd_info['start_date'])
-            maturity_date = pd.to_datetime(fd_rd_info['maturity_date'])
-            years = (maturity_date - start_date).days / 365.25
-            principal = float(fd_rd_info['amount'])
-            rate = float(fd_rd_info['interest_rate'])
-            
-            if fd_rd_info['type'] == 'FD':
-                maturity_value = principal * (1 + rate/100) ** years
-            else:  # RD
-                # Simple RD calculation (monthly compounding)
-                months = years * 12
-                maturity_value = principal * months * (1 + rate/100/12) ** months
-            
-            st.subheader("FD/RD Details")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.write(f"**Name:** {fd_rd_info['name']}")
-                st.write(f"**Type:** {fd_rd_info['type']}")
-                st.write(f"**Bank:** {fd_rd_info['bank']}")
-                st.write(f"**Amount:** ₹{fd_rd_info['amount']:,.2f}")
-            
-            with col2:
-                st.write(f"**Interest Rate:** {fd_rd_info['interest_rate']}%")
-                st.write(f"**Start Date:** {fd_rd_info['start_date']}")
-                st.write(f"**Maturity Date:** {fd_rd_info['maturity_date']}")
-                st.write(f"**Estimated Maturity Value:** ₹{maturity_value:,.2f}")
-            
-            # Status management
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("✅ Mark as Matured", type="secondary"):
-                    if sheets_manager.update_row('FD_RD', selected_fd_rd, {'status': 'Matured'}):
-                        st.success("✅ Status updated!")
-                        st.rerun()
-            
-            with col2:
-                if st.button("🗑️ Delete FD/RD", type="secondary"):
-                    if sheets_manager.delete_row('FD_RD', selected_fd_rd):
-                        st.success("✅ FD/RD deleted!")
-                        st.rerun()
-        else:
-            st.info("No FD/RD to manage.")
+        manage_fd_rd(sheets_manager)
+
+
+@st.fragment
+def manage_fd_rd(sheets_manager):
+    """Status and delete actions for FD/RDs; reruns on its own"""
+    fd_rd_data = load_sheet(sheets_manager, 'FD_RD')
+    if not fd_rd_data.empty:
+        selected_fd_rd = st.selectbox(
+            "Select FD/RD to Manage",
+            options=fd_rd_data.index,
+            format_func=lambda x: f"{fd_rd_data.loc[x, 'name']} - ₹{fd_rd_data.loc[x, 'amount']}"
+        )
+        
+        fd_rd_info = fd_rd_data.loc[selected_fd_rd]
+        
+        # Calculate maturity value
+        maturity_value = fd_rd_maturity_value(
+            fd_rd_info['type'],
+            float(fd_rd_info['amount']),
+            float(fd_rd_info['interest_rate']),
+            fd_rd_info['start_date'],
+            fd_rd_info['maturity_date']
+        )
+        
+        st.subheader("FD/RD Details")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.write(f"**Name:** {fd_rd_info['name']}")
+            st.write(f"**Type:** {fd_rd_info['type']}")
+            st.write(f"**Bank:** {fd_rd_info['bank']}")
+            st.write(f"**Amount:** ₹{fd_rd_info['amount']:,.2f}")
+        
+        with col2:
+            st.write(f"**Interest Rate:** {fd_rd_info['interest_rate']}%")
+            st.write(f"**Start Date:** {fd_rd_info['start_date']}")
+            st.write(f"**Maturity Date:** {fd_rd_info['maturity_date']}")
+            st.write(f"**Estimated Maturity Value:** ₹{maturity_value:,.2f}")
+        
+        # Status management
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("✅ Mark as Matured", type="secondary"):
+                if sheets_manager.update_row('FD_RD', selected_fd_rd, {'status': 'Matured'}):
+                    st.success("✅ Status updated!")
+                    rerun_fragment()
+        
+        with col2:
+            if st.button("🗑️ Delete FD/RD", type="secondary"):
+                if sheets_manager.delete_row('FD_RD', selected_fd_rd):
+                    st.success("✅ FD/RD deleted!")
+                    rerun_fragment()
+        
+        matured = fd_rd_data.index[fd_rd_data['status'] == 'Matured']
+        if len(matured):
+            if st.button(f"🧹 Delete All Matured ({len(matured)})", type="secondary"):
+                if sheets_manager.delete_rows('FD_RD', matured):
+                    st.success(f"✅ Deleted {len(matured)} matured FD/RDs!")
+                    rerun_fragment()
+    else:
+        st.info("No FD/RD to manage.")
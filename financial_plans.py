@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
 from datetime import datetime, date, timedelta
-from google_sheets_manager import get_sheets_manager
+from google_sheets_manager import get_sheets_manager, load_sheet, rerun_fragment
+from core.calculations import plan_progress
+from table_view import show_table
 
 def show_financial_plans():
     """Financial Plans Management"""
@@ -13,11 +13,7 @@ def show_financial_plans():
     tab1, tab2, tab3 = st.tabs(["📋 View Plans", "➕ Create Plan", "✏️ Manage Plans"])
     
     with tab1:
-        plans_data = sheets_manager.read_data('FINANCIAL_PLANS')
-        if not plans_data.empty:
-            st.dataframe(plans_data, use_container_width=True)
-        else:
-            st.info("No financial plans created yet.")
+        show_table(sheets_manager, 'FINANCIAL_PLANS', "plans_view", "No financial plans created yet.")
     
     with tab2:
         with st.form("create_plan_form"):
@@ -65,46 +61,51 @@ def show_financial_plans():
                     st.error("Please fill in all required fields (*).")
     
     with tab3:
-        plans_data = sheets_manager.read_data('FINANCIAL_PLANS')
-        if not plans_data.empty:
-            selected_plan = st.selectbox(
-                "Select Plan to Manage",
-                options=plans_data.index,
-                format_func=lambda x: f"{plans_data.loc[x, 'name']} - {plans_data.loc[x, 'type']}"
-            )
-            
-            plan_info = plans_data.loc[selected_plan]
-            
-            # Calculate plan progress
-            target_amount = float(plan_info['target_amount'])
-            current_amount = float(plan_info['current_amount'])
-            monthly_investment = float(plan_info['monthly_investment'])
-            expected_return = float(plan_info['expected_return'])
-            
-            progress_percentage = (current_amount / target_amount * 100) if target_amount > 0 else 0
-            
-            st.subheader("Plan Progress")
-            st.progress(progress_percentage / 100)
-            st.write(f"**Progress:** {progress_percentage:.1f}% (₹{current_amount:,.2f} / ₹{target_amount:,.2f})")
-            
-            # Projected completion
-            if monthly_investment > 0 and expected_return > 0:
-                months_to_complete = np.log(target_amount / current_amount) / np.log(1 + expected_return/100/12)
-                completion_date = date.today() + timedelta(days=months_to_complete * 30)
-                st.write(f"**Projected Completion:** {completion_date.strftime('%Y-%m-%d')}")
-            
-            # Status management
-            col1, col2 = st.columns(2)
-            with col1:
-                if st.button("✅ Mark as Completed", type="secondary"):
-                    if sheets_manager.update_row('FINANCIAL_PLANS', selected_plan, {'status': 'Completed'}):
-                        st.success("✅ Plan marked as completed!")
-                        st.rerun()
-            
-            with col2:
-                if st.button("🗑️ Delete Plan", type="secondary"):
-                    if sheets_manager.delete_row('FINANCIAL_PLANS', selected_plan):
-                        st.success("✅ Plan deleted!")
-                        st.rerun()
-        else:
-            st.info("No plans to manage.")
+        manage_plans(sheets_manager)
+
+
+@st.fragment
+def manage_plans(sheets_manager):
+    """Progress and status actions for one plan; reruns on its own"""
+    plans_data = load_sheet(sheets_manager, 'FINANCIAL_PLANS')
+    if not plans_data.empty:
+        selected_plan = st.selectbox(
+            "Select Plan to Manage",
+            options=plans_data.index,
+            format_func=lambda x: f"{plans_data.loc[x, 'name']} - {plans_data.loc[x, 'type']}"
+        )
+        
+        plan_info = plans_data.loc[selected_plan]
+        
+        # Calculate plan progress
+        target_amount = float(plan_info['target_amount'])
+        current_amount = float(plan_info['current_amount'])
+        monthly_investment = float(plan_info['monthly_investment'])
+        expected_return = float(plan_info['expected_return'])
+        
+        progress = plan_progress(target_amount, current_amount, monthly_investment, expected_return)
+        progress_percentage = progress['progress_percentage']
+        
+        st.subheader("Plan Progress")
+        st.progress(min(progress_percentage / 100, 1.0))
+        st.write(f"**Progress:** {progress_percentage:.1f}% (₹{current_amount:,.2f} / ₹{target_amount:,.2f})")
+        
+        # Projected completion
+        if progress['completion_date']:
+            st.write(f"**Projected Completion:** {progress['completion_date'].strftime('%Y-%m-%d')}")
+        
+        # Status management
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("✅ Mark as Completed", type="secondary"):
+                if sheets_manager.update_row('FINANCIAL_PLANS', selected_plan, {'status': 'Completed'}):
+                    st.success("✅ Plan marked as completed!")
+                    rerun_fragment()
+        
+        with col2:
+            if st.button("🗑️ Delete Plan", type="secondary"):
+                if sheets_manager.delete_row('FINANCIAL_PLANS', selected_plan):
+                    st.success("✅ Plan deleted!")
+                    rerun_fragment()
+    else:
+        st.info("No plans to manage.")
@@ -1,118 +1,54 @@
-import gspread
-import pandas as pd
-from datetime import datetime
-from config import get_credentials, SHEET_CONFIG
+import os
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
+from config import TENANTS_FILE
+from core.sheets import GoogleSheetsManager, SessionView
+from core.tenants import TenantRegistry
+
+
+@st.cache_resource
+def get_tenant_registry():
+    """Shared registry when a tenants file is configured, otherwise None"""
+    if not os.path.exists(TENANTS_FILE):
+        return None
+    return TenantRegistry.from_file(TENANTS_FILE, on_error=st.error)
 
-class GoogleSheetsManager:
-    def __init__(self):
-        self.credentials = get_credentials()
-        self.gc = None
-        if self.credentials:
-            try:
-                self.gc = gspread.authorize(self.credentials)
-            except Exception as e:
-                st.error(f"Failed to authenticate with Google Sheets: {str(e)}")
-    
-    def get_worksheet(self, sheet_type):
-        """Get a specific worksheet"""
-        if not self.gc:
-            return None
-        
-        try:
-            config = SHEET_CONFIG[sheet_type]
-            sheet = self.gc.open_by_key(config['sheet_id'])
-            worksheet = sheet.worksheet(config['worksheet'])
-            return worksheet
-        except Exception as e:
-            st.error(f"Failed to access worksheet {sheet_type}: {str(e)}")
-            return None
-    
-    def read_data(self, sheet_type):
-        """Read data from a worksheet"""
-        worksheet = self.get_worksheet(sheet_type)
-        if not worksheet:
-            return pd.DataFrame()
-        
-        try:
-            records = worksheet.get_all_records()
-            return pd.DataFrame(records)
-        except Exception as e:
-            st.error(f"Failed to read data from {sheet_type}: {str(e)}")
-            return pd.DataFrame()
-    
-    def write_data(self, sheet_type, data):
-        """Write data to a worksheet"""
-        worksheet = self.get_worksheet(sheet_type)
-        if not worksheet:
-            return False
-        
-        try:
-            if isinstance(data, pd.DataFrame):
-                # Clear existing data and write new data
-                worksheet.clear()
-                if not data.empty:
-                    # Add headers
-                    worksheet.append_row(data.columns.tolist())
-                    # Add data rows
-                    for _, row in data.iterrows():
-                        worksheet.append_row(row.tolist())
-            return True
-        except Exception as e:
-            st.error(f"Failed to write data to {sheet_type}: {str(e)}")
-            return False
-    
-    def append_data(self, sheet_type, data):
-        """Append data to a worksheet"""
-        worksheet = self.get_worksheet(sheet_type)
-        if not worksheet:
-            return False
-        
-        try:
-            if isinstance(data, dict):
-                # Convert dict to list in the correct order
-                headers = worksheet.row_values(1)
-                row_data = [data.get(header, '') for header in headers]
-                worksheet.append_row(row_data)
-            elif isinstance(data, list):
-                worksheet.append_row(data)
-            return True
-        except Exception as e:
-            st.error(f"Failed to append data to {sheet_type}: {str(e)}")
-            return False
-    
-    def update_row(self, sheet_type, row_index, data):
-        """Update a specific row"""
-        worksheet = self.get_worksheet(sheet_type)
-        if not worksheet:
-            return False
-        
-        try:
-            if isinstance(data, dict):
-                headers = worksheet.row_values(1)
-                for col, value in data.items():
-                    if col in headers:
-                        col_index = headers.index(col) + 1
-                        worksheet.update_cell(row_index + 1, col_index, value)
-            return True
-        except Exception as e:
-            st.error(f"Failed to update row in {sheet_type}: {str(e)}")
-            return False
-    
-    def delete_row(self, sheet_type, row_index):
-        """Delete a specific row"""
-        worksheet = self.get_worksheet(sheet_type)
-        if not worksheet:
-            return False
-        
-        try:
-            worksheet.delete_rows(row_index + 1)
-            return True
-        except Exception as e:
-            st.error(f"Failed to delete row in {sheet_type}: {str(e)}")
-            return False
 
 # Initialize the manager
 @st.cache_resource
+def _get_default_manager():
+    return GoogleSheetsManager(on_error=st.error)
+
+
+def select_tenant():
+    """Sidebar picker for the client whose portfolio is shown"""
+    registry = get_tenant_registry()
+    if registry is not None:
+        st.sidebar.selectbox("Client", registry.tenant_ids(), key="tenant_id")
+
+
 def get_sheets_manager():
-    return GoogleSheetsManager()
+    """Manager for the client selected in this session"""
+    registry = get_tenant_registry()
+    if registry is None:
+        return _get_default_manager()
+    tenant_id = st.session_state.get("tenant_id") or registry.tenant_ids()[0]
+    return registry.get_manager(tenant_id)
+
+
+def load_sheet(sheets_manager, sheet_type):
+    """Sheet data shared by every tab and fragment of this session; treat it as read-only"""
+    views = st.session_state.setdefault("_sheet_views", {})
+    view = views.get(id(sheets_manager))
+    if view is None:
+        view = views[id(sheets_manager)] = SessionView(sheets_manager)
+    return view.read(sheet_type)
+
+
+def rerun_fragment():
+    """Rerun only the enclosing fragment, or the whole page outside a fragment rerun"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        # The click arrived during a full run, e.g. queued behind one
+        st.rerun()
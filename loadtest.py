@@ -0,0 +1,214 @@
+"""Concurrent-session load test for the shared sheets manager.
+
+The app shares one GoogleSheetsManager between every browser session
+(st.cache_resource), each session rendering on its own script thread. This
+harness reproduces that without Streamlit or Google: N threads, each a
+session with its own SessionView, navigate the app's pages against one
+manager backed by an in-memory fake of the Sheets API that sleeps
+``latency`` seconds per call. A share of page views also submits a form,
+which writes through the manager and invalidates the sheet for everyone.
+
+Usage:
+    python loadtest.py --sessions 1 4 16 64 --pages 50 --latency 0.2 --write-ratio 0.05
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+import numpy as np
+from core.calculations import fd_rd_maturity_table, plan_progress_table, portfolio_report
+from core.journal import Journal
+from core.sheets import GoogleSheetsManager, SessionView, SheetsSession
+from core.sip_schedule import expand_schedule, missing_installments
+from core.snapshot import SnapshotStore
+from core.valuation import value_portfolio
+from tests.fake_sheets import FakeBackend
+
+
+def sample_sheets(rows=200, seed=0):
+    """Plausible rows for every sheet type, ``rows`` per sheet"""
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+
+    def day(offset_days):
+        return (start + timedelta(days=offset_days)).strftime("%Y-%m-%d")
+
+    funds = [{
+        'id': f'f{i}', 'name': f'Fund {i}', 'category': rng.choice(['Large Cap', 'Mid Cap', 'Debt', 'Hybrid']),
+        'fund_house': rng.choice(['HDFC', 'SBI', 'ICICI', 'Axis']), 'current_nav': round(rng.uniform(10, 500), 2),
+        'fund_code': f'C{i}', 'risk_level': rng.choice(['Low', 'Moderate', 'High']), 'description': '',
+        'date_added': day(rng.randrange(1500))
+    } for i in range(rows)]
+    return {
+        'MUTUAL_FUNDS': funds,
+        'SIPS': [{
+            'id': f's{i}', 'name': f'SIP {i}', 'fund_id': rng.choice(funds)['id'], 'amount': rng.randrange(500, 20000, 500),
+            'frequency': rng.choice(['Monthly', 'Quarterly']), 'start_date': day(rng.randrange(1500)), 'end_date': '',
+            'status': rng.choice(['Active', 'Active', 'Paused']), 'auto_debit': 'TRUE', 'notes': '',
+            'paused_periods': '', 'date_created': day(0)
+        } for i in range(rows)],
+        'FD_RD': [{
+            'id': f'd{i}', 'name': f'Deposit {i}', 'type': rng.choice(['FD', 'RD']), 'bank': rng.choice(['SBI', 'HDFC']),
+            'amount': rng.randrange(10000, 500000, 1000), 'interest_rate': round(rng.uniform(5, 8), 2),
+            'start_date': day(rng.randrange(1000)), 'maturity_date': day(1000 + rng.randrange(1500)),
+            'status': rng.choice(['Active', 'Matured']), 'notes': '', 'date_created': day(0)
+        } for i in range(rows)],
+        'FINANCIAL_PLANS': [{
+            'id': f'p{i}', 'name': f'Plan {i}', 'type': rng.choice(['Retirement', 'Education', 'House']),
+            'target_amount': rng.randrange(100000, 10000000, 10000), 'target_date': day(2000 + rng.randrange(5000)),
+            'current_amount': rng.randrange(0, 100000, 1000), 'monthly_investment': rng.randrange(1000, 50000, 1000),
+            'expected_return': rng.choice([8, 10, 12]), 'priority': rng.choice(['High', 'Medium', 'Low']),
+            'description': '', 'status': 'Active', 'date_created': day(0)
+        } for i in range(max(rows // 20, 1))],
+        'MONTHLY_INVESTMENTS': [{
+            'id': f'm{i}', 'type': rng.choice(['SIP', 'Lump Sum', 'FD']), 'amount': rng.randrange(500, 50000, 500),
+            'date': day(rng.randrange(2000)), 'description': f'Investment {i}',
+            'category': rng.choice(['Equity', 'Debt', 'Hybrid']), 'notes': '', 'date_created': day(0)
+        } for i in range(rows)],
+        'TRANSACTIONS': [{
+            'id': f't{i}', 'fund_id': rng.choice(funds)['id'], 'date': day(rng.randrange(2000)),
+            'type': 'BUY' if rng.random() < 0.8 else 'SELL', 'units': round(rng.uniform(1, 100), 3),
+            'nav': round(rng.uniform(10, 500), 2), 'amount': 0, 'notes': '', 'date_created': day(0)
+        } for i in range(rows)]
+    }
+
+
+def dashboard(view, manager):
+    frames = {sheet_type: view.read(sheet_type) for sheet_type in
+              ['MUTUAL_FUNDS', 'SIPS', 'FD_RD', 'FINANCIAL_PLANS', 'MONTHLY_INVESTMENTS', 'TRANSACTIONS']}
+    portfolio_report(frames)
+
+
+def transactions(view, manager):
+    value_portfolio(view.read('TRANSACTIONS'), view.read('MUTUAL_FUNDS'))
+    manager.query_data('TRANSACTIONS', sort_by='date', ascending=False)
+
+
+def sip_management(view, manager):
+    missing_installments(expand_schedule(view.read('SIPS')), view.read('MONTHLY_INVESTMENTS'))
+    manager.query_data('SIPS', filters={'status': ['Active']})
+
+
+def fd_rd(view, manager):
+    fd_rd_maturity_table(view.read('FD_RD'))
+    manager.query_data('FD_RD', sort_by='maturity_date')
+
+
+def financial_plans(view, manager):
+    plan_progress_table(view.read('FINANCIAL_PLANS'))
+
+
+def monthly_investments(view, manager):
+    view.read('MONTHLY_INVESTMENTS')
+    manager.query_data('MONTHLY_INVESTMENTS', sort_by='date', ascending=False)
+
+
+def mutual_funds(view, manager):
+    view.read('MUTUAL_FUNDS')
+    manager.query_data('MUTUAL_FUNDS', search='fund')
+
+
+PAGES = {
+    'Dashboard': dashboard,
+    'Mutual Funds': mutual_funds,
+    'Transactions': transactions,
+    'SIP Management': sip_management,
+    'FD & RD': fd_rd,
+    'Financial Plans': financial_plans,
+    'Monthly Investments': monthly_investments
+}
+
+
+def submit_form(manager, rng):
+    """One of the app's writes: a new investment or a SIP paused/resumed"""
+    if rng.random() < 0.5:
+        manager.append_data('MONTHLY_INVESTMENTS', {
+            'id': f'm{rng.randrange(10 ** 9)}', 'type': 'Lump Sum', 'amount': 1000,
+            'date': date.today().strftime("%Y-%m-%d"), 'description': 'load test', 'category': 'Equity'
+        })
+    else:
+        sips = manager.read_data('SIPS')
+        if not sips.empty:
+            manager.update_row('SIPS', rng.choice(list(sips.index)), {'status': rng.choice(['Active', 'Paused'])})
+
+
+def run_session(manager, pages, write_ratio, seed, latencies, start):
+    """One browser session: ``pages`` page views, timed from click to rendered"""
+    rng = random.Random(seed)
+    view = SessionView(manager)
+    names = list(PAGES)
+    start.wait()
+    for _ in range(pages):
+        began = time.perf_counter()
+        if rng.random() < write_ratio:
+            submit_form(manager, rng)
+        PAGES[rng.choice(names)](view, manager)
+        latencies.append(time.perf_counter() - began)
+
+
+def run_load(sessions, pages=50, latency=0.1, write_ratio=0.05, rows=200, seed=0):
+    """Run ``sessions`` concurrent sessions against a fresh fake backend; returns the measurements"""
+    backend = FakeBackend(sample_sheets(rows, seed), latency)
+    errors = []
+    manager = GoogleSheetsManager(
+        snapshot_store=SnapshotStore(None),
+        on_error=errors.append,
+        background_refresh=False,
+        session=SheetsSession(credentials=False, client=backend),
+        journal=Journal(None)
+    )
+
+    latencies = []
+    start = threading.Barrier(sessions + 1)
+    threads = [
+        threading.Thread(target=run_session, args=(manager, pages, write_ratio, seed + i, latencies, start))
+        for i in range(sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'sessions': sessions,
+        'page_views': len(latencies),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 1),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 1),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'api_calls': backend.calls,
+        'errors': len(errors)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test against a fake Sheets backend")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 4, 16, 64], help="Concurrent sessions per run")
+    parser.add_argument("--pages", type=int, default=50, help="Page views per session")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per fake API call")
+    parser.add_argument("--write-ratio", type=float, default=0.05, help="Share of page views that submit a form")
+    parser.add_argument("--rows", type=int, default=200, help="Rows per sheet")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'sessions':>8} {'views':>7} {'p50 ms':>9} {'p99 ms':>9} {'views/s':>9} {'api calls':>10} {'errors':>7}")
+    for sessions in args.sessions:
+        result = run_load(sessions, args.pages, args.latency, args.write_ratio, args.rows)
+        results.append(result)
+        print(f"{result['sessions']:>8} {result['page_views']:>7} {result['p50_ms']:>9} {result['p99_ms']:>9} "
+              f"{result['throughput']:>9} {result['api_calls']:>10} {result['errors']:>7}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(result['errors'] for result in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,7 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date
-from google_sheets_manager import get_sheets_manager
+from google_sheets_manager import get_sheets_manager, load_sheet
+from table_view import show_table
 
 
 def show_monthly_investments():
@@ -13,9 +13,9 @@ def show_monthly_investments():
     tab1, tab2 = st.tabs(["📋 View Investments", "➕ Add Investment"])
     
     with tab1:
-        monthly_data = sheets_manager.read_data('MONTHLY_INVESTMENTS')
+        monthly_data = load_sheet(sheets_manager, 'MONTHLY_INVESTMENTS')
         if not monthly_data.empty:
-            st.dataframe(monthly_data, use_container_width=True)
+            show_table(sheets_manager, 'MONTHLY_INVESTMENTS', "monthly_view", "No monthly investments recorded yet.")
             st.subheader("Investment Summary by Type")
             summary = monthly_data.groupby('type')['amount'].sum()
             st.bar_chart(summary)
@@ -1,6 +1,6 @@
 import streamlit as st
-import plotly.graph_objects as go
-import numpy as np
+from core.calculations import lump_sum_returns, sip_projection
+from core.charts import multi_line_chart
 
 
 def show_returns_calculator():
@@ -27,23 +27,16 @@ def show_returns_calculator():
             submitted = st.form_submit_button("Calculate Returns", type="primary")
             
             if submitted:
-                total_investment = initial_investment + additional_investments
-                absolute_return = current_value - total_investment
-                absolute_return_pct = (absolute_return / total_investment) * 100
-                
-                if investment_period > 0:
-                    cagr = ((current_value / total_investment) ** (1/investment_period) - 1) * 100
-                else:
-                    cagr = 0
+                returns = lump_sum_returns(initial_investment, current_value, investment_period, additional_investments)
                 
                 col1, col2, col3 = st.columns(3)
                 
                 with col1:
-                    st.metric("Total Investment", f"₹{total_investment:,.2f}")
+                    st.metric("Total Investment", f"₹{returns['total_investment']:,.2f}")
                 with col2:
-                    st.metric("Absolute Return", f"₹{absolute_return:,.2f}", f"{absolute_return_pct:.2f}%")
+                    st.metric("Absolute Return", f"₹{returns['absolute_return']:,.2f}", f"{returns['absolute_return_pct']:.2f}%")
                 with col3:
-                    st.metric("CAGR", f"{cagr:.2f}%")
+                    st.metric("CAGR", f"{returns['cagr']:.2f}%")
     
     with tab2:
         st.subheader("SIP Returns Calculator")
@@ -63,22 +56,9 @@ def show_returns_calculator():
             submitted = st.form_submit_button("Calculate SIP Returns", type="primary")
             
             if submitted:
-                months = sip_duration * 12
-                monthly_return = expected_return / 100 / 12
-                
-                total_investment = 0
-                future_value = 0
-                
-                for year in range(sip_duration):
-                    year_amount = sip_amount * (1 + step_up/100) ** year
-                    year_investment = year_amount * 12
-                    total_investment += year_investment
-                    remaining_months = (sip_duration - year) * 12
-                    if monthly_return > 0:
-                        year_fv = year_investment * ((1 + monthly_return) ** remaining_months - 1) / monthly_return
-                    else:
-                        year_fv = year_investment
-                    future_value += year_fv
+                projection = sip_projection(sip_amount, sip_duration, expected_return, step_up)
+                total_investment = projection['cumulative_investment'].iloc[-1]
+                future_value = projection['projected_value'].iloc[-1]
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
@@ -90,28 +70,9 @@ def show_returns_calculator():
                     profit_pct = (profit / total_investment) * 100 if total_investment > 0 else 0
                     st.metric("Profit", f"₹{profit:,.2f}", f"{profit_pct:.2f}%")
                 
-                years = list(range(1, sip_duration + 1))
-                cumulative_investment = []
-                projected_value = []
-                
-                running_investment = 0
-                running_value = 0
-                
-                for year in years:
-                    year_amount = sip_amount * (1 + step_up/100) ** (year - 1)
-                    year_investment = year_amount * 12
-                    running_investment += year_investment
-                    cumulative_investment.append(running_investment)
-                    remaining_months = (sip_duration - year + 1) * 12
-                    if monthly_return > 0:
-                        year_fv = year_investment * ((1 + monthly_return) ** remaining_months - 1) / monthly_return
-                    else:
-                        year_fv = year_investment
-                    running_value += year_fv
-                    projected_value.append(running_value)
-                
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(x=years, y=cumulative_investment, name='Total Investment', line=dict(color='blue')))
-                fig.add_trace(go.Scatter(x=years, y=projected_value, name='Projected Value', line=dict(color='green')))
-                fig.update_layout(title="SIP Projection Over Time", xaxis_title="Years", yaxis_title="Amount (₹)", hovermode='x unified')
+                fig = multi_line_chart(
+                    projection, 'year',
+                    [('cumulative_investment', 'Total Investment', 'blue'), ('projected_value', 'Projected Value', 'green')],
+                    title="SIP Projection Over Time", xaxis_title="Years", yaxis_title="Amount (₹)"
+                )
                 st.plotly_chart(fig, use_container_width=True)
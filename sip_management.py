@@ -1,7 +1,14 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, date
-from google_sheets_manager import get_sheets_manager
+from google_sheets_manager import get_sheets_manager, load_sheet, rerun_fragment
+from table_view import show_table
+from core.sip_schedule import (
+    expand_schedule,
+    missing_installments,
+    pause_periods,
+    post_missing_installments,
+    resume_periods
+)
 
 def show_sip_management():
     """SIP Management"""
@@ -9,14 +16,10 @@ def show_sip_management():
     
     sheets_manager = get_sheets_manager()
     
-    tab1, tab2, tab3 = st.tabs(["📋 View SIPs", "➕ Add SIP", "✏️ Manage SIPs"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📋 View SIPs", "➕ Add SIP", "✏️ Manage SIPs", "🗓️ Installments"])
     
     with tab1:
-        sip_data = sheets_manager.read_data('SIPS')
-        if not sip_data.empty:
-            st.dataframe(sip_data, use_container_width=True)
-        else:
-            st.info("No SIPs added yet.")
+        show_table(sheets_manager, 'SIPS', "sip_view", "No SIPs added yet.")
     
     with tab2:
         with st.form("add_sip_form"):
@@ -50,6 +53,7 @@ def show_sip_management():
                         'end_date': end_date.strftime("%Y-%m-%d") if end_date else '',
                         'status': status,
                         'auto_debit': auto_debit,
+                        'paused_periods': '',
                         'notes': notes,
                         'date_created': datetime.now().strftime("%Y-%m-%d")
                     }
@@ -63,50 +67,88 @@ def show_sip_management():
                     st.error("Please fill in all required fields (*).")
     
     with tab3:
-        sip_data = sheets_manager.read_data('SIPS')
-        if not sip_data.empty:
-            selected_sip = st.selectbox(
-                "Select SIP to Manage",
-                options=sip_data.index,
-                format_func=lambda x: f"{sip_data.loc[x, 'name']} - ₹{sip_data.loc[x, 'amount']}"
-            )
-            
-            sip_info = sip_data.loc[selected_sip]
-            
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                if st.button("⏸️ Pause SIP", type="secondary"):
-                    if sheets_manager.update_row('SIPS', selected_sip, {'status': 'Paused'}):
-                        st.success("✅ SIP paused!")
-                        st.rerun()
-            
-            with col2:
-                if st.button("▶️ Resume SIP", type="secondary"):
-                    if sheets_manager.update_row('SIPS', selected_sip, {'status': 'Active'}):
-                        st.success("✅ SIP resumed!")
-                        st.rerun()
-            
-            with col3:
-                if st.button("✅ Complete SIP", type="secondary"):
-                    if sheets_manager.update_row('SIPS', selected_sip, {'status': 'Completed'}):
-                        st.success("✅ SIP completed!")
-                        st.rerun()
-            
-            # Display SIP details
-            st.subheader("SIP Details")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.write(f"**Name:** {sip_info['name']}")
-                st.write(f"**Amount:** ₹{sip_info['amount']}")
-                st.write(f"**Frequency:** {sip_info['frequency']}")
-                st.write(f"**Status:** {sip_info['status']}")
-            
-            with col2:
-                st.write(f"**Start Date:** {sip_info['start_date']}")
-                st.write(f"**End Date:** {sip_info.get('end_date', 'Not set')}")
-                st.write(f"**Auto Debit:** {'Yes' if sip_info.get('auto_debit') else 'No'}")
-                st.write(f"**Notes:** {sip_info.get('notes', 'None')}")
-        else:
-            st.info("No SIPs to manage.")
+        manage_sips(sheets_manager)
+    
+    with tab4:
+        show_installments(sheets_manager)
+
+
+@st.fragment
+def manage_sips(sheets_manager):
+    """Status actions for one SIP; reruns on its own"""
+    sip_data = load_sheet(sheets_manager, 'SIPS')
+    if not sip_data.empty:
+        selected_sip = st.selectbox(
+            "Select SIP to Manage",
+            options=sip_data.index,
+            format_func=lambda x: f"{sip_data.loc[x, 'name']} - ₹{sip_data.loc[x, 'amount']}"
+        )
+        
+        sip_info = sip_data.loc[selected_sip]
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            if st.button("⏸️ Pause SIP", type="secondary"):
+                update = {'status': 'Paused', 'paused_periods': pause_periods(sip_info.get('paused_periods'))}
+                if sheets_manager.update_row('SIPS', selected_sip, update, add_columns=True):
+                    st.success("✅ SIP paused!")
+                    rerun_fragment()
+        
+        with col2:
+            if st.button("▶️ Resume SIP", type="secondary"):
+                update = {'status': 'Active', 'paused_periods': resume_periods(sip_info.get('paused_periods'))}
+                if sheets_manager.update_row('SIPS', selected_sip, update, add_columns=True):
+                    st.success("✅ SIP resumed!")
+                    rerun_fragment()
+        
+        with col3:
+            if st.button("✅ Complete SIP", type="secondary"):
+                if sheets_manager.update_row('SIPS', selected_sip, {'status': 'Completed'}):
+                    st.success("✅ SIP completed!")
+                    rerun_fragment()
+        
+        # Display SIP details
+        st.subheader("SIP Details")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.write(f"**Name:** {sip_info['name']}")
+            st.write(f"**Amount:** ₹{sip_info['amount']}")
+            st.write(f"**Frequency:** {sip_info['frequency']}")
+            st.write(f"**Status:** {sip_info['status']}")
+        
+        with col2:
+            st.write(f"**Start Date:** {sip_info['start_date']}")
+            st.write(f"**End Date:** {sip_info.get('end_date', 'Not set')}")
+            st.write(f"**Auto Debit:** {'Yes' if sip_info.get('auto_debit') else 'No'}")
+            st.write(f"**Notes:** {sip_info.get('notes', 'None')}")
+    else:
+        st.info("No SIPs to manage.")
+
+
+@st.fragment
+def show_installments(sheets_manager):
+    """Due installments missing from Monthly Investments; reruns on its own"""
+    st.subheader("Due Installments Not Yet Recorded")
+    schedule = expand_schedule(load_sheet(sheets_manager, 'SIPS'))
+    missing = missing_installments(schedule, load_sheet(sheets_manager, 'MONTHLY_INVESTMENTS'))
+    
+    if not missing.empty:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Missing Installments", len(missing))
+        with col2:
+            st.metric("Amount", f"₹{missing['amount'].sum():,.2f}")
+        
+        st.dataframe(missing, use_container_width=True, hide_index=True)
+        
+        if st.button(f"📥 Post {len(missing)} Installments", type="primary"):
+            posted = post_missing_installments(sheets_manager)
+            if posted is not None:
+                st.success(f"✅ Posted {len(posted)} installments to Monthly Investments!")
+                rerun_fragment()
+            else:
+                st.error("❌ Failed to post installments.")
+    else:
+        st.info("All due SIP installments are recorded.")
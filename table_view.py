@@ -0,0 +1,82 @@
+import math
+import streamlit as st
+from core.query import INDEXED_COLUMNS
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def _label(column):
+    return column.replace('_', ' ').title()
+
+
+@st.fragment
+def show_table(sheets_manager, sheet_type, key, empty_message):
+    """Render one page of a sheet with filter, sort and paging widgets"""
+    index = sheets_manager.get_index(sheet_type)
+    if index.size == 0:
+        st.info(empty_message)
+        return
+
+    columns = INDEXED_COLUMNS.get(sheet_type, {})
+    filters = {}
+    date_range = None
+
+    with st.expander("🔍 Filter & Sort"):
+        categorical = [c for c in columns.get('categorical', []) if c in index.categorical]
+        if categorical:
+            filter_cols = st.columns(len(categorical))
+            for col, column in zip(filter_cols, categorical):
+                with col:
+                    filters[column] = st.multiselect(
+                        _label(column), index.values(column), key=f"{key}_filter_{column}"
+                    )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            search = st.text_input("Search", placeholder="Text in any column", key=f"{key}_search")
+        with col2:
+            if index.date_column:
+                picked = st.date_input(
+                    f"{_label(index.date_column)} Range", value=(), key=f"{key}_dates"
+                )
+                if len(picked) == 2:
+                    date_range = picked
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sort_by = st.selectbox(
+                "Sort By", [None] + list(index.data.columns),
+                format_func=lambda c: "—" if c is None else _label(c),
+                key=f"{key}_sort"
+            )
+        with col2:
+            descending = st.checkbox("Descending", key=f"{key}_desc")
+        with col3:
+            page_size = st.selectbox("Rows per Page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    query = {
+        'filters': filters,
+        'date_range': date_range,
+        'search': search,
+        'sort_by': sort_by,
+        'ascending': not descending,
+        'page_size': page_size
+    }
+    page_key = f"{key}_page"
+    page = st.session_state.get(page_key, 1)
+    page_data, total = sheets_manager.query_data(sheet_type, page=page, **query)
+
+    # Narrowing the filters can leave the remembered page past the end
+    pages = max(math.ceil(total / page_size), 1)
+    if page > pages:
+        page = pages
+        page_data, total = sheets_manager.query_data(sheet_type, page=page, **query)
+    st.session_state[page_key] = page
+
+    if total:
+        first = (page - 1) * page_size + 1
+        st.dataframe(page_data, use_container_width=True)
+        st.caption(f"Showing {first}–{first + len(page_data) - 1} of {total} matching rows ({index.size} total)")
+    else:
+        st.info("No rows match the selected filters.")
+    st.number_input("Page", min_value=1, max_value=pages, key=page_key)
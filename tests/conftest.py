@@ -0,0 +1,23 @@
+import pytest
+from core.journal import Journal
+from core.sheets import GoogleSheetsManager, SheetsSession
+from core.snapshot import SnapshotStore
+from tests.fake_sheets import FakeBackend
+
+
+@pytest.fixture
+def make_manager():
+    """Manager over an in-memory FakeBackend seeded with {sheet_type: rows}; ``missing`` sheets fail to open"""
+    def make(sheets, journal_dir=None, snapshot_path=None, missing=(), **kwargs):
+        backend = FakeBackend(sheets)
+        for sheet_type in missing:
+            backend.remove(sheet_type)
+        manager = GoogleSheetsManager(
+            snapshot_store=SnapshotStore(snapshot_path),
+            background_refresh=False,
+            session=SheetsSession(credentials=False, client=backend),
+            journal=Journal(journal_dir),
+            **kwargs
+        )
+        return manager, backend
+    return make
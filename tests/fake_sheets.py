@@ -0,0 +1,183 @@
+"""In-memory stand-in for the gspread client, shared by the tests and loadtest.py"""
+import threading
+import time
+from gspread.exceptions import WorksheetNotFound
+from config import SHEET_CONFIG
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeHTTPClient:
+    """Drive metadata endpoint used for change markers"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def request(self, method, url, params=None):
+        sheet_id = url.rsplit('/', 1)[1]
+        self.backend.call()
+        return FakeResponse({'version': str(self.backend.version(sheet_id))})
+
+
+class FakeWorksheet:
+    """A worksheet held as a grid of rows, the first being the headers"""
+
+    def __init__(self, backend, spreadsheet, grid):
+        self.backend = backend
+        self.spreadsheet = spreadsheet
+        self.grid = grid
+        self.id = 0
+        self.col_count = len(grid[0]) if grid else 0
+        self.fetches = 0
+
+    def get_all_records(self):
+        self.backend.call()
+        self.fetches += 1
+        with self.backend.lock:
+            headers = self.grid[0] if self.grid else []
+            return [
+                dict(zip(headers, row + [''] * (len(headers) - len(row))))
+                for row in self.grid[1:]
+            ]
+
+    def row_values(self, row):
+        self.backend.call()
+        with self.backend.lock:
+            return list(self.grid[row - 1]) if row <= len(self.grid) else []
+
+    def append_row(self, values):
+        self.append_rows([values])
+
+    def append_rows(self, rows, **kwargs):
+        self.backend.call()
+        with self.backend.lock:
+            self.grid.extend(list(row) for row in rows)
+        self.spreadsheet.touch()
+
+    def update_cell(self, row, col, value):
+        self.backend.call()
+        with self.backend.lock:
+            self._set(row, col, value)
+        self.spreadsheet.touch()
+
+    def batch_update(self, updates, **kwargs):
+        self.backend.call()
+        with self.backend.lock:
+            for update in updates:
+                row, col = _a1_to_rowcol(update['range'])
+                self._set(row, col, update['values'][0][0])
+        self.spreadsheet.touch()
+
+    def add_cols(self, cols):
+        self.backend.call()
+        self.col_count += cols
+
+    def clear(self):
+        self.backend.call()
+        with self.backend.lock:
+            del self.grid[:]
+        self.spreadsheet.touch()
+
+    def _set(self, row, col, value):
+        while len(self.grid) < row:
+            self.grid.append([])
+        cells = self.grid[row - 1]
+        cells.extend([''] * (col - len(cells)))
+        cells[col - 1] = value
+
+
+class FakeSpreadsheet:
+    def __init__(self, backend, sheet_id):
+        self.backend = backend
+        self.id = sheet_id
+
+    def worksheet(self, name):
+        self.backend.call()
+        if (self.id, name) in self.backend.missing:
+            raise WorksheetNotFound(name)
+        return self.backend.worksheet(self.id, name)
+
+    def batch_update(self, body):
+        self.backend.call()
+        with self.backend.lock:
+            for request in body['requests']:
+                span = request['deleteDimension']['range']
+                worksheet = self.backend.worksheet_by_gid(self.id, span['sheetId'])
+                del worksheet.grid[span['startIndex']:span['endIndex']]
+        self.touch()
+
+    def touch(self):
+        self.backend.bump(self.id)
+
+
+class FakeBackend:
+    """In-memory stand-in for an authorized gspread client"""
+
+    def __init__(self, sheets, latency=0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.http_client = FakeHTTPClient(self)
+        self._worksheets = {}
+        self._versions = {}
+        # (sheet_id, worksheet name) pairs that fail to open, as if never created
+        self.missing = set()
+        for sheet_type, rows in sheets.items():
+            config = SHEET_CONFIG[sheet_type]
+            headers = list(rows[0]) if rows else []
+            grid = [headers] + [[row.get(h, '') for h in headers] for row in rows]
+            spreadsheet = FakeSpreadsheet(self, config['sheet_id'])
+            self._worksheets[(config['sheet_id'], config['worksheet'])] = FakeWorksheet(self, spreadsheet, grid)
+
+    def call(self):
+        with self.lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def open_by_key(self, sheet_id):
+        self.call()
+        return FakeSpreadsheet(self, sheet_id)
+
+    def worksheet(self, sheet_id, name):
+        key = (sheet_id, name)
+        with self.lock:
+            if key not in self._worksheets:
+                spreadsheet = FakeSpreadsheet(self, sheet_id)
+                self._worksheets[key] = FakeWorksheet(self, spreadsheet, [])
+            return self._worksheets[key]
+
+    def sheet(self, sheet_type):
+        """Worksheet behind a sheet type of SHEET_CONFIG"""
+        config = SHEET_CONFIG[sheet_type]
+        return self.worksheet(config['sheet_id'], config['worksheet'])
+
+    def remove(self, sheet_type):
+        """Make a sheet type's worksheet fail to open"""
+        config = SHEET_CONFIG[sheet_type]
+        self.missing.add((config['sheet_id'], config['worksheet']))
+
+    def worksheet_by_gid(self, sheet_id, gid):
+        return next(ws for (sid, _), ws in self._worksheets.items() if sid == sheet_id and ws.id == gid)
+
+    def version(self, sheet_id):
+        with self.lock:
+            return self._versions.get(sheet_id, 1)
+
+    def bump(self, sheet_id):
+        with self.lock:
+            self._versions[sheet_id] = self._versions.get(sheet_id, 1) + 1
+
+
+def _a1_to_rowcol(label):
+    letters = ''.join(c for c in label if c.isalpha())
+    col = 0
+    for c in letters.upper():
+        col = col * 26 + ord(c) - ord('A') + 1
+    return int(label[len(letters):]), col
@@ -0,0 +1,47 @@
+import pytest
+from batch import checkpoint_sheets, report_frames
+from core.calculations import REPORT_SHEETS, portfolio_report
+
+
+def portfolio():
+    return {
+        'MUTUAL_FUNDS': [{'id': 'f1', 'name': 'Fund', 'current_nav': 20}],
+        'SIPS': [{'id': 's1', 'amount': 500, 'status': 'Active'}],
+        'FD_RD': [{'id': 'd1', 'type': 'FD', 'amount': 1000, 'interest_rate': 7, 'status': 'Active',
+                   'start_date': '2024-01-01', 'maturity_date': '2025-01-01'}],
+        'FINANCIAL_PLANS': [{'id': 'p1', 'name': 'Plan', 'target_amount': 1000, 'current_amount': 100,
+                             'monthly_investment': 100, 'expected_return': 10, 'status': 'Active',
+                             'target_date': '2030-01-01'}],
+        'MONTHLY_INVESTMENTS': [{'id': 'm1', 'type': 'SIP', 'amount': 500, 'date': '2024-01-05',
+                                 'category': 'Equity'}],
+    }
+
+
+def test_reports_read_only_the_sheets_they_need(make_manager):
+    errors = []
+    manager, backend = make_manager(portfolio(), on_error=errors.append, missing=['TRANSACTIONS', 'NAV_HISTORY'])
+
+    frames = report_frames(manager, errors)
+    assert errors == []
+    assert list(frames) == REPORT_SHEETS
+    assert frames['TRANSACTIONS'].empty
+    assert portfolio_report(frames)['valuation']['portfolio_value'] == 0.0
+    assert backend.sheet('NAV_HISTORY').fetches == 0
+
+
+def test_a_missing_required_sheet_is_still_an_error(make_manager):
+    errors = []
+    manager, _ = make_manager(portfolio(), on_error=errors.append, missing=['FD_RD'])
+    report_frames(manager, errors)
+    assert len(errors) == 1 and 'FD_RD' in errors[0]
+
+
+def test_checkpoints_skip_missing_optional_sheets(make_manager, tmp_path):
+    manager, _ = make_manager(portfolio(), journal_dir=tmp_path, missing=['TRANSACTIONS', 'NAV_HISTORY'])
+    # Seven sheets configured, two of them missing
+    assert checkpoint_sheets('client', manager) == 5
+    assert manager.read_as_of('SIPS', None)['id'].tolist() == ['s1']
+
+    manager, _ = make_manager(portfolio(), journal_dir=tmp_path / 'other', missing=['SIPS'])
+    with pytest.raises(RuntimeError, match='SIPS'):
+        checkpoint_sheets('client', manager)
@@ -0,0 +1,84 @@
+from tests.fake_sheets import FakeBackend
+
+
+def sheets():
+    return {
+        'FD_RD': [{'id': 'd0', 'status': 'Active'}],
+        'SIPS': [{'id': 's0', 'status': 'Active'}],
+    }
+
+
+def edit_directly(backend, sheet_type, row, col, value):
+    """An edit made in Google Sheets, bypassing the manager"""
+    worksheet = backend.sheet(sheet_type)
+    worksheet.grid[row - 1][col - 1] = value
+    worksheet.spreadsheet.touch()
+
+
+def poll(manager):
+    """One background poll, reading every marker afresh"""
+    sheet_ids = [config['sheet_id'] for config in manager.sheet_config.values()]
+    return manager.refresh_changed(manager.session.change_markers(sheet_ids, max_age=0))
+
+
+def test_fetches_and_writes_are_not_seen_as_changes(make_manager):
+    manager, backend = make_manager(sheets())
+    manager.read_data('FD_RD')
+    manager.read_data('SIPS')
+    assert poll(manager) == []
+
+    manager.update_row('SIPS', 0, {'status': 'Paused'})
+    assert manager.read_data('SIPS').loc[0, 'status'] == 'Paused'
+    assert poll(manager) == []
+    assert backend.sheet('SIPS').fetches == 2
+    assert backend.sheet('FD_RD').fetches == 1
+
+
+def test_direct_edits_refresh_only_the_changed_sheet(make_manager):
+    manager, backend = make_manager(sheets())
+    manager.read_data('FD_RD')
+    manager.read_data('SIPS')
+    edit_directly(backend, 'FD_RD', 2, 2, 'Matured')
+
+    assert poll(manager) == ['FD_RD']
+    assert manager.read_data('FD_RD').loc[0, 'status'] == 'Matured'
+    assert backend.sheet('SIPS').fetches == 1
+    assert poll(manager) == []
+
+
+def test_uncached_sheets_and_unknown_markers_are_skipped(make_manager):
+    manager, backend = make_manager(sheets())
+    manager.read_data('FD_RD')
+    edit_directly(backend, 'SIPS', 2, 2, 'Paused')
+    assert manager.changed_sheets({}) == []
+    assert poll(manager) == []
+    assert backend.sheet('SIPS').fetches == 0
+
+
+def test_recent_markers_are_shared_between_callers(make_manager):
+    manager, backend = make_manager(sheets())
+    requests = []
+    request = backend.http_client.request
+    backend.http_client.request = lambda *args, **kwargs: requests.append(args) or request(*args, **kwargs)
+
+    sheet_ids = ['your_fd_rd_sheet_id', 'your_sips_sheet_id']
+    first = manager.session.change_markers(sheet_ids, max_age=60)
+    assert manager.session.change_markers(sheet_ids, max_age=60) == first
+    assert len(requests) == 2
+    manager.session.change_markers(sheet_ids, max_age=0)
+    assert len(requests) == 4
+
+
+def test_a_restart_refetches_only_what_changed_meanwhile(make_manager, tmp_path):
+    path = str(tmp_path / 'snapshot.pkl')
+    manager, backend = make_manager(sheets(), snapshot_path=path)
+    manager.read_data('FD_RD')
+    manager.read_data('SIPS')
+    manager.save_snapshot()
+    edit_directly(backend, 'SIPS', 2, 2, 'Paused')
+
+    restarted, _ = make_manager({}, snapshot_path=path)
+    restarted.session.gc = restarted.gc = backend
+    assert poll(restarted) == ['SIPS']
+    assert restarted.read_data('SIPS').loc[0, 'status'] == 'Paused'
+    assert backend.sheet('FD_RD').fetches == 1
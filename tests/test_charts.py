@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from core.charts import FigureCache, data_key, downsample, line_chart, lttb_indices
+
+
+def test_series_within_budget_are_kept_whole():
+    assert lttb_indices(np.arange(10), np.arange(10), 10).tolist() == list(range(10))
+    assert lttb_indices(np.arange(10), np.arange(10), 2).tolist() == list(range(10))
+
+
+def test_budget_is_met_with_the_endpoints_and_increasing_indices():
+    y = np.random.default_rng(0).normal(size=10_000)
+    kept = lttb_indices(np.arange(len(y)), y, 500)
+    assert len(kept) == 500
+    assert kept[0] == 0 and kept[-1] == len(y) - 1
+    assert (np.diff(kept) > 0).all()
+
+
+def test_peaks_and_troughs_survive():
+    y = np.sin(np.linspace(0, 20, 5000)) * 0.01
+    y[1234], y[3210] = 50.0, -50.0
+    kept = lttb_indices(np.arange(len(y)), y, 100)
+    assert 1234 in kept and 3210 in kept
+
+
+def test_uneven_x_spacing_is_respected():
+    x = np.concatenate([np.arange(100), 1000 + np.arange(100)]).astype(float)
+    y = np.where(np.arange(200) == 150, 9.0, 0.0)
+    assert 150 in lttb_indices(x, y, 20)
+
+
+def test_downsample_handles_dates_and_gaps():
+    dates = pd.date_range('2020-01-01', periods=3000, freq='D')
+    values = pd.Series(np.arange(3000, dtype=float))
+    values[10] = np.nan
+    x, y = downsample(dates, values, 300)
+    assert len(x) == len(y) == 300
+    assert x.iloc[0] == dates[0] and x.iloc[-1] == dates[-1]
+    assert x.is_monotonic_increasing
+
+
+def test_figures_are_reused_for_unchanged_data():
+    cache = FigureCache(max_entries=2)
+    built = []
+
+    def build():
+        built.append(1)
+        return object()
+
+    first = cache.get_or_build('a', build)
+    assert cache.get_or_build('a', build) is first
+    cache.get_or_build('b', build)
+    cache.get_or_build('c', build)
+    cache.get_or_build('a', build)
+    assert len(built) == 4
+
+
+def test_data_keys_follow_the_data():
+    frame = pd.DataFrame({'x': [1, 2], 'y': [3, 4]})
+    assert data_key(frame, 'title') == data_key(frame.copy(), 'title')
+    assert data_key(frame, 'title') != data_key(frame.assign(y=[3, 5]), 'title')
+    assert data_key(frame) != data_key(frame.rename(columns={'y': 'z'}))
+
+
+def test_line_charts_are_downsampled_and_cached():
+    series = pd.Series(np.random.default_rng(1).normal(size=5000).cumsum(),
+                       index=pd.date_range('2010-01-01', periods=5000, freq='D'))
+    figure = line_chart(series, 'NAV', {'x': 'Date', 'y': 'NAV'}, max_points=400)
+    assert len(figure.data[0].y) == 400
+    assert line_chart(series.copy(), 'NAV', {'x': 'Date', 'y': 'NAV'}, max_points=400) is figure
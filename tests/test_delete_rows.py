@@ -0,0 +1,64 @@
+from core.sheets import _delete_sheet_rows, _sheet_row
+
+
+class RecordingWorksheet:
+    id = 7
+
+    def __init__(self):
+        self.spreadsheet = self
+        self.requests = []
+
+    def batch_update(self, body):
+        self.requests.extend(body['requests'])
+
+
+def deposits(n):
+    return {'FD_RD': [{'id': f'd{i}', 'status': 'Active', 'amount': i} for i in range(n)]}
+
+
+def test_sheet_row_skips_the_header():
+    assert _sheet_row(0) == 2
+    assert _sheet_row(9) == 11
+
+
+def test_delete_ranges_are_merged_and_sent_bottom_up():
+    worksheet = RecordingWorksheet()
+    _delete_sheet_rows(worksheet, [11, 6, 5, 4, 2])
+    ranges = [(r['deleteDimension']['range']['startIndex'], r['deleteDimension']['range']['endIndex'])
+              for r in worksheet.requests]
+    # 0-based, end-exclusive: rows 11, 4-6 and 2
+    assert ranges == [(10, 11), (3, 6), (1, 2)]
+    assert all(r['deleteDimension']['range']['sheetId'] == 7 for r in worksheet.requests)
+
+
+def test_hard_delete_removes_exactly_the_given_rows(make_manager):
+    manager, backend = make_manager(deposits(10))
+    manager.read_data('FD_RD')
+    calls = backend.calls
+    assert manager.delete_rows('FD_RD', [8, 1, 2, 3, 5])
+    # Every range goes in one request
+    assert backend.calls - calls == 1
+    assert manager.read_data('FD_RD')['id'].tolist() == ['d0', 'd4', 'd6', 'd7', 'd9']
+
+
+def test_soft_delete_hides_rows_until_compacted(make_manager):
+    manager, _ = make_manager(deposits(6), soft_delete=True)
+    assert manager.delete_rows('FD_RD', [1, 4])
+    data = manager.read_data('FD_RD')
+    # Other rows keep their positions, so later updates address the right rows
+    assert data.index.tolist() == [0, 2, 3, 5]
+    assert manager.update_row('FD_RD', 5, {'amount': 50})
+    assert manager.read_data('FD_RD').loc[5, 'amount'] == 50
+
+    assert manager.compact('FD_RD') == 2
+    data = manager.read_data('FD_RD')
+    assert data['id'].tolist() == ['d0', 'd2', 'd3', 'd5']
+    assert data.index.tolist() == [0, 1, 2, 3]
+
+
+
+def test_nothing_to_delete_makes_no_calls(make_manager):
+    manager, backend = make_manager(deposits(2))
+    assert manager.delete_rows('FD_RD', [])
+    assert manager.compact('FD_RD') == 0
+    assert backend.sheet('FD_RD').fetches == 1
@@ -0,0 +1,127 @@
+import json
+import time
+import pandas as pd
+from core.journal import Journal
+from core.sheets import GoogleSheetsManager, SheetsSession
+from core.snapshot import SnapshotStore
+from tests.fake_sheets import FakeBackend
+
+
+def test_history_starts_when_the_journal_is_attached(make_manager, tmp_path):
+    manager, _ = make_manager({'FD_RD': [{'id': 'd0', 'amount': 1}]}, journal_dir=tmp_path)
+    manager.attach_journal()
+    attached = pd.Timestamp.now()
+    time.sleep(0.01)
+    manager.append_data('FD_RD', {'id': 'd1', 'amount': 2})
+
+    assert manager.read_as_of('FD_RD', attached)['id'].tolist() == ['d0']
+    assert manager.read_as_of('FD_RD', attached - pd.Timedelta(days=1)) is None
+
+
+def test_read_as_of_replays_every_kind_of_write(make_manager, tmp_path):
+    rows = [{'id': f'd{i}', 'amount': i} for i in range(5)]
+    manager, _ = make_manager({'FD_RD': rows}, journal_dir=tmp_path)
+    moments = []
+
+    def step(write):
+        write()
+        time.sleep(0.01)
+        moments.append((pd.Timestamp.now(), manager.read_data('FD_RD').reset_index(drop=True)))
+
+    step(lambda: manager.update_row('FD_RD', 0, {'amount': 100}))
+    step(lambda: manager.delete_rows('FD_RD', [1, 3]))
+    step(lambda: manager.append_rows('FD_RD', [{'id': 'n1', 'amount': 7}, {'id': 'n2', 'amount': 8}]))
+    step(lambda: manager.delete_rows('FD_RD', [0], soft=True))
+
+    for moment, expected in moments:
+        replayed = manager.read_as_of('FD_RD', moment).reset_index(drop=True)
+        assert replayed[expected.columns].astype(str).equals(expected.astype(str))
+
+
+def test_compaction_checkpoints_keep_replays_exact(tmp_path):
+    journal = Journal(tmp_path, checkpoint_bytes=200)
+    journal.checkpoint('S', pd.DataFrame(columns=['k']))
+    for k in range(50):
+        journal.record('S', 'append', rows=[{'k': k}])
+
+    index = (tmp_path / 'checkpoints.jsonl').read_text().splitlines()
+    assert len(index) > 5
+    assert Journal(tmp_path).as_of('S')['k'].tolist() == list(range(50))
+
+
+def test_event_lines_longer_than_the_read_buffer(make_manager, tmp_path):
+    errors = []
+    manager, _ = make_manager({'MONTHLY_INVESTMENTS': [{'id': 'm0', 'description': ''}]},
+                              journal_dir=tmp_path, on_error=errors.append)
+    bulk = [{'id': f'm{i}', 'description': 'x' * 100} for i in range(1, 101)]
+    assert manager.append_rows('MONTHLY_INVESTMENTS', bulk)
+    longest = max(len(line) for line in (tmp_path / 'events.jsonl').read_bytes().splitlines())
+    assert longest > 4096
+
+    assert manager.append_data('MONTHLY_INVESTMENTS', {'id': 'm101', 'description': 'after'})
+    assert errors == []
+    assert len(manager.read_as_of('MONTHLY_INVESTMENTS', None)) == 102
+
+
+def test_a_journal_failure_does_not_fail_the_write(make_manager, tmp_path):
+    errors = []
+    manager, backend = make_manager({'FD_RD': [{'id': 'd0'}]}, journal_dir=tmp_path, on_error=errors.append)
+    manager.read_data('FD_RD')
+
+    def broken(*args, **kwargs):
+        raise OSError('disk full')
+
+    manager.journal.record = broken
+    assert manager.append_data('FD_RD', {'id': 'd1'})
+    assert errors == []
+    # The cache was invalidated, so the new row shows and was written once
+    assert manager.read_data('FD_RD')['id'].tolist() == ['d0', 'd1']
+    assert len(backend.sheet('FD_RD').grid) == 3
+
+
+def test_a_fresh_journal_does_not_delay_the_first_render(tmp_path):
+    backend = FakeBackend({'FD_RD': [{'id': 'd0'}], 'SIPS': [{'id': 's0'}]}, latency=0.05)
+    began = time.perf_counter()
+    manager = GoogleSheetsManager(
+        snapshot_store=SnapshotStore(None),
+        session=SheetsSession(credentials=False, client=backend),
+        journal=Journal(tmp_path),
+        poll_interval=0
+    )
+    assert time.perf_counter() - began < 0.05
+
+    manager._refresh_thread.join()
+    assert manager.read_as_of('FD_RD', None)['id'].tolist() == ['d0']
+    assert manager.read_as_of('SIPS', None)['id'].tolist() == ['s0']
+
+
+def test_a_sheet_written_before_the_journal_starts_is_checkpointed_first(make_manager, tmp_path):
+    manager, _ = make_manager({'FD_RD': [{'id': 'd0'}]}, journal_dir=tmp_path)
+    before = pd.Timestamp.now()
+    time.sleep(0.01)
+    assert manager.append_data('FD_RD', {'id': 'd1'})
+    assert manager.read_as_of('FD_RD', pd.Timestamp.now())['id'].tolist() == ['d0', 'd1']
+    assert manager.read_as_of('FD_RD', before) is None
+    assert not manager.journal.has_checkpoint('SIPS')
+
+
+def test_read_only_managers_take_no_checkpoints(make_manager, tmp_path):
+    manager, _ = make_manager({'FD_RD': [{'id': 'd0'}]}, journal_dir=tmp_path)
+    manager.read_data('FD_RD')
+    assert not (tmp_path / 'checkpoints.jsonl').exists()
+
+
+def test_compaction_also_checkpoints_rarely_written_sheets(tmp_path):
+    journal = Journal(tmp_path, checkpoint_bytes=500)
+    journal.checkpoint('busy', pd.DataFrame(columns=['k']))
+    journal.checkpoint('quiet', pd.DataFrame({'k': [1]}))
+    journal.record('quiet', 'append', rows=[{'k': 2}])
+    for k in range(40):
+        journal.record('busy', 'append', rows=[{'k': k}])
+
+    logged = (tmp_path / 'events.jsonl').stat().st_size
+    index = [json.loads(line) for line in (tmp_path / 'checkpoints.jsonl').read_text().splitlines()]
+    quiet = [entry for entry in index if entry['sheet'] == 'quiet']
+    assert len(quiet) > 1
+    assert logged - quiet[-1]['offset'] < 500
+    assert journal.as_of('quiet')['k'].tolist() == [1, 2]
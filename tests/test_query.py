@@ -0,0 +1,74 @@
+import pandas as pd
+from core.query import TableIndex, query_table
+
+
+def deposits():
+    return pd.DataFrame({
+        'name': ['Alpha', 'beta', 'Gamma', 'Delta', 'Epsilon'],
+        'status': ['Active', 'Matured', 'Active', 'Active', 'Matured'],
+        'bank': ['SBI', 'HDFC', 'HDFC', 'SBI', 'SBI'],
+        'amount': [500, 20, 3000, '', 100],
+        'maturity_date': ['2024-03-01', '2023-01-15', 'not a date', '2025-07-01', '2024-12-31'],
+    }, index=[0, 2, 3, 6, 7])
+
+
+def index():
+    return TableIndex.for_sheet('FD_RD', deposits())
+
+
+def test_filters_combine_and_keep_row_labels():
+    page, total = query_table(index(), filters={'status': ['Active'], 'bank': ['SBI', 'ICICI']})
+    assert total == 2
+    assert page.index.tolist() == [0, 6]
+
+
+def test_date_range_is_inclusive_and_skips_unparseable_dates():
+    page, total = query_table(index(), date_range=('2024-03-01', '2024-12-31'), sort_by='maturity_date')
+    assert page['name'].tolist() == ['Alpha', 'Epsilon']
+    _, total = query_table(index(), date_range=(None, None))
+    assert total == 4
+
+
+def test_search_is_case_insensitive_across_text_columns():
+    page, _ = query_table(index(), search='HDFC')
+    assert page['name'].tolist() == ['beta', 'Gamma']
+    page, _ = query_table(index(), search='ALPHA')
+    assert page.index.tolist() == [0]
+
+
+def test_numbers_sort_numerically_with_blanks_last():
+    page, _ = query_table(index(), sort_by='amount')
+    assert page['amount'].tolist() == [20, 100, 500, 3000, '']
+
+    text = TableIndex(deposits().replace({'amount': {'': 'n/a'}}))
+    page, _ = query_table(text, sort_by='amount')
+    assert page['amount'].tolist() == [100, 20, 3000, 500, 'n/a']
+
+
+def test_sort_by_text_ignores_case():
+    page, _ = query_table(index(), sort_by='name')
+    assert page['name'].tolist() == ['Alpha', 'beta', 'Delta', 'Epsilon', 'Gamma']
+
+
+def test_pages_slice_the_sorted_matches():
+    first, total = query_table(index(), sort_by='name', page=1, page_size=2)
+    last, _ = query_table(index(), sort_by='name', page=3, page_size=2)
+    assert total == 5
+    assert first['name'].tolist() == ['Alpha', 'beta']
+    assert last['name'].tolist() == ['Gamma']
+
+
+def test_distinct_values_of_indexed_columns():
+    assert index().values('bank') == ['HDFC', 'SBI']
+    assert index().values('name') == []
+
+
+def test_manager_rebuilds_the_index_only_when_the_sheet_changes(make_manager):
+    manager, _ = make_manager({'FD_RD': deposits().reset_index(drop=True).to_dict('records')})
+    built = manager.get_index('FD_RD')
+    assert manager.get_index('FD_RD') is built
+
+    manager.update_row('FD_RD', 1, {'status': 'Active'})
+    rebuilt = manager.get_index('FD_RD')
+    assert rebuilt is not built
+    assert manager.query_data('FD_RD', filters={'status': ['Active']})[1] == 4
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from core.rebalance import (
+    ASSET_CLASSES,
+    plan_target_weights,
+    rebalance_plan,
+    solve_trades,
+    target_allocation
+)
+
+NAN = np.nan
+
+
+def test_drifted_portfolios_move_exactly_onto_target():
+    trades = solve_trades([[80.0, 20.0, 0, 0]], [[0.6, 0.4, 0, 0]], band=0.05)
+    assert trades.tolist() == [[-20.0, 20.0, 0.0, 0.0]]
+
+
+def test_portfolios_within_the_band_only_invest_new_cash():
+    trades = solve_trades([[62.0, 38.0, 0, 0]], [[0.6, 0.4, 0, 0]], cash=10.0, band=0.05)
+    assert trades.sum() == pytest.approx(10.0)
+    assert (trades >= 0).all()
+
+
+def test_buy_only_cash_goes_to_the_most_underweight_classes_first():
+    current = [[70.0, 20.0, 10.0, 0.0]]
+    target = [[0.5, 0.3, 0.2, 0.0]]
+    trades = solve_trades(current, target, cash=20.0, allow_sell=False)[0]
+    # Debt (0.67 of target) and Hybrid (0.5) are lifted to one level; Equity is overweight
+    assert trades[0] == 0.0
+    assert trades.sum() == pytest.approx(20.0)
+    assert (20.0 + trades[1]) / 0.3 == pytest.approx((10.0 + trades[2]) / 0.2)
+
+
+def test_many_portfolios_are_solved_independently():
+    current = np.array([[80.0, 20.0, 0, 0], [50.0, 50.0, 0, 0], [0.0, 0.0, 0, 0]])
+    target = np.array([[0.5, 0.5, 0, 0], [0.5, 0.5, 0, 0], [0.5, 0.5, 0, 0]])
+    trades = solve_trades(current, target, cash=np.array([0.0, 0.0, 100.0]))
+    assert trades[0].tolist() == [-30.0, 30.0, 0.0, 0.0]
+    assert trades[1].tolist() == [0.0, 0.0, 0.0, 0.0]
+    assert trades[2].tolist() == [50.0, 50.0, 0.0, 0.0]
+
+
+def test_untargeted_classes_are_held_and_never_traded():
+    trades = solve_trades([[50.0, 10.0, 40.0, 0.0]], [[0.5, 0.5, NAN, NAN]], band=0.05)[0]
+    assert trades[2] == 0.0 and trades[3] == 0.0
+    # The targeted 60 is split 50/50 around the held Hybrid
+    assert trades[:2].tolist() == [-20.0, 20.0]
+
+
+def test_small_trades_are_dropped():
+    trades = solve_trades([[51.0, 49.0, 0, 0]], [[0.5, 0.5, 0, 0]], band=0.0, min_trade=5.0)
+    assert trades.tolist() == [[0.0, 0.0, 0.0, 0.0]]
+
+
+def test_plan_mixes_come_from_target_columns_or_expected_return():
+    plans = pd.DataFrame({
+        'expected_return': [12, 7, 9.5],
+        'target_equity': ['', '', 60],
+        'target_hybrid': ['', '', 40],
+    })
+    weights = plan_target_weights(plans)
+    assert weights.loc[0, ['Equity', 'Debt']].tolist() == [1.0, 0.0]
+    assert weights.loc[1, ['Equity', 'Debt']].tolist() == [0.0, 1.0]
+    assert weights.loc[2].tolist() == [0.6, 0.0, 0.4, 0.0]
+    assert weights.loc[0, ['Hybrid', 'Commodity']].isna().all()
+
+
+def test_target_blends_active_plans_by_priority_and_amount():
+    plans = pd.DataFrame({
+        'status': ['Active', 'Active', 'Completed'],
+        'priority': ['High', 'Low', 'High'],
+        'target_amount': [100, 100, 1000],
+        'expected_return': [12, 7, 12],
+    })
+    target = target_allocation(plans)
+    assert target['Equity'] == pytest.approx(0.75)
+    assert target['Debt'] == pytest.approx(0.25)
+    assert target[['Hybrid', 'Commodity']].isna().all()
+
+
+def test_rebalance_plan_reports_one_row_per_class():
+    monthly = pd.DataFrame({'category': ['Equity', 'Debt', 'Hybrid'], 'amount': [80, 20, 25]})
+    plans = pd.DataFrame({'status': ['Active'], 'expected_return': [9.5], 'target_amount': [1]})
+    result = rebalance_plan(monthly, plans).set_index('asset_class')
+    assert result.index.tolist() == ASSET_CLASSES
+    assert np.isnan(result.loc['Hybrid', 'target_weight'])
+    assert result.loc['Hybrid', 'trade'] == 0.0
+    assert result.loc['Equity', 'trade'] == pytest.approx(-30.0)
+    assert result.loc['Debt', 'trade'] == pytest.approx(30.0)
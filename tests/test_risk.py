@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+import core.risk
+from core.risk import TRADING_DAYS, RiskEngine, nav_matrix, rolling_metrics
+
+
+def history(funds, days=300, seed=0):
+    """NAV_HISTORY rows: {fund_id: (start offset, length)} of random walks on business days"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range('2022-01-03', periods=days)
+    rows = []
+    for fund_id, (start, length) in funds.items():
+        navs = 100 * np.cumprod(1 + rng.normal(0.0004, 0.01, length))
+        rows += [{'fund_id': fund_id, 'date': d.strftime('%Y-%m-%d'), 'nav': n}
+                 for d, n in zip(dates[start:start + length], navs)]
+    return pd.DataFrame(rows)
+
+
+def test_nav_matrix_cleans_and_fills_only_inside_each_history():
+    raw = pd.DataFrame({
+        'fund_id': ['a', 'a', 'a', 'b', 'b', 'a', 'b'],
+        'date': ['2024-01-01', '2024-01-03', 'bad', '2024-01-02', '2024-01-03', '2024-01-04', '2024-01-04'],
+        'nav': [10, 12, 99, 5, -1, 13, 6],
+    })
+    matrix = nav_matrix(raw)
+    assert matrix.index.strftime('%m-%d').tolist() == ['01-01', '01-02', '01-03', '01-04']
+    assert matrix['a'].tolist() == [10, 10, 12, 13]
+    # b's negative NAV is dropped and filled; nothing before its first NAV
+    assert np.isnan(matrix.loc['2024-01-01', 'b'])
+    assert matrix['b'].tolist()[1:] == [5, 5, 6]
+
+
+def test_steady_growth_has_its_annual_return_and_no_volatility():
+    daily = 1.10 ** (1 / TRADING_DAYS)
+    navs = pd.DataFrame({'a': 100 * daily ** np.arange(300)})
+    metrics = rolling_metrics(navs, window=TRADING_DAYS)
+    assert metrics['rolling_return']['a'].iloc[-1] == pytest.approx(0.10)
+    assert metrics['volatility']['a'].iloc[-1] == pytest.approx(0.0, abs=1e-12)
+    assert np.isnan(metrics['sharpe']['a'].iloc[-1])
+    assert metrics['rolling_return']['a'].iloc[:TRADING_DAYS].isna().all()
+
+
+def test_drawdown_is_the_fall_from_the_running_peak():
+    navs = pd.DataFrame({'a': [100.0, 120.0, 90.0, 110.0, 130.0]})
+    assert rolling_metrics(navs, window=2)['drawdown']['a'].tolist() == pytest.approx([0, 0, -0.25, -1 / 12, 0])
+
+
+def test_each_fund_is_computed_over_its_own_dates():
+    navs = nav_matrix(history({'a': (0, 300), 'b': (50, 200), 'c': (0, 300)}))
+    metrics = RiskEngine().metrics(navs, window=63)
+    alone = rolling_metrics(navs[['b']].dropna(), window=63)
+    for metric, values in alone.items():
+        assert metrics[metric]['b'].dropna().equals(values['b'].dropna())
+    pd.testing.assert_frame_equal(metrics['volatility'][['a', 'c']], rolling_metrics(navs[['a', 'c']], 63)['volatility'])
+
+
+def test_only_changed_funds_are_recomputed(monkeypatch):
+    computed = []
+    original = core.risk.rolling_metrics
+
+    def counting(navs, *args):
+        computed.extend(navs.columns)
+        return original(navs, *args)
+
+    monkeypatch.setattr(core.risk, 'rolling_metrics', counting)
+    engine = RiskEngine()
+    raw = history({'a': (0, 250), 'b': (0, 250)})
+    first = engine.metrics(nav_matrix(raw), window=63)
+    engine.metrics(nav_matrix(raw), window=63)
+    assert sorted(computed) == ['a', 'b']
+
+    # A new NAV for b only: a is served from the cache with the same values
+    computed.clear()
+    extra = pd.DataFrame([{'fund_id': 'b', 'date': '2023-06-01', 'nav': 150.0}])
+    second = engine.metrics(nav_matrix(pd.concat([raw, extra])), window=63)
+    assert computed == ['b']
+    assert second['sharpe']['a'].dropna().equals(first['sharpe']['a'].dropna())
+
+    computed.clear()
+    engine.metrics(nav_matrix(raw), window=126)
+    assert sorted(computed) == ['a', 'b']
+
+
+def test_summary_reads_each_fund_at_its_last_date():
+    navs = nav_matrix(history({'a': (0, 300), 'b': (0, 200)}))
+    engine = RiskEngine()
+    summary = engine.summary(navs, window=63).set_index('fund_id')
+    metrics = engine.metrics(navs, window=63)
+    assert summary.loc['b', 'volatility'] == metrics['volatility']['b'].dropna().iloc[-1]
+    assert summary.loc['b', 'observations'] == 200
+    assert summary.loc['a', 'max_drawdown'] == metrics['drawdown']['a'].min()
+    assert RiskEngine().summary(pd.DataFrame()).empty
@@ -0,0 +1,50 @@
+import threading
+from core.sheets import SessionView
+
+
+def funds(n=3):
+    return {'MUTUAL_FUNDS': [{'id': f'f{i}', 'name': f'Fund {i}', 'current_nav': 10 + i} for i in range(n)]}
+
+
+def test_each_session_gets_its_own_copy(make_manager):
+    manager, _ = make_manager(funds())
+    first, second = SessionView(manager), SessionView(manager)
+    mine = first.read('MUTUAL_FUNDS')
+    mine.loc[0, 'name'] = 'Edited'
+    mine['extra'] = 1
+
+    assert second.read('MUTUAL_FUNDS').loc[0, 'name'] == 'Fund 0'
+    assert 'extra' not in manager.read_data('MUTUAL_FUNDS')
+
+
+def test_a_session_reads_once_until_the_data_changes(make_manager):
+    manager, _ = make_manager(funds())
+    manager.read_data('MUTUAL_FUNDS')
+    view = SessionView(manager)
+    data = view.read('MUTUAL_FUNDS')
+    assert view.read('MUTUAL_FUNDS') is data
+
+    manager.append_data('MUTUAL_FUNDS', {'id': 'f9', 'name': 'Fund 9', 'current_nav': 19})
+    fresh = view.read('MUTUAL_FUNDS')
+    assert fresh is not data
+    assert fresh['id'].tolist() == ['f0', 'f1', 'f2', 'f9']
+
+
+def test_concurrent_misses_fetch_a_sheet_once(make_manager):
+    manager, backend = make_manager(funds())
+    backend.latency = 0.05
+    start = threading.Barrier(8)
+    results = []
+
+    def session():
+        start.wait()
+        results.append(SessionView(manager).read('MUTUAL_FUNDS'))
+
+    threads = [threading.Thread(target=session) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8 and all(len(data) == 3 for data in results)
+    assert backend.sheet('MUTUAL_FUNDS').fetches == 1
@@ -0,0 +1,124 @@
+from datetime import date
+import pandas as pd
+from core.sip_schedule import (
+    expand_schedule,
+    installment_rows,
+    missing_installments,
+    pause_periods,
+    post_missing_installments,
+    resume_periods
+)
+
+
+def sips(*rows):
+    columns = ['id', 'name', 'fund_id', 'amount', 'frequency', 'start_date', 'end_date', 'status', 'paused_periods']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def due(schedule, sip_id):
+    return schedule.loc[schedule['sip_id'] == sip_id, 'due_date'].dt.strftime('%Y-%m-%d').tolist()
+
+
+def test_monthly_quarterly_and_weekly_due_dates():
+    schedule = expand_schedule(sips(
+        ('m', 'M', 'f', 100, 'Monthly', '2024-01-31', '', 'Active', ''),
+        ('q', 'Q', 'f', 100, 'Quarterly', '2024-01-15', '', 'Active', ''),
+        ('w', 'W', 'f', 100, 'Weekly', '2024-01-01', '2024-01-20', 'Active', ''),
+    ), as_of='2024-04-30')
+    # Days past the end of a month fall on its last day
+    assert due(schedule, 'm') == ['2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30']
+    assert due(schedule, 'q') == ['2024-01-15', '2024-04-15']
+    assert due(schedule, 'w') == ['2024-01-01', '2024-01-08', '2024-01-15']
+
+
+def test_pauses_skip_installments_and_inactive_sips_are_ignored():
+    schedule = expand_schedule(sips(
+        ('p', 'P', 'f', 100, 'Monthly', '2024-01-05', '', 'Active', '2024-02-01:2024-04-01'),
+        ('o', 'O', 'f', 100, 'Monthly', '2024-01-05', '', 'Paused', '2024-03-01:'),
+        ('c', 'C', 'f', 100, 'Monthly', '2024-01-05', '', 'Completed', ''),
+    ), as_of='2024-05-31')
+    assert due(schedule, 'p') == ['2024-01-05', '2024-04-05', '2024-05-05']
+    assert due(schedule, 'o') == ['2024-01-05', '2024-02-05']
+    assert due(schedule, 'c') == []
+
+
+def test_paused_sip_without_a_recorded_pause_stops_today():
+    today = pd.Timestamp(date.today())
+    start = (today - pd.DateOffset(months=2)).strftime('%Y-%m-%d')
+    end_of_year = today + pd.DateOffset(months=6)
+    schedule = expand_schedule(sips(('u', 'U', 'f', 100, 'Monthly', start, '', 'Paused', '')), as_of=end_of_year)
+    assert len(schedule) >= 2
+    assert (schedule['due_date'] < today).all()
+
+
+def test_pause_and_resume_periods():
+    paused = pause_periods('2024-01-01:2024-02-01', on=date(2024, 5, 1))
+    assert paused == '2024-01-01:2024-02-01;2024-05-01:'
+    assert pause_periods(paused, on=date(2024, 6, 1)) == paused
+    assert resume_periods(paused, on=date(2024, 7, 1)) == '2024-01-01:2024-02-01;2024-05-01:2024-07-01'
+
+
+def test_missing_installments_match_on_sip_id_or_description():
+    schedule = expand_schedule(sips(
+        ('a', 'SIP A', 'f', 100, 'Monthly', '2024-01-10', '', 'Active', ''),
+        ('b', 'SIP B', 'f', 100, 'Monthly', '2024-01-10', '', 'Active', ''),
+    ), as_of='2024-03-31')
+    monthly = pd.DataFrame({
+        'type': ['SIP', 'SIP', 'Lump Sum'],
+        'date': ['2024-01-10', '2024-02-10', '2024-03-10'],
+        'description': ['', 'SIP B', 'SIP B'],
+        'sip_id': ['a', '', ''],
+    })
+    missing = missing_installments(schedule, monthly)
+    assert sorted(zip(missing['sip_id'], missing['due_date'].dt.strftime('%Y-%m-%d'))) == [
+        ('a', '2024-02-10'), ('a', '2024-03-10'), ('b', '2024-01-10'), ('b', '2024-03-10')
+    ]
+
+
+def test_posted_installments_match_on_their_id_without_a_sip_id_column():
+    schedule = expand_schedule(sips(
+        ('a', 'Renamed SIP', 'f', 100, 'Monthly', '2024-01-10', '', 'Active', ''),
+    ), as_of='2024-02-29')
+    posted = pd.DataFrame(installment_rows(schedule.iloc[:1]))
+    # The sheet has no sip_id column and the SIP was renamed since posting
+    posted = posted.drop(columns=['sip_id']).assign(description='Old name')
+
+    missing = missing_installments(schedule, posted)
+    assert missing['due_date'].dt.strftime('%Y-%m-%d').tolist() == ['2024-02-10']
+
+
+def test_installment_rows_carry_the_fund_category():
+    schedule = expand_schedule(sips(
+        ('a', 'A', 'debt', 100, 'Monthly', '2024-01-10', '', 'Active', ''),
+        ('b', 'B', 'other', 250, 'Monthly', '2024-01-10', '', 'Active', ''),
+    ), as_of='2024-01-31')
+    funds = pd.DataFrame({'id': ['debt', 'other'], 'category': ['Debt', 'Large Cap']})
+    rows = installment_rows(schedule, funds)
+    assert [(row['id'], row['category'], row['amount']) for row in rows] == [
+        ('SIP-a-20240110', 'Debt', 100.0), ('SIP-b-20240110', 'Equity', 250.0)
+    ]
+
+
+def test_posting_twice_appends_each_installment_once(make_manager):
+    manager, backend = make_manager({
+        'SIPS': [{'id': 's1', 'name': 'SIP 1', 'fund_id': 'f', 'amount': 100, 'frequency': 'Monthly',
+                  'start_date': '2024-01-05', 'end_date': '', 'status': 'Active', 'paused_periods': ''}],
+        'MONTHLY_INVESTMENTS': [{'id': 'm0', 'type': 'Lump Sum', 'amount': 5, 'date': '2024-01-01',
+                                 'description': 'x', 'category': 'Equity', 'notes': '', 'date_created': ''}],
+        'MUTUAL_FUNDS': [{'id': 'f', 'category': 'Large Cap'}]
+    })
+    posted = post_missing_installments(manager, as_of='2024-03-31')
+    assert len(posted) == 3
+    assert post_missing_installments(manager, as_of='2024-03-31').empty
+    assert len(manager.read_data('MONTHLY_INVESTMENTS')) == 4
+
+
+def test_pausing_adds_the_paused_periods_column(make_manager):
+    manager, _ = make_manager({'SIPS': [{'id': 's1', 'status': 'Active'}]})
+    update = {'status': 'Paused', 'paused_periods': pause_periods('', on=date(2024, 5, 1))}
+    assert manager.update_row('SIPS', 0, update)
+    assert 'paused_periods' not in manager.read_data('SIPS')
+    assert manager.update_row('SIPS', 0, update, add_columns=True)
+    assert manager.read_data('SIPS').iloc[0].to_dict() == {
+        'id': 's1', 'status': 'Paused', 'paused_periods': '2024-05-01:'
+    }
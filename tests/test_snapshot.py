@@ -0,0 +1,80 @@
+import os
+import pickle
+import time
+import pandas as pd
+from core.snapshot import SnapshotStore, SNAPSHOT_VERSION
+
+
+def frames():
+    return {'FD_RD': (pd.DataFrame({'id': ['d0'], 'amount': [100]}), pd.Timestamp('2024-01-01'))}
+
+
+def test_round_trip_keeps_frames_and_markers(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshot.pkl'))
+    assert store.save(frames(), {'FD_RD': '7'})
+    loaded, markers = store.load()
+    assert loaded['FD_RD'][0].equals(frames()['FD_RD'][0])
+    assert markers == {'FD_RD': '7'}
+
+
+def test_version_1_snapshots_load_without_markers(tmp_path):
+    path = tmp_path / 'snapshot.pkl'
+    path.write_bytes(pickle.dumps({'version': 1, 'frames': frames()}))
+    loaded, markers = SnapshotStore(str(path)).load()
+    assert list(loaded) == ['FD_RD']
+    assert markers == {}
+
+
+def test_unknown_versions_and_corrupt_files_are_cache_misses(tmp_path):
+    path = tmp_path / 'snapshot.pkl'
+    path.write_bytes(pickle.dumps({'version': SNAPSHOT_VERSION + 1, 'frames': frames()}))
+    assert SnapshotStore(str(path)).load() == ({}, {})
+
+    SnapshotStore(str(path)).save(frames())
+    path.write_bytes(path.read_bytes()[:20])
+    assert SnapshotStore(str(path)).load() == ({}, {})
+
+    assert SnapshotStore(str(tmp_path / 'missing.pkl')).load() == ({}, {})
+    assert SnapshotStore(None).load() == ({}, {})
+
+
+def test_a_failed_save_leaves_the_previous_snapshot(tmp_path):
+    store = SnapshotStore(str(tmp_path / 'snapshot.pkl'))
+    store.save(frames(), {'FD_RD': '7'})
+    # Lambdas cannot be pickled, so this save fails part way through
+    assert not store.save({'FD_RD': (lambda: None, None)})
+    assert store.load()[1] == {'FD_RD': '7'}
+    assert os.listdir(tmp_path) == ['snapshot.pkl']
+
+
+def test_warm_start_serves_the_snapshot_without_api_calls(make_manager, tmp_path):
+    path = str(tmp_path / 'snapshot.pkl')
+    SnapshotStore(path).save(frames())
+    manager, backend = make_manager({'FD_RD': [{'id': 'live', 'amount': 1}]}, snapshot_path=path)
+    assert manager.read_data('FD_RD')['id'].tolist() == ['d0']
+    assert backend.calls == 0
+
+
+class CountingStore(SnapshotStore):
+    def __init__(self, path):
+        super().__init__(path)
+        self.saves = []
+
+    def save(self, frames, markers=None):
+        self.saves.append(sorted(frames))
+        return super().save(frames, markers)
+
+
+def test_cache_misses_are_saved_together_off_the_render_thread(make_manager, tmp_path):
+    manager, _ = make_manager(
+        {'FD_RD': [{'id': 'd0'}], 'SIPS': [{'id': 's0'}]},
+        snapshot_delay=0.2
+    )
+    manager.snapshot_store = store = CountingStore(str(tmp_path / 'snapshot.pkl'))
+    manager.read_data('FD_RD')
+    manager.read_data('SIPS')
+    assert store.saves == []
+
+    time.sleep(0.5)
+    assert store.saves == [['FD_RD', 'SIPS']]
+    assert sorted(store.load()[0]) == ['FD_RD', 'SIPS']
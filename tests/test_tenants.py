@@ -0,0 +1,124 @@
+import threading
+from datetime import datetime
+import pandas as pd
+import pytest
+from core.cache import TenantCache, frame_size
+from core.sheets import SheetsSession
+from core.tenants import TenantRegistry, validate_tenant_ids
+from tests.fake_sheets import FakeBackend
+
+
+def entry(rows):
+    return (pd.DataFrame({'value': range(rows)}), datetime.now())
+
+
+SIZE = frame_size(entry(100))
+
+
+def test_a_tenant_over_its_limit_evicts_its_own_oldest_sheets():
+    cache = TenantCache(max_bytes_per_tenant=2 * SIZE)
+    a, b = cache.partition('a'), cache.partition('b')
+    b['SIPS'] = entry(100)
+    a['SIPS'] = entry(100)
+    a['FD_RD'] = entry(100)
+    a['SIPS']  # a use moves SIPS ahead of FD_RD
+    a['MUTUAL_FUNDS'] = entry(100)
+
+    assert sorted(a) == ['MUTUAL_FUNDS', 'SIPS']
+    assert list(b) == ['SIPS']
+    assert cache.tenant_bytes('a') == 2 * SIZE
+
+
+def test_the_total_limit_evicts_least_recently_used_across_tenants():
+    cache = TenantCache(max_bytes=3 * SIZE)
+    a, b = cache.partition('a'), cache.partition('b')
+    a['SIPS'] = entry(100)
+    b['SIPS'] = entry(100)
+    a['FD_RD'] = entry(100)
+    b['FD_RD'] = entry(100)
+
+    assert 'SIPS' not in a
+    assert sorted(b) == ['FD_RD', 'SIPS']
+    assert cache.total_bytes == 3 * SIZE
+
+
+def test_an_entry_larger_than_the_limit_is_still_kept():
+    cache = TenantCache(max_bytes_per_tenant=SIZE // 2)
+    partition = cache.partition('a')
+    partition['NAV_HISTORY'] = entry(100)
+    assert list(partition) == ['NAV_HISTORY']
+
+
+def test_evictions_are_reported_to_the_partition():
+    cache = TenantCache(max_bytes=SIZE)
+    evicted = []
+    partition = cache.partition('a')
+    partition.on_evict = evicted.append
+    partition['SIPS'] = entry(100)
+    cache.partition('b')['SIPS'] = entry(100)
+    assert evicted == ['SIPS']
+
+
+def test_partitions_behave_like_dicts():
+    cache = TenantCache()
+    partition = cache.partition('a')
+    partition['SIPS'] = entry(3)
+    assert len(partition) == 1
+    assert partition.pop('SIPS')[0]['value'].tolist() == [0, 1, 2]
+    assert partition.pop('SIPS', None) is None
+    assert partition.get('SIPS') is None
+    with pytest.raises(KeyError):
+        del partition['SIPS']
+    assert cache.total_bytes == 0
+
+
+def test_tenant_ids_must_be_safe_file_names():
+    validate_tenant_ids(['client_a', 'Client.2', 'b-3'])
+    for bad in ['../etc', '_default', '.hidden', 'a/b', '']:
+        with pytest.raises(ValueError):
+            validate_tenant_ids([bad])
+
+
+def registry(tenants):
+    return TenantRegistry(
+        tenants,
+        session=SheetsSession(credentials=False, client=FakeBackend({})),
+        snapshot_dir=None,
+        background_refresh=False,
+        journal_dir=None
+    )
+
+
+def test_racing_sessions_share_one_manager_per_tenant():
+    tenants = registry({'client_a': {'SIPS': 'sheet-a'}, 'client_b': {}})
+    start = threading.Barrier(8)
+    managers = []
+
+    def open_tenant():
+        start.wait()
+        managers.append(tenants.get_manager('client_a'))
+
+    threads = [threading.Thread(target=open_tenant) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(manager) for manager in managers}) == 1
+    assert managers[0].sheet_config['SIPS']['sheet_id'] == 'sheet-a'
+    assert tenants.get_manager('client_b') is not managers[0]
+    with pytest.raises(KeyError):
+        tenants.get_manager('client_c')
+
+
+def test_aggregate_reports_each_tenant_separately():
+    tenants = registry({'client_a': {}, 'client_b': {}})
+
+    def job(tenant_id, manager):
+        if tenant_id == 'client_b':
+            raise RuntimeError('sheet missing')
+        return len(manager.read_data('SIPS'))
+
+    results, failures = tenants.aggregate(job)
+    assert results == {'client_a': 0}
+    assert failures == {'client_b': 'sheet missing'}
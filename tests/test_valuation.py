@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+from core.valuation import value_portfolio, valuation_totals
+
+
+def ledger(*rows):
+    return pd.DataFrame(rows, columns=['fund_id', 'date', 'type', 'units', 'nav'])
+
+
+def test_sells_consume_oldest_lots_first():
+    tx = ledger(
+        ('f1', '2023-01-01', 'BUY', 10, 10.0),
+        ('f1', '2023-06-01', 'BUY', 10, 20.0),
+        ('f1', '2024-03-01', 'SELL', 15, 30.0),
+    )
+    result = value_portfolio(tx, pd.DataFrame({'id': ['f1'], 'current_nav': [40.0]}), as_of='2024-06-01')
+
+    realized = result['realized']
+    assert realized['units'].tolist() == [10, 5]
+    assert realized['buy_nav'].tolist() == [10.0, 20.0]
+    assert realized['gain'].sum() == pytest.approx(10 * 20 + 5 * 10)
+    assert realized['long_term'].tolist() == [True, False]
+
+    lots = result['lots']
+    assert lots['units'].tolist() == [5]
+    assert lots['buy_nav'].tolist() == [20.0]
+    assert lots['unrealized_gain'].tolist() == [pytest.approx(5 * 20)]
+
+
+def test_funds_are_matched_independently():
+    tx = ledger(
+        ('f1', '2023-01-01', 'BUY', 10, 10.0),
+        ('f2', '2023-01-02', 'BUY', 4, 50.0),
+        ('f2', '2023-02-01', 'SELL', 4, 60.0),
+        ('f1', '2023-03-01', 'SELL', 2, 12.0),
+    )
+    holdings = value_portfolio(tx, pd.DataFrame({'id': ['f1', 'f2'], 'current_nav': [11.0, 70.0]}))['holdings']
+    holdings = holdings.set_index('fund_id')
+    assert holdings.loc['f1', 'units_held'] == pytest.approx(8)
+    assert holdings.loc['f2', 'units_held'] == pytest.approx(0)
+    assert holdings.loc['f1', 'realized_gain'] == pytest.approx(2 * 2)
+    assert holdings.loc['f2', 'realized_gain'] == pytest.approx(4 * 10)
+
+
+def test_oversold_units_are_reported_not_matched():
+    tx = ledger(
+        ('f1', '2023-01-01', 'BUY', 5, 10.0),
+        ('f1', '2023-02-01', 'SELL', 8, 12.0),
+    )
+    result = value_portfolio(tx)
+    assert result['realized']['units'].sum() == pytest.approx(5)
+    assert result['holdings'].iloc[0]['oversold_units'] == pytest.approx(3)
+
+
+def test_nav_is_derived_from_amount_when_missing():
+    tx = pd.DataFrame({
+        'fund_id': ['f1'], 'date': ['2023-01-01'], 'type': ['BUY'],
+        'units': [4], 'nav': [''], 'amount': [100]
+    })
+    lots = value_portfolio(tx)['lots']
+    assert lots['buy_nav'].tolist() == [25.0]
+
+
+def test_empty_ledger():
+    totals = valuation_totals(value_portfolio(pd.DataFrame()))
+    assert totals == {'portfolio_value': 0.0, 'cost_basis': 0.0, 'unrealized_gain': 0.0, 'realized_gain': 0.0}
+
+
+def test_sells_before_enough_buys_are_oversold_not_matched_to_later_lots():
+    tx = ledger(
+        ('f1', '2023-01-01', 'BUY', 5, 10.0),
+        ('f1', '2023-02-01', 'SELL', 8, 12.0),
+        ('f1', '2023-03-01', 'BUY', 10, 11.0),
+        ('f1', '2023-04-01', 'SELL', 4, 13.0),
+    )
+    result = value_portfolio(tx, as_of='2023-05-01')
+
+    realized = result['realized']
+    assert (realized['holding_days'] >= 0).all()
+    assert realized['units'].tolist() == [5, 4]
+    assert realized['buy_nav'].tolist() == [10.0, 11.0]
+    assert realized['gain'].sum() == pytest.approx(5 * 2 + 4 * 2)
+
+    assert result['lots']['units'].tolist() == [6]
+    oversold = result['oversold']
+    assert oversold['date'].dt.strftime('%Y-%m-%d').tolist() == ['2023-02-01']
+    assert oversold['oversold_units'].tolist() == [pytest.approx(3)]
+    assert result['holdings'].iloc[0]['oversold_units'] == pytest.approx(3)
+    assert result['holdings'].iloc[0]['units_held'] == pytest.approx(6)
+
+
+def test_a_later_fund_is_unaffected_by_an_earlier_oversold_fund():
+    tx = ledger(
+        ('a', '2023-01-01', 'SELL', 3, 10.0),
+        ('b', '2023-01-01', 'BUY', 2, 10.0),
+        ('b', '2023-01-02', 'SELL', 2, 15.0),
+    )
+    result = value_portfolio(tx)
+    assert result['realized']['fund_id'].tolist() == ['b']
+    assert result['oversold']['fund_id'].tolist() == ['a']
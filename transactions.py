@@ -0,0 +1,103 @@
+import streamlit as st
+from datetime import datetime, date
+from google_sheets_manager import get_sheets_manager, load_sheet
+from table_view import show_table
+from core.valuation import value_portfolio, valuation_totals
+
+
+def show_transactions():
+    """Mutual Fund Transactions and Holdings"""
+    st.header("💼 Transactions & Holdings")
+
+    sheets_manager = get_sheets_manager()
+
+    tab1, tab2, tab3 = st.tabs(["📋 View Transactions", "➕ Add Transaction", "💼 Holdings"])
+
+    with tab1:
+        show_table(sheets_manager, 'TRANSACTIONS', "transactions_view", "No transactions recorded yet.")
+
+    with tab2:
+        mf_data = load_sheet(sheets_manager, 'MUTUAL_FUNDS')
+        if mf_data.empty:
+            st.info("Add a mutual fund before recording transactions.")
+        else:
+            with st.form("add_transaction_form"):
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    fund_index = st.selectbox(
+                        "Fund*",
+                        options=mf_data.index,
+                        format_func=lambda x: f"{mf_data.loc[x, 'name']} - {mf_data.loc[x, 'fund_house']}"
+                    )
+                    transaction_type = st.selectbox("Type*", ["Buy", "Sell"])
+                    transaction_date = st.date_input("Date*", value=date.today())
+
+                with col2:
+                    units = st.number_input("Units*", min_value=0.0001, format="%.4f")
+                    nav = st.number_input("NAV*", min_value=0.0001, format="%.4f")
+                    notes = st.text_input("Notes", placeholder="e.g., Folio number")
+
+                submitted = st.form_submit_button("Add Transaction", type="primary")
+
+                if submitted:
+                    if units and nav:
+                        new_transaction = {
+                            'id': datetime.now().strftime("%Y%m%d%H%M%S"),
+                            'fund_id': str(mf_data.loc[fund_index, 'id']),
+                            'date': transaction_date.strftime("%Y-%m-%d"),
+                            'type': transaction_type,
+                            'units': units,
+                            'nav': nav,
+                            'amount': round(units * nav, 2),
+                            'notes': notes,
+                            'date_created': datetime.now().strftime("%Y-%m-%d")
+                        }
+
+                        if sheets_manager.append_data('TRANSACTIONS', new_transaction):
+                            st.success("✅ Transaction added successfully!")
+                            st.rerun()
+                        else:
+                            st.error("❌ Failed to add transaction.")
+                    else:
+                        st.error("Please fill in all required fields (*).")
+
+    with tab3:
+        transactions = load_sheet(sheets_manager, 'TRANSACTIONS')
+        if not transactions.empty:
+            show_holdings(transactions, load_sheet(sheets_manager, 'MUTUAL_FUNDS'))
+        else:
+            st.info("No holdings yet. Record a Buy transaction to get started.")
+
+
+def show_holdings(transactions, mf_data):
+    """Portfolio valuation from the FIFO-matched transaction ledger"""
+    valuation = value_portfolio(transactions, mf_data)
+    totals = valuation_totals(valuation)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Portfolio Value", f"₹{totals['portfolio_value']:,.2f}")
+    with col2:
+        st.metric("Cost Basis", f"₹{totals['cost_basis']:,.2f}")
+    with col3:
+        unrealized_pct = (totals['unrealized_gain'] / totals['cost_basis'] * 100) if totals['cost_basis'] else 0
+        st.metric("Unrealized P/L", f"₹{totals['unrealized_gain']:,.2f}", f"{unrealized_pct:.2f}%")
+    with col4:
+        st.metric("Realized P/L", f"₹{totals['realized_gain']:,.2f}")
+
+    holdings = valuation['holdings']
+    st.subheader("Holdings by Fund")
+    st.dataframe(holdings, use_container_width=True, hide_index=True)
+
+    if holdings['current_nav'].isna().any():
+        st.warning("Some funds have no current NAV, so their market value is not included.")
+    if not valuation['oversold'].empty:
+        st.warning("Some sells exceed the units held on their date; the excess is left unmatched.")
+        st.dataframe(valuation['oversold'], use_container_width=True, hide_index=True)
+
+    with st.expander("Open Lots (FIFO)"):
+        st.dataframe(valuation['lots'], use_container_width=True, hide_index=True)
+
+    with st.expander("Realized Gains"):
+        st.dataframe(valuation['realized'], use_container_width=True, hide_index=True)